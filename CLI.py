@@ -2,7 +2,6 @@ import os
 import click
 import json
 
-
 # Import your dataframe-generating functions
 import EDAMannot as edam
 
@@ -26,13 +25,40 @@ def cli():
 
 
 @cli.command(name="init")
-def initialize():
+@click.option(
+    "--virtual-transitive",
+    is_flag=True,
+    help="Do not keep the transitive annotation tables: derive them from the direct ones through the EDAM OWL file at query time.",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of stages running at the same time (default: the SPARQL client concurrency, 8).",
+)
+@click.option(
+    "--shard-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of tools per query of the transitive extractions when they run on the SPARQL endpoint (default: 2000).",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Rebuild all the tables, even those that are up to date.",
+)
+def initialize(virtual_transitive, jobs, shard_size, force):
     """
     Compute all tables containing metrics and annotation information for the tools available in bio.tools.
 
     These dataframes are necessary for the toolkit to function.
 
-    Command usage : python3 CLI.py init
+    Independent stages (most of the SPARQL extractions) run at the same time; each
+    stage starts as soon as the tables it needs are ready. Tables that are up to
+    date (same knowledge graph version, code and inputs, see Dataframe/manifest.json)
+    are not rebuilt, unless --force is given.
+
+    Command usage : python3 CLI.py init [--virtual-transitive] [--jobs N] [--shard-size N] [--force]
     """
     click.echo("=== EDAMannot Initialization ===")
 
@@ -43,139 +69,486 @@ def initialize():
     click.echo("\n=== Query bioschemas-file, generate and calculate dataframes ===")
     os.makedirs("Dataframe", exist_ok=True)
 
-    generated_files = []
-
-    # ------------------------------------------------------------
-    # PRIMARY EXTRACTIONS — base objects
-    # ------------------------------------------------------------
-    click.echo("→ Getting number of tools")
-    nb = edam.get_nb_tools()
-    click.echo(f"  Found {nb} tools")
-
-    click.echo("→ Getting dfTool")
-    dfTool = edam.get_tools_dataframe()
-    generated_files.append("Dataframe/dfTool.tsv.bz2")
-
-    click.echo("→ Getting dfToolTopic (non-transitive)")
-    dfToolTopic = edam.get_tools_topics_dataframe()
-    generated_files.append("Dataframe/dfToolTopic.tsv.bz2")
-
-    click.echo("→ Getting dfToolOperation (non-transitive)")
-    dfToolOperation = edam.get_tools_operations_label_dataframe()
-    generated_files.append("Dataframe/dfToolOperation.tsv.bz2")
+    click.echo("→ Checking the knowledge graph version")
+    if edam.update_kg_version():
+        click.echo(f"  New version ({edam.get_kg_version()}): SPARQL cache cleared")
+    else:
+        click.echo(f"  Unchanged ({edam.get_kg_version()})")
+
+    if shard_size:
+        edam.sparql_shard_size = shard_size
+
+    # The transitive and redundancy tables are derived from the direct ones when
+    # the EDAM OWL file is the version of the knowledge graph, and queried
+    # independently otherwise (the transitive ones by batches of the tools of dfTool)
+    if os.path.exists(edam.edam_file) and not edam.edam_hierarchy_available():
+        click.echo(
+            f"  The EDAM OWL file is version {edam.edam_owl_version()}, not the one of"
+            " the knowledge graph: the transitive and redundancy tables are queried"
+        )
+    if virtual_transitive and not edam.edam_hierarchy_available():
+        raise click.ClickException(
+            "--virtual-transitive needs the EDAM OWL file of the knowledge graph's"
+            f" EDAM version ({edam.get_kg_edam_version()}): {edam.edam_file}"
+        )
 
-    click.echo("→ Getting dfToolTopicTransitive")
-    dfToolTopicTransitive = edam.get_tools_topics_transitive_dataframe()
-    generated_files.append("Dataframe/dfToolTopicTransitive.tsv.bz2")
+    def direct(name):
+        return [name] if edam.edam_hierarchy_available() else []
+
+    # The derived tables take their inputs as <table>_path arguments, which
+    # accept the DataFrame itself
+    def tables(*names):
+        return {f"{name}_path": name for name in names}
+
+    # name: (function, stages it needs, generated file, or {key: file} for the
+    # stages returning a dict of tables)
+    stages = {
+        # PRIMARY EXTRACTIONS — base objects
+        "nb_tools": (edam.get_nb_tools, [], None),
+        "dfTool": (edam.get_tools_dataframe, [], "dfTool"),
+        "dfToolTopic": (edam.get_tools_topics_dataframe, [], "dfToolTopic"),
+        "dfToolOperation": (
+            edam.get_tools_operations_label_dataframe,
+            [],
+            "dfToolOperation",
+        ),
+        "dfToolTopicTransitive": (
+            edam.get_tools_topics_transitive_dataframe,
+            direct("dfToolTopic") or ["dfTool"],
+            "dfToolTopicTransitive",
+        ),
+        "dfToolOperationTransitive": (
+            edam.get_tools_operations_transitive_dataframe,
+            direct("dfToolOperation") or ["dfTool"],
+            "dfToolOperationTransitive",
+        ),
+        # AGGREGATES — topic/operation counts
+        "dftools_nbTopics_nbOperations": (
+            edam.get_dftools_with_nbTopics_nbOperations,
+            ["dfTool", "dfToolTopicTransitive", "dfToolOperationTransitive"],
+            "dftools_nbTopics_nbOperations",
+        ),
+        # REDUNDANCY QUERIES
+        "df_redundancy_topic": (
+            edam.generate_df_redundancy_topic,
+            direct("dfToolTopic"),
+            "dfToolTopic_redundancy",
+        ),
+        "df_redundancy_operation": (
+            edam.generate_df_redundancy_operation,
+            direct("dfToolOperation"),
+            "dfToolOperation_redundancy",
+        ),
+        # NON-REDUNDANT TABLES
+        "df_topic_no_redundancy": (
+            edam.generate_df_topic_no_redundancy,
+            tables("dfToolTopic", "df_redundancy_topic"),
+            "df_topic_no_redundancy",
+        ),
+        "df_operation_no_redundancy": (
+            edam.generate_df_operation_no_redundancy,
+            tables("dfToolOperation", "df_redundancy_operation"),
+            "df_operation_no_redundancy",
+        ),
+        # dfTool without transitive and without redundancy
+        "dfTool_NoTransitive": (
+            edam.generate_dfTool_no_transitive,
+            tables("dfTool", "dfToolTopic", "dfToolOperation"),
+            "dfTool_NoTransitive",
+        ),
+        "dfTool_NoTransitive_NoRedundancy": (
+            edam.generate_dfTool_no_transitive_no_redundancy,
+            tables("dfTool", "df_topic_no_redundancy", "df_operation_no_redundancy"),
+            "dfTool_NoTransitive_NoRedundancy",
+        ),
+        # SPECIAL DIAGNOSTIC QUERIES
+        "dfDeprecatedItems": (edam.get_dfDeprecatedItems, [], "dfDeprecatedItems"),
+        "dfDeprecatedSuggestedItems": (
+            edam.get_dfDeprecatedSuggestedItems,
+            [],
+            "dfDeprecatedSuggestedItems",
+        ),
+        "dfToolsWithSomeDeprecatedTopic": (
+            edam.get_dfToolsWithSomeDeprecatedTopic,
+            [],
+            "dfToolsWithSomeDeprecatedTopic",
+        ),
+        "dfToolsWithSomeDeprecatedOperation": (
+            edam.get_dfToolsWithSomeDeprecatedOperation,
+            [],
+            "dfToolsWithSomeDeprecatedOperation",
+        ),
+        # METRICS TABLES
+        # Topic and operation metrics of all the annotation tables in one pass
+        "concept_metrics": (
+            edam.compute_concept_metrics,
+            [source for source, _ in edam.METRIC_TABLES.values()],
+            {name: name for name in edam.METRIC_TABLES},
+        ),
+        "dfToolallmetrics": (
+            edam.compute_tool_metrics_with_transitive,
+            {
+                **tables(
+                    "dfTool", "dfToolTopicTransitive", "dfToolOperationTransitive"
+                ),
+                "dfTopic_metrics_path": "concept_metrics.dfTopicmetrics",
+                "dfOperation_metrics_path": "concept_metrics.dfOperationmetrics",
+            },
+            "dfToolallmetrics",
+        ),
+        "dfToolallmetrics_NT": (
+            edam.compute_tool_metrics_non_transitive,
+            {
+                **tables("dfTool", "dfToolTopic", "dfToolOperation"),
+                "dfTopic_metrics_NT_path": "concept_metrics.dfTopicmetrics_NT",
+                "dfOperation_metrics_NT_path": "concept_metrics.dfOperationmetrics_NT",
+            },
+            "dfToolallmetrics_NT",
+        ),
+        "dfToolallmetrics_NT_NR": (
+            edam.compute_tool_metrics_no_redundancy,
+            {
+                **tables(
+                    "dfTool", "df_topic_no_redundancy", "df_operation_no_redundancy"
+                ),
+                "dfTopic_metrics_NT_NR_path": "concept_metrics.dfTopicmetrics_NT_NR",
+                "dfOperation_metrics_NT_NR_path": "concept_metrics.dfOperationmetrics_NT_NR",
+            },
+            "dfToolallmetrics_NT_NR",
+        ),
+    }
+    # Clusters of tools with near-identical annotations (MinHash/LSH, needs scipy)
+    if edam.sparse is not None:
+        stages["dfToolDuplicates"] = (
+            edam.find_near_duplicate_tools,
+            tables("dfToolTopicTransitive", "dfToolOperationTransitive", "dfTool"),
+            "dfToolDuplicates",
+        )
 
-    click.echo("→ Getting dfToolOperationTransitive")
-    dfToolOperationTransitive = edam.get_tools_operations_transitive_dataframe()
-    generated_files.append("Dataframe/dfToolOperationTransitive.tsv.bz2")
+    def on_finish(name, timing, wasRebuilt):
+        if wasRebuilt:
+            click.echo(f"→ {name} ({timing[1] - timing[0]:.1f}s)")
+        else:
+            click.echo(f"→ {name} (up to date)")
+
+    graph = {name: (function, deps) for name, (function, deps, _) in stages.items()}
+
+    def output_path(output):
+        if isinstance(output, dict):
+            return {key: output_path(name) for key, name in output.items()}
+        return f"Dataframe/{output}.tsv.bz2" if output else None
+
+    outputs = {name: output_path(output) for name, (_, _, output) in stages.items()}
+    # The tables derived from the EDAM hierarchy are rebuilt when the OWL file changes
+    owlStages = [
+        "dfToolTopicTransitive",
+        "dfToolOperationTransitive",
+        "df_redundancy_topic",
+        "df_redundancy_operation",
+    ]
+    files = {}
+    if edam.edam_hierarchy_available():
+        files = {name: [edam.edam_file] for name in owlStages}
+    results, timings, rebuilt = edam.run_stages_incremental(
+        graph,
+        outputs,
+        force=force,
+        max_workers=jobs,
+        on_finish=on_finish,
+        files=files,
+    )
+    click.echo(f"  Found {results['nb_tools']} tools")
 
     # ------------------------------------------------------------
-    # AGGREGATES — topic/operation counts
+    # STAGE TIMINGS — critical path marked with *
     # ------------------------------------------------------------
-    click.echo("→ Generating dfTool with transitive nbTopics & nbOperations")
-    dfTool_T = edam.get_dftools_with_nbTopics_nbOperations(
-        dfTool,
-        dfToolTopicTransitive,
-        dfToolOperationTransitive,
-        "Dataframe/dftools_nbTopics_nbOperations.tsv.bz2",
-    )
-    generated_files.append("Dataframe/dftools_nbTopics_nbOperations.tsv.bz2")
+    click.echo("\n=== Stage timings (start, duration; * on the critical path) ===")
+    path = edam.critical_path(graph, timings)
+    for name in sorted(timings, key=lambda name: timings[name]):
+        start, end = timings[name]
+        mark = "*" if name in path else " "
+        click.echo(f" {mark} {name:<36} {start:7.1f}s {end - start:7.1f}s")
+    click.echo(f"  Total: {max(end for _, end in timings.values()):.1f}s")
+
+    def output_files(name):
+        output = outputs[name]
+        if isinstance(output, dict):
+            return list(output.values())
+        return [output] if output else []
+
+    generated_files = [path for name in rebuilt for path in output_files(name)]
+    nbTables = sum(len(output_files(name)) for name in outputs)
+    click.echo(f"  Rebuilt {len(generated_files)} of {nbTables} tables")
 
     # ------------------------------------------------------------
-    # REDUNDANCY QUERIES
+    # BINARY INDEX — interned URIs
     # ------------------------------------------------------------
-    click.echo("→ Generating df_redundancy_topic")
-    df_redundancy_topic = edam.generate_df_redundancy_topic()
-    generated_files.append("Dataframe/dfToolTopic_redundancy.tsv.bz2")
-
-    click.echo("→ Generating df_redundancy_operation")
-    df_redundancy_operation = edam.generate_df_redundancy_operation()
-    generated_files.append("Dataframe/dfToolOperation_redundancy.tsv.bz2")
+    edam.clear_tables()
+    if virtual_transitive:
+        click.echo("→ Removing the transitive tables (virtual transitive mode)")
+        removed = edam.drop_transitive_tables()
+        generated_files = [f for f in generated_files if f not in removed]
+    if edam.index_is_fresh():
+        click.echo("→ Interned URI index up to date")
+    else:
+        click.echo("→ Building the interned URI index")
+        generated_files += edam.build_uri_index()
+    if edam.sparse is None:
+        click.echo("→ scipy is not installed: skipping the similarity index")
+    elif edam.similarity_index_is_fresh():
+        click.echo("→ Similarity index up to date")
+    else:
+        click.echo("→ Building the similarity index")
+        generated_files += edam.build_similarity_index()
 
     # ------------------------------------------------------------
-    # NON-REDUNDANT TABLES
+    # SUCCESS
     # ------------------------------------------------------------
-    click.echo("→ Generating df_topic_no_redundancy")
-    df_topic_no_redundancy = edam.generate_df_topic_no_redundancy()
-    generated_files.append("Dataframe/df_topic_no_redundancy.tsv.bz2")
+    if generated_files:
+        click.echo("\n=== Generated files: ===")
+    for f in generated_files:
+        click.echo(f"  - {f}")
 
-    click.echo("→ Generating df_operation_no_redundancy")
-    df_operation_no_redundancy = edam.generate_df_operation_no_redundancy()
-    generated_files.append("Dataframe/df_operation_no_redundancy.tsv.bz2")
 
-    # ------------------------------------------------------------
-    # dfTool without transitive and without redundancy
-    # ------------------------------------------------------------
-    click.echo("→ Generating dfTool_NoTransitive")
-    dfTool_NoTransitive = edam.generate_dfTool_no_transitive()
-    generated_files.append("Dataframe/dfTool_NoTransitive.tsv.bz2")
+@cli.command(name="snapshot")
+@click.option(
+    "--virtual-transitive",
+    is_flag=True,
+    help="Remove the transitive annotation tables: derive them from the direct ones through the EDAM OWL file at query time.",
+)
+def snapshot(virtual_transitive):
+    """
+    Write the columnar (Feather) copy of the tables of the Dataframe/ folder and
+    build the binary index (interned URIs) used by the other commands.
 
-    click.echo("→ Generating dfTool_NoTransitive_NoRedundancy")
-    dfTool_NoTransitive_NoRedundancy = (
-        edam.generate_dfTool_no_transitive_no_redundancy()
-    )
-    generated_files.append("Dataframe/dfTool_NoTransitive_NoRedundancy.tsv.bz2")
+    `init` already writes them. Use this command to convert existing .tsv.bz2 files
+    without querying the knowledge graph again.
 
-    # ------------------------------------------------------------
-    # SPECIAL DIAGNOSTIC QUERIES
-    # ------------------------------------------------------------
+    Command usage : python3 CLI.py snapshot [--virtual-transitive]
+    """
+    if virtual_transitive:
+        try:
+            removed = edam.drop_transitive_tables()
+        except (FileNotFoundError, ValueError) as e:
+            raise click.ClickException(str(e))
+        for f in removed:
+            click.echo(f"  removed {f}")
+    generated_files = []
+    if edam.pyarrow is not None:
+        generated_files += edam.write_columnar_snapshot()
+    else:
+        click.echo("pyarrow is not installed: skipping the columnar snapshot")
+    edam.clear_tables()
+    generated_files += edam.build_uri_index()
+    if edam.sparse is not None:
+        generated_files += edam.build_similarity_index()
+    else:
+        click.echo("scipy is not installed: skipping the similarity index")
+    for f in generated_files:
+        click.echo(f"  - {f}")
 
-    click.echo("→ Getting dfDeprecatedItems")
-    dfDeprecatedItems = edam.get_dfDeprecatedItems()
-    generated_files.append("Dataframe/dfDeprecatedItems.tsv.bz2")
 
-    click.echo("→ Getting dfDeprecatedSuggestedItems")
-    dfDeprecatedSuggestedItems = edam.get_dfDeprecatedSuggestedItems()
-    generated_files.append("Dataframe/dfDeprecatedSuggestedItems.tsv.bz2")
+@cli.command(name="similar")
+@click.argument("tool")
+@click.option(
+    "-k",
+    "--top",
+    "k",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of similar tools to show.",
+)
+@click.option(
+    "--metric",
+    "-m",
+    default="mi",
+    type=click.Choice(edam.SIMILARITY_METRICS, case_sensitive=False),
+    help="Similarity of the heritage annotations: mutual information (mi), Jaccard index of the annotation sets (jaccard) or cosine of the IC-weighted annotation vectors (ic-weighted).",
+)
+@click.option(
+    "--share-topic",
+    "-st",
+    is_flag=True,
+    default=False,
+    help="Only search the tools sharing at least one topic with the tool.",
+)
+@click.option(
+    "--output_format",
+    "-f",
+    default="json",
+    type=click.Choice(["json", "tsv"], case_sensitive=False),
+    help="Output format",
+)
+def similar(tool, k, metric, share_topic, output_format):
+    """
+    Show the tools whose heritage topic and operation annotations are the most
+    similar to those of a tool, by decreasing score.
 
-    click.echo("→ Getting dfToolsWithSomeDeprecatedTopic")
-    dfToolsWithSomeDeprecatedTopic = edam.get_dfToolsWithSomeDeprecatedTopic()
-    generated_files.append("Dataframe/dfToolsWithSomeDeprecatedTopic.tsv.bz2")
+    The search uses the similarity index built by `init` (Dataframe/index/similarity.npz).
 
-    click.echo("→ Getting dfToolsWithSomeDeprecatedOperation")
-    dfToolsWithSomeDeprecatedOperation = edam.get_dfToolsWithSomeDeprecatedOperation()
-    generated_files.append("Dataframe/dfToolsWithSomeDeprecatedOperation.tsv.bz2")
+    Example command usage :
 
-    # ------------------------------------------------------------------
-    # 7) METRICS TABLES
-    # ------------------------------------------------------------------
-    click.echo("→ Compute dfTopicmetrics")
-    dfTopicmetrics = edam.compute_topic_metrics()
-    generated_files.append("Dataframe/dfTopicmetrics.tsv.bz2")
+    python3 CLI.py similar star -k 20 --metric mi
 
-    click.echo("→ Compute dfTopicmetrics_NT")
-    dfTopicmetrics_NT = edam.compute_topic_metrics_NT()
-    generated_files.append("Dataframe/dfTopicmetrics_NT.tsv.bz2")
+    or, among the tools sharing a topic with star :
 
-    click.echo("→ Compute dfOperationmetrics")
-    dfOperationmetrics = edam.compute_operation_metrics()
-    generated_files.append("Dataframe/dfOperationmetrics.tsv.bz2")
+    python3 CLI.py similar star -k 10 -m ic-weighted --share-topic -f tsv
+    """
+    try:
+        dfSimilar = edam.get_similarity_index().most_similar(
+            tool, k=k, metric=metric.lower(), share_topic=share_topic
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
 
-    click.echo("→ Compute dfOperationmetrics_NT")
-    dfOperationmetrics_NT = edam.compute_operation_metrics_NT()
-    generated_files.append("Dataframe/dfOperationmetrics_NT.tsv.bz2")
+    if output_format.lower() == "tsv":
+        click.echo(dfSimilar.to_csv(sep="\t", index=False), nl=False)
+    else:
+        click.echo(json.dumps(dfSimilar.to_dict("records"), indent=2))
 
-    click.echo("→ Compute dfToolallmetrics")
-    dfToolallmetrics = edam.compute_tool_metrics_with_transitive()
-    generated_files.append("Dataframe/dfToolallmetrics.tsv.bz2")
 
-    click.echo("→ Compute dfToolallmetrics_NT")
-    dfToolallmetrics_NT = edam.compute_tool_metrics_non_transitive()
-    generated_files.append("Dataframe/dfToolallmetrics_NT.tsv.bz2")
+def parse_size(ctx, param, value):
+    # "512M", "4G", "1.5G" or a number of bytes
+    if value is None:
+        return None
+    units = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+    text = value.strip().upper().removesuffix("B")
+    try:
+        if text and text[-1] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(text)
+    except ValueError:
+        raise click.BadParameter(f"not a size: {value} (e.g. 512M, 4G)")
 
-    # ------------------------------------------------------------
-    # SUCCESS
-    # ------------------------------------------------------------
-    click.echo("\n=== Generated files: ===")
-    for f in generated_files:
+
+@cli.command(name="similarity-matrix")
+@click.argument("output", type=click.Path(dir_okay=False))
+@click.option(
+    "--metric",
+    "-m",
+    default="mi",
+    type=click.Choice(edam.SIMILARITY_METRICS, case_sensitive=False),
+    help="Similarity of the heritage annotations (see the similar command).",
+)
+@click.option(
+    "-k",
+    "--top",
+    "k",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of most similar tools kept per tool (default: 20 without --threshold).",
+)
+@click.option(
+    "--threshold",
+    "-t",
+    type=float,
+    default=None,
+    help="Smallest score kept (between 0 and 1 for jaccard and ic-weighted).",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: the number of CPUs).",
+)
+@click.option(
+    "--block-size",
+    type=click.IntRange(min=1),
+    default=32,
+    show_default=True,
+    help="Largest number of tools (rows) of a block.",
+)
+@click.option(
+    "--max-memory",
+    callback=parse_size,
+    default=None,
+    help="Memory ceiling of the kept entries and of the blocks of all the workers, e.g. 2G (the blocks are made smaller to fit; a --threshold run keeping more entries stops).",
+)
+def similarity_matrix(output, metric, k, threshold, jobs, block_size, max_memory):
+    """
+    Compute the tool x tool similarity matrix of the heritage annotations and
+    write it as a scipy sparse matrix (OUTPUT, .npz, read with
+    scipy.sparse.load_npz), with the tools of its rows and columns in the
+    .tools.tsv file next to it.
+
+    Only the k most similar tools of each tool and/or the scores above a
+    threshold are kept. The matrix is computed by blocks of rows in worker
+    processes sharing the annotation matrices.
+
+    Example command usage :
+
+    python3 CLI.py similarity-matrix similarity_mi.npz -k 50 --jobs 8
+
+    or :
+
+    python3 CLI.py similarity-matrix cosine.npz -m ic-weighted -t 0.8 --max-memory 2G
+    """
+    bounds = edam.SIMILARITY_SCORE_BOUNDS.get(metric.lower())
+    if threshold is not None and bounds and not bounds[0] <= threshold <= bounds[1]:
+        raise click.BadParameter(
+            f"{threshold:g} is not in the range of the {metric.lower()} scores"
+            f" ({bounds[0]:g} to {bounds[1]:g}).",
+            param_hint="'-t' / '--threshold'",
+        )
+    if k is None and threshold is None:
+        k = 20
+    try:
+        with click.progressbar(
+            length=len(edam.get_similarity_index().engine.tools),
+            label=f"Computing the {metric.lower()} similarity matrix",
+        ) as bar:
+            matrix = edam.compute_similarity_matrix(
+                metric.lower(),
+                k=k,
+                threshold=threshold,
+                block_size=block_size,
+                max_workers=jobs,
+                max_memory=max_memory,
+                on_progress=lambda done, total: bar.update(done - bar.pos),
+            )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"  {matrix.nnz} entries kept")
+    for f in edam.save_similarity_matrix(matrix, output):
         click.echo(f"  - {f}")
 
 
+@cli.command(name="cache")
+@click.option("--clear", is_flag=True, help="Remove all the cached results.")
+def cache(clear):
+    """
+    Show the state of the on-disk SPARQL result cache, or clear it.
+
+    Results are cached per knowledge graph version, which `init` records (the
+    cache is emptied when it detects a new EDAM version or bio.tools dump).
+
+    Command usage : python3 CLI.py cache [--clear]
+    """
+    if clear:
+        edam.clear_sparql_cache()
+    info = edam.sparql_cache_info()
+    click.echo(f"Cache file : {info['path']}")
+    click.echo(f"KG version : {info['version'] or 'not recorded (run init)'}")
+    click.echo(
+        f"Entries    : {info['entries']} ({info['bytes'] / 2**20:.1f} MB"
+        f" of {info['max_bytes'] / 2**20:.0f} MB)"
+    )
+    click.echo(f"Hits       : {info['total_hits']}")
+    click.echo(f"Misses     : {info['total_misses']}")
+
+
 @click.command(name="QC")
 @click.argument("tools", nargs=-1)
+@click.option(
+    "--from-file",
+    "-F",
+    "from_file",
+    type=click.File("r"),
+    default=None,
+    help="Read tool names or URIs from a file, one per line ('-' for stdin).",
+)
 @click.option(
     "--heritage",
     "-h",
@@ -207,10 +580,10 @@ def initialize():
     "--output_format",
     "-f",
     default="json",
-    type=click.Choice(["json", "dict"], case_sensitive=False),
-    help="Output format",
+    type=click.Choice(["json", "ndjson", "dict"], case_sensitive=False),
+    help="Output format (ndjson: one compact JSON line per tool, streamed)",
 )
-def qc(tools, heritage, metric, annotations, no_annotations, output_format):
+def qc(tools, from_file, heritage, metric, annotations, no_annotations, output_format):
     """
     Show selected metrics (topicScore, operationScore, score, entropy, count) with optional EDAM annotations.
 
@@ -225,6 +598,10 @@ def qc(tools, heritage, metric, annotations, no_annotations, output_format):
     To exclude annotations from the output, see only direct annotations metrics and see selected metrics only :
     python3 CLI.py QC star -m ic -noa
 
+    To audit a whole collection, read the tools from a file (one per line, '-' for stdin)
+    and stream one JSON line per tool :
+    python3 CLI.py QC --from-file tools.txt -h -m all -f ndjson
+
     - topicScore: Score based on the IC (Information Content) of topics associated with a tool.
     - operationScore: Score based on the IC of operations associated with a tool.
     - score: Sum of the two previous scores.
@@ -236,6 +613,22 @@ def qc(tools, heritage, metric, annotations, no_annotations, output_format):
     # If user passed --no-annotations or -noa, override
     include_annotations = not no_annotations and annotations
 
+    if from_file is not None:
+        tools = list(tools) + edam.read_tool_list(from_file)
+
+    if output_format.lower() == "ndjson":
+        records = edam.iter_annotations_with_metrics(
+            tools,
+            annotation_types=("Topic", "Operation"),
+            heritage=heritage,
+            with_label=True,
+            metric=metric,
+            include_annotations=include_annotations,
+        )
+        for line in edam.to_ndjson(records):
+            click.echo(line)
+        return
+
     results = edam.fetch_annotations_with_metrics(
         tools,
         annotation_types=("Topic", "Operation"),
@@ -253,6 +646,14 @@ def qc(tools, heritage, metric, annotations, no_annotations, output_format):
 
 @cli.command(name="describe")
 @click.argument("tools", nargs=-1)
+@click.option(
+    "--from-file",
+    "-F",
+    "from_file",
+    type=click.File("r"),
+    default=None,
+    help="Read tool names or URIs from a file, one per line ('-' for stdin).",
+)
 @click.option(
     "--annotation",
     "-a",
@@ -280,10 +681,10 @@ def qc(tools, heritage, metric, annotations, no_annotations, output_format):
     "--output_format",
     "-f",
     default="json",
-    type=click.Choice(["json", "dict"], case_sensitive=False),
-    help="Output format",
+    type=click.Choice(["json", "ndjson", "dict"], case_sensitive=False),
+    help="Output format (ndjson: one compact JSON line per tool, streamed)",
 )
-def describe(tools, annotation, heritage, no_label, output_format):
+def describe(tools, from_file, annotation, heritage, no_label, output_format):
     """
     Describe tools with EDAM annotations can use heritage annotations.
 
@@ -294,8 +695,28 @@ def describe(tools, annotation, heritage, no_label, output_format):
     or using alias options :
 
     python3 CLI.py describe qiime2 -a T -a O -h -f json
+
+    or reading the tools from a file (one per line, '-' for stdin) :
+
+    cut -f1 tools.tsv | python3 CLI.py describe --from-file - -a T -a O
     """
 
+    if from_file is not None:
+        tools = list(tools) + edam.read_tool_list(from_file)
+
+    if output_format.lower() == "ndjson":
+        records = edam.iter_annotations(
+            tools,
+            annotation_types=annotation,
+            heritage=heritage,
+            with_label=not no_label,
+        )
+        for line in edam.to_ndjson(
+            (tool, {"annotation": anns}) for tool, anns in records
+        ):
+            click.echo(line)
+        return
+
     annotations = edam.fetch_annotations(
         tools,
         annotation_types=annotation,
@@ -1,13 +1,38 @@
 import os
+import xml.etree.ElementTree as ET
 import pandas as pd
 import IPython
 import json
 import numpy as np
 import pygraphviz as pgv
-import sparqldataframe
-from SPARQLWrapper import SPARQLWrapper, JSON
+import concurrent.futures
+import ast
+import atexit
+import bz2
+import collections.abc
+import contextlib
+import hashlib
+import inspect
+import io
+import re
+import requests
+import sqlite3
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
 from typing import Dict
 
+try:
+    import pyarrow  # noqa: F401 -- enables the columnar (Feather) snapshot
+except ImportError:
+    pyarrow = None
+
+try:
+    from scipy import sparse  # enables the mutual information engine
+except ImportError:
+    sparse = None
+
 
 # === Global variables ===
 
@@ -18,61 +43,694 @@ bioschemas_file = os.path.join(neighbor_dir, "bioschemas-dump_05_01_2025.ttl")
 edam_file = os.path.join(neighbor_dir, "EDAM_1.25.owl")
 
 
-dfTool = pd.read_csv("Dataframe/dfTool.tsv.bz2", sep="\t")  # all Tool and toolLabel
-dfToolTopic = pd.read_csv(
-    "Dataframe/dfToolTopic.tsv.bz2", sep="\t"
-)  # Tool, topic, topicLabel no transitive
-dfToolOperation = pd.read_csv(
-    "Dataframe/dfToolOperation.tsv.bz2", sep="\t"
-)  # tool, operation, operationLabel no transitive
-
-
-dfToolallmetrics = pd.read_csv(
-    "Dataframe/dfToolallmetrics.tsv.bz2", sep="\t"
-)  # All tool metrics on transitive Topic and Operation
-dfToolTopic = pd.read_csv(
-    "Dataframe/dfToolTopic.tsv.bz2", sep="\t"
-)  # Tool, topic, topicLabel no transitive
-dfToolTopicTransitive = pd.read_csv(
-    "Dataframe/dfToolTopicTransitive.tsv.bz2", sep="\t"
-)  # Tool, topic, topicLabel transitive
-dfToolOperation = pd.read_csv(
-    "Dataframe/dfToolOperation.tsv.bz2", sep="\t"
-)  # tool, operation, operationLabel no transitive
-dfToolOperationTransitive = pd.read_csv(
-    "Dataframe/dfToolOperationTransitive.tsv.bz2", sep="\t"
-)  # tool, operation, operationLabel transitive
-df_redundancy_topic = pd.read_csv(
-    "Dataframe/dfToolTopic_redundancy.tsv.bz2", sep="\t"
-)  # Identification of redundancy topic
-df_redundancy_operation = pd.read_csv(
-    "Dataframe/dfToolOperation_redundancy.tsv.bz2", sep="\t"
-)  # Identification of redundancy operation
-df_topic_no_redundancy = pd.read_csv(
-    "Dataframe/df_topic_no_redundancy.tsv.bz2", sep="\t"
-)  # tool, topic and topicLabel with no redundancy and no transitive
-df_operation_no_redundancy = pd.read_csv(
-    "Dataframe/df_operation_no_redundancy.tsv.bz2", sep="\t"
-)  # tool, operation, operationLabel with no redundancy and no transitive
-dfToolallmetrics_NT = pd.read_csv("Dataframe/dfToolallmetrics_NT.tsv.bz2", sep="\t")
-
-
-dfTopicmetrics = pd.read_csv(
-    "Dataframe/dfTopicmetrics.tsv.bz2", sep="\t"
-)  # frequence, IC and entroypy of topics unique metric inherited
-dfOperationmetrics = pd.read_csv(
-    "Dataframe/dfOperationmetrics.tsv.bz2", sep="\t"
-)  # frequence, IC and entroypy of operations unique metric inherited
-dfOperationmetrics_NT = pd.read_csv(
-    "Dataframe/dfOperationmetrics_NT.tsv.bz2", sep="\t"
-)  # frequence, IC and entroypy of operations unique metric directly assigned
-dfTopicmetrics_NT = pd.read_csv(
-    "Dataframe/dfTopicmetrics_NT.tsv.bz2", sep="\t"
-)  # frequence, IC and entroypy of topics unique metric directly assigned
-
-nbTools = len(dfTool)
-nbToolsWithTopic = dfToolTopic["tool"].nunique()
-nbToolsWithOperation = dfToolOperation["tool"].nunique()
+# === Dataframe snapshot (lazy table registry) ===
+
+dataframe_dir = "Dataframe"
+
+# Table name -> file of the Dataframe/ snapshot. Tables are only read the first
+# time they are requested (see get_table), so each command pays for the tables it uses.
+TABLE_FILES = {
+    "dfTool": "dfTool.tsv.bz2",  # all Tool and toolLabel
+    "dfToolTopic": "dfToolTopic.tsv.bz2",  # Tool, topic, topicLabel no transitive
+    "dfToolOperation": "dfToolOperation.tsv.bz2",  # tool, operation, operationLabel no transitive
+    "dfToolallmetrics": "dfToolallmetrics.tsv.bz2",  # All tool metrics on transitive Topic and Operation
+    "dfToolallmetrics_NT": "dfToolallmetrics_NT.tsv.bz2",  # All tool metrics on direct Topic and Operation
+    "dfToolallmetrics_NT_NR": "dfToolallmetrics_NT_NR.tsv.bz2",  # All tool metrics on direct Topic and Operation, no redundancy
+    "dfToolDuplicates": "dfToolDuplicates.tsv.bz2",  # clusters of tools with near-identical transitive annotations
+    "dfToolTopicTransitive": "dfToolTopicTransitive.tsv.bz2",  # Tool, topic, topicLabel transitive
+    "dfToolOperationTransitive": "dfToolOperationTransitive.tsv.bz2",  # tool, operation, operationLabel transitive
+    "df_redundancy_topic": "dfToolTopic_redundancy.tsv.bz2",  # Identification of redundancy topic
+    "df_redundancy_operation": "dfToolOperation_redundancy.tsv.bz2",  # Identification of redundancy operation
+    "df_topic_no_redundancy": "df_topic_no_redundancy.tsv.bz2",  # tool, topic and topicLabel with no redundancy and no transitive
+    "df_operation_no_redundancy": "df_operation_no_redundancy.tsv.bz2",  # tool, operation, operationLabel with no redundancy and no transitive
+    "dfTopicmetrics": "dfTopicmetrics.tsv.bz2",  # frequence, IC and entroypy of topics unique metric inherited
+    "dfOperationmetrics": "dfOperationmetrics.tsv.bz2",  # frequence, IC and entroypy of operations unique metric inherited
+    "dfOperationmetrics_NT": "dfOperationmetrics_NT.tsv.bz2",  # frequence, IC and entroypy of operations unique metric directly assigned
+    "dfTopicmetrics_NT": "dfTopicmetrics_NT.tsv.bz2",  # frequence, IC and entroypy of topics unique metric directly assigned
+    "dfTopicmetrics_NT_NR": "dfTopicmetrics_NT_NR.tsv.bz2",  # frequence, IC and entropy of topics directly assigned, no redundancy
+    "dfOperationmetrics_NT_NR": "dfOperationmetrics_NT_NR.tsv.bz2",  # frequence, IC and entropy of operations directly assigned, no redundancy
+    "DF_TOOL_NO_TRANS": "dfTool_NoTransitive.tsv.bz2",  # tool, nbTopics, nbOperations no transitive
+    "DF_TOOL_TOPICS_OPS": "dftools_nbTopics_nbOperations.tsv.bz2",  # tool, nbTopics, nbOperations transitive
+}
+
+_tables = {}
+
+# {path: table} while the writes are held by deferred_writes
+_deferred_writes = None
+
+
+def columnar_path(path: str) -> str:
+    """
+    Return the path of the columnar (Feather) copy of a .tsv.bz2 snapshot file.
+    """
+    return path.removesuffix(".tsv.bz2") + ".feather"
+
+
+def write_table(df: pd.DataFrame, output_path: str):
+    """
+    Write a table of the snapshot as a compressed TSV and, when pyarrow is
+    installed, as a typed columnar Feather file next to it.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Table to save.
+    output_path : str
+        Path of the .tsv.bz2 file.
+    """
+    if _deferred_writes is not None:
+        _deferred_writes[output_path] = df
+        return
+    df.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    _write_columnar(df, output_path)
+
+
+@contextlib.contextmanager
+def deferred_writes(max_workers: int = None):
+    """
+    Hold the writes of write_table until the end of the block, then write all
+    the tables at the same time (bz2 and Feather compression run outside the
+    GIL). Tables written several times in the block are only written once.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Number of tables written at the same time (default: number of CPUs).
+    """
+    global _deferred_writes
+    _deferred_writes = {}
+    try:
+        yield
+    finally:
+        pending, _deferred_writes = _deferred_writes, None
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers or os.cpu_count()
+        ) as pool:
+            for future in [
+                pool.submit(write_table, df, path) for path, df in pending.items()
+            ]:
+                future.result()
+
+
+def _write_columnar(df: pd.DataFrame, output_path: str):
+    if pyarrow is not None and output_path.endswith(".tsv.bz2"):
+        # Empty strings are read back from the TSV as missing values: store them
+        # the same way so that both formats hold exactly the same table.
+        df = df.reset_index(drop=True).replace("", None)
+        df.to_feather(columnar_path(output_path))
+
+
+def read_table(path: str, columns=None) -> pd.DataFrame:
+    """
+    Read a snapshot file, from its Feather copy when present and up to date,
+    otherwise from the .tsv.bz2 file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the .tsv.bz2 file.
+    columns : list[str], optional
+        Only read these columns (default: all columns).
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    feather = columnar_path(path)
+    if (
+        pyarrow is not None
+        and os.path.exists(feather)
+        and (
+            not os.path.exists(path)
+            or os.path.getmtime(feather) >= os.path.getmtime(path)
+        )
+    ):
+        return pd.read_feather(feather, columns=columns)
+    df = pd.read_csv(path, sep="\t", usecols=columns)
+    return df if columns is None else df[columns]
+
+
+def _input_table(table) -> pd.DataFrame:
+    """
+    Return an input of a derived table, given as a DataFrame or as the path of
+    its .tsv.bz2 file.
+    """
+    if isinstance(table, pd.DataFrame):
+        return table
+    return read_table(table)
+
+
+def get_table(name: str, columns=None) -> pd.DataFrame:
+    """
+    Return a table of the Dataframe/ snapshot, loading it on first use.
+
+    Parameters
+    ----------
+    name : str
+        Name of the table (a key of TABLE_FILES, e.g. "dfToolTopic").
+    columns : list[str], optional
+        Only load these columns, e.g. ["tool", "topic"] (default: all columns).
+
+    Returns
+    -------
+    pd.DataFrame
+        The table. The same object is returned on subsequent calls.
+    """
+    if name not in TABLE_FILES:
+        raise KeyError(f"Unknown table: {name}")
+    if columns is not None and name in _tables:
+        return _tables[name][list(columns)]
+    key = name if columns is None else (name, tuple(columns))
+    if key not in _tables:
+        if is_virtual_table(name):
+            df = expand_to_ancestors(
+                get_table(TRANSITIVE_TABLES[name]), ANNOTATION_TABLES[name]
+            )
+            _tables[key] = df if columns is None else df[list(columns)]
+        else:
+            _check_stored_table(name)
+            _tables[key] = read_table(
+                os.path.join(dataframe_dir, TABLE_FILES[name]),
+                columns=None if columns is None else list(columns),
+            )
+    return _tables[key]
+
+
+def clear_tables():
+    """
+    Forget the loaded tables, e.g. after `init` regenerated the Dataframe/ files.
+    """
+    _tables.clear()
+    _interned.clear()
+
+
+def write_columnar_snapshot(directory: str = None) -> list:
+    """
+    Write the Feather copy of every .tsv.bz2 file of the snapshot directory.
+
+    Parameters
+    ----------
+    directory : str, optional
+        Snapshot directory (default: dataframe_dir).
+
+    Returns
+    -------
+    list[str]
+        Paths of the written Feather files.
+    """
+    if pyarrow is None:
+        raise ImportError("pyarrow is required to write the columnar snapshot")
+    directory = directory or dataframe_dir
+    written = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".tsv.bz2"):
+            path = os.path.join(directory, filename)
+            df = pd.read_csv(path, sep="\t")
+            df.to_feather(columnar_path(path))
+            written.append(columnar_path(path))
+    return written
+
+
+def __getattr__(name):
+    """
+    Keep `EDAMannot.dfTool`, `EDAMannot.nbTools`, ... available as module attributes
+    while loading the underlying tables lazily.
+    """
+    if name in TABLE_FILES:
+        return get_table(name)
+    if name == "nbTools":
+        return len(get_table("dfTool"))
+    if name == "nbToolsWithTopic":
+        return get_table("dfToolTopic")["tool"].nunique()
+    if name == "nbToolsWithOperation":
+        return get_table("dfToolOperation")["tool"].nunique()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# === Interned URI dictionary ===
+
+# Annotation tables stored as (tool id, concept id) pairs -> column holding the concept
+ANNOTATION_TABLES = {
+    "dfToolTopic": "topic",
+    "dfToolOperation": "operation",
+    "dfToolTopicTransitive": "topic",
+    "dfToolOperationTransitive": "operation",
+    "df_topic_no_redundancy": "topic",
+    "df_operation_no_redundancy": "operation",
+}
+
+# Transitive annotation tables -> direct table they can be derived from through the
+# EDAM closure (see expand_to_ancestors)
+TRANSITIVE_TABLES = {
+    "dfToolTopicTransitive": "dfToolTopic",
+    "dfToolOperationTransitive": "dfToolOperation",
+}
+
+_interned = {}
+
+
+def is_virtual_table(name: str) -> bool:
+    """
+    Tell whether a transitive table is virtual, i.e. not stored in the snapshot
+    (see drop_transitive_tables) and derived from its direct table when needed,
+    which requires the EDAM OWL file of the snapshot's EDAM version (see
+    snapshot_hierarchy_available).
+    """
+    if name not in TRANSITIVE_TABLES:
+        return False
+    key = ("virtual", name)
+    if key not in _interned:
+        _interned[key] = not _is_stored_table(name) and snapshot_hierarchy_available()
+    return _interned[key]
+
+
+def _is_stored_table(name: str) -> bool:
+    path = os.path.join(dataframe_dir, TABLE_FILES[name])
+    return os.path.exists(path) or os.path.exists(columnar_path(path))
+
+
+def _check_stored_table(name: str):
+    """
+    Raise a FileNotFoundError naming what is missing when a transitive table that
+    is not virtual (see is_virtual_table) is not stored in the snapshot either.
+    """
+    if name not in TRANSITIVE_TABLES or _is_stored_table(name):
+        return
+    snapshotVersion = get_snapshot_edam_version()
+    if snapshotVersion is None:
+        needed = (
+            f"the EDAM version of the snapshot, which is not recorded in"
+            f" {snapshot_edam_version_path()}"
+        )
+    elif not os.path.exists(edam_file):
+        needed = f"the EDAM OWL file of EDAM {snapshotVersion}: {edam_file}"
+    else:
+        needed = (
+            f"the EDAM OWL file of EDAM {snapshotVersion}, {edam_file} is version"
+            f" {edam_owl_version()}"
+        )
+    raise FileNotFoundError(
+        f"The table {name} is not stored in the snapshot ({dataframe_dir}) and"
+        f" cannot be derived from {TRANSITIVE_TABLES[name]}: it needs {needed}"
+    )
+
+
+def drop_transitive_tables() -> list:
+    """
+    Remove the transitive tables (and their index files) from the snapshot, so that
+    they are virtual: the heritage annotations are then derived from the direct ones
+    through the EDAM closure at query time, which requires the EDAM OWL file of
+    the EDAM version the snapshot was extracted with (see
+    snapshot_hierarchy_available).
+
+    Returns
+    -------
+    list[str]
+        Paths of the removed files.
+    """
+    if not os.path.exists(edam_file):
+        raise FileNotFoundError(
+            f"The EDAM OWL file is needed to derive the transitive tables: {edam_file}"
+        )
+    if not snapshot_hierarchy_available():
+        snapshotVersion = get_snapshot_edam_version()
+        raise ValueError(
+            f"The EDAM OWL file is version {edam_owl_version()}, the snapshot was"
+            " extracted with "
+            + (
+                f"EDAM {snapshotVersion}"
+                if snapshotVersion
+                else "an unrecorded version"
+            )
+            + ": the transitive tables cannot be derived from it"
+        )
+    # Recorded next to the snapshot, which is then readable without the cache
+    record_snapshot_edam_version(get_snapshot_edam_version())
+    removed = []
+    for name in TRANSITIVE_TABLES:
+        path = os.path.join(dataframe_dir, TABLE_FILES[name])
+        paths = [path, columnar_path(path)] + [
+            os.path.join(index_dir(), f"{name}.{field}.npy")
+            for field in ("offsets", "concepts")
+        ]
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+                removed.append(path)
+    clear_tables()
+    return removed
+
+
+def index_dir() -> str:
+    """
+    Return the folder holding the binary index files built from the snapshot.
+    """
+    return os.path.join(dataframe_dir, "index")
+
+
+def index_is_fresh() -> bool:
+    """
+    Tell whether the index folder was built after the last change of the annotation tables.
+    """
+    marker = os.path.join(index_dir(), "concepts.tsv.bz2")
+    if not os.path.exists(marker):
+        return False
+    sources = [
+        os.path.join(dataframe_dir, TABLE_FILES[name])
+        for name in ["dfTool", *ANNOTATION_TABLES]
+    ]
+    return all(
+        os.path.getmtime(marker) >= os.path.getmtime(path)
+        for path in sources
+        if os.path.exists(path)
+    )
+
+
+def _build_uri_dictionary():
+    """
+    Assign a dense int32 id to every tool and every EDAM concept of the snapshot.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame]
+        (dfToolIds, dfConceptIds): the row number of each table is the id.
+    """
+    dfTool = get_table("dfTool")
+    tools = [dfTool[["tool", "toolLabel"]]]
+    concepts = []
+    for name, col in ANNOTATION_TABLES.items():
+        if is_virtual_table(name):
+            # Only the concepts are needed: the tools are those of the direct table
+            concepts.append(_virtual_concepts(name))
+            continue
+        df = get_table(name)
+        tools.append(df[["tool"]])
+        concepts.append(
+            df[[col, col + "Label"]].set_axis(["concept", "conceptLabel"], axis=1)
+        )
+
+    dfToolIds = (
+        pd.concat(tools, ignore_index=True)
+        .drop_duplicates(subset="tool", keep="first")
+        .reset_index(drop=True)
+    )
+    dfConceptIds = (
+        pd.concat(concepts, ignore_index=True)
+        .sort_values("conceptLabel", na_position="last")
+        .drop_duplicates(subset="concept", keep="first")
+        .sort_values("concept")
+        .reset_index(drop=True)
+    )
+    return dfToolIds, dfConceptIds
+
+
+def _virtual_concepts(name: str) -> pd.DataFrame:
+    """
+    Return the concepts of a virtual transitive table: the EDAM ancestors (or self)
+    of the concepts of its direct table, with columns ["concept", "conceptLabel"].
+    """
+    col = ANNOTATION_TABLES[name]
+    direct = get_table(TRANSITIVE_TABLES[name], columns=[col])[col].unique()
+    concepts = expand_to_ancestors(
+        pd.DataFrame({"tool": direct, col: direct}), col
+    ).drop_duplicates(subset=col)
+    return concepts[[col, col + "Label"]].set_axis(["concept", "conceptLabel"], axis=1)
+
+
+def _intern_table(df, col, toolIndex, conceptIndex):
+    """
+    Encode the (tool, concept) columns of an annotation table as int32 ids.
+    """
+    return pd.DataFrame(
+        {
+            "toolId": toolIndex.get_indexer(df["tool"]).astype(np.int32),
+            "conceptId": conceptIndex.get_indexer(df[col]).astype(np.int32),
+        }
+    )
+
+
+def _build_csr(ids: pd.DataFrame, nbToolIds: int):
+    """
+    Build the CSR (compressed sparse row) form of an interned annotation table.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (offsets, concepts): the concept ids of tool t are
+        concepts[offsets[t]:offsets[t + 1]], in the row order of the original table.
+    """
+    toolIds = ids["toolId"].to_numpy()
+    order = np.argsort(toolIds, kind="stable")
+    offsets = np.zeros(nbToolIds + 1, dtype=np.int64)
+    np.cumsum(np.bincount(toolIds, minlength=nbToolIds), out=offsets[1:])
+    return offsets, ids["conceptId"].to_numpy()[order].astype(np.int32)
+
+
+def build_uri_index(output_dir: str = None) -> list:
+    """
+    Intern the tool and concept URIs of the snapshot and save, for each annotation
+    table, a CSR index {tool id -> concept ids}.
+
+    The URIs and labels are saved in two small side tables (tools.tsv.bz2 and
+    concepts.tsv.bz2, where the row number is the id); each annotation table of
+    ANNOTATION_TABLES is saved as <name>.offsets.npy (int64, one entry per tool
+    plus one) and <name>.concepts.npy (int32), which are opened memory-mapped.
+
+    Parameters
+    ----------
+    output_dir : str, optional
+        Destination folder (default: index_dir()).
+
+    Returns
+    -------
+    list[str]
+        Paths of the written files.
+    """
+    output_dir = output_dir or index_dir()
+    os.makedirs(output_dir, exist_ok=True)
+    dfToolIds, dfConceptIds = _build_uri_dictionary()
+    toolIndex = pd.Index(dfToolIds["tool"])
+    conceptIndex = pd.Index(dfConceptIds["concept"])
+
+    written = []
+    for name, col in ANNOTATION_TABLES.items():
+        if is_virtual_table(name):
+            continue
+        ids = _intern_table(get_table(name), col, toolIndex, conceptIndex)
+        csr = _build_csr(ids, len(toolIndex))
+        for field, array in zip(("offsets", "concepts"), csr):
+            path = os.path.join(output_dir, f"{name}.{field}.npy")
+            np.save(path, array)
+            written.append(path)
+
+    # Side tables are written last: their date marks the index as up to date
+    for filename, df in (("tools", dfToolIds), ("concepts", dfConceptIds)):
+        path = os.path.join(output_dir, f"{filename}.tsv.bz2")
+        write_table(df, path)
+        written.append(path)
+
+    _interned.clear()
+    return written
+
+
+def get_uri_dictionary():
+    """
+    Return the side tables of the interned URI dictionary, from the index folder
+    when it is up to date, otherwise computed from the snapshot tables.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame]
+        (dfToolIds, dfConceptIds), with columns ["tool", "toolLabel"] and
+        ["concept", "conceptLabel"]. The row number of each table is the id.
+    """
+    if "dictionary" not in _interned:
+        if index_is_fresh():
+            _interned["dictionary"] = (
+                read_table(os.path.join(index_dir(), "tools.tsv.bz2")),
+                read_table(os.path.join(index_dir(), "concepts.tsv.bz2")),
+            )
+        else:
+            _interned["dictionary"] = _build_uri_dictionary()
+    return _interned["dictionary"]
+
+
+def tool_index() -> pd.Index:
+    """
+    Return the index mapping a tool URI to its id (use get_loc / get_indexer).
+    """
+    if "toolIndex" not in _interned:
+        _interned["toolIndex"] = pd.Index(get_uri_dictionary()[0]["tool"])
+    return _interned["toolIndex"]
+
+
+def concept_index() -> pd.Index:
+    """
+    Return the index mapping an EDAM concept URI to its id (use get_loc / get_indexer).
+    """
+    if "conceptIndex" not in _interned:
+        _interned["conceptIndex"] = pd.Index(get_uri_dictionary()[1]["concept"])
+    return _interned["conceptIndex"]
+
+
+def get_csr_index(name: str):
+    """
+    Return the CSR index {tool id -> concept ids} of an annotation table.
+
+    The arrays are memory-mapped from the index folder when it is up to date
+    (so loading is immediate and the pages are shared between processes),
+    otherwise they are computed in memory from the snapshot table.
+
+    Parameters
+    ----------
+    name : str
+        Name of the annotation table (a key of ANNOTATION_TABLES).
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (offsets, concepts): the concept ids of tool t are
+        concepts[offsets[t]:offsets[t + 1]].
+    """
+    if name not in ANNOTATION_TABLES:
+        raise KeyError(f"Not an annotation table: {name}")
+    key = ("csr", name)
+    if key not in _interned and is_virtual_table(name):
+        conceptIds, offsets = _expand_tools_concept_ids(
+            name, np.arange(len(tool_index()))
+        )
+        _interned[key] = (offsets, conceptIds)
+    if key not in _interned:
+        paths = [
+            os.path.join(index_dir(), f"{name}.{field}.npy")
+            for field in ("offsets", "concepts")
+        ]
+        if index_is_fresh() and all(os.path.exists(path) for path in paths):
+            _interned[key] = tuple(np.load(path, mmap_mode="r") for path in paths)
+        else:
+            ids = _intern_table(
+                get_table(name), ANNOTATION_TABLES[name], tool_index(), concept_index()
+            )
+            _interned[key] = _build_csr(ids, len(tool_index()))
+    return _interned[key]
+
+
+def get_tool_concept_ids(name: str, toolId: int) -> np.ndarray:
+    """
+    Return the concept ids annotating a tool in an annotation table (O(k) slice).
+
+    Parameters
+    ----------
+    name : str
+        Name of the annotation table (a key of ANNOTATION_TABLES).
+    toolId : int
+        Id of the tool (see tool_index). Negative ids have no annotation.
+    """
+    offsets, concepts = get_csr_index(name)
+    if toolId < 0:
+        return concepts[:0]
+    return concepts[offsets[toolId] : offsets[toolId + 1]]
+
+
+def get_tools_concept_ids(name: str, toolIds) -> tuple:
+    """
+    Gather the concept ids annotating many tools in one vectorized pass over the
+    CSR index of an annotation table.
+
+    Parameters
+    ----------
+    name : str
+        Name of the annotation table (a key of ANNOTATION_TABLES).
+    toolIds : array-like of int
+        Ids of the tools (see tool_index). Negative ids have no annotation.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (conceptIds, bounds): the concept ids of toolIds[i] are
+        conceptIds[bounds[i]:bounds[i + 1]].
+    """
+    if is_virtual_table(name) and ("csr", name) not in _interned:
+        return _expand_tools_concept_ids(name, toolIds)
+    offsets, concepts = get_csr_index(name)
+    toolIds = np.asarray(toolIds, dtype=np.int64)
+    known = toolIds >= 0
+    rows = np.where(known, toolIds, 0)
+    starts = np.where(known, offsets[rows], 0)
+    lengths = np.where(known, offsets[rows + 1], 0) - starts
+    bounds = np.zeros(len(toolIds) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=bounds[1:])
+    positions = np.arange(bounds[-1]) + np.repeat(starts - bounds[:-1], lengths)
+    return np.asarray(concepts)[positions], bounds
+
+
+def _expand_tools_concept_ids(name: str, toolIds) -> tuple:
+    """
+    Gather the concept ids of many tools in a virtual transitive table: the direct
+    concept ids are expanded through the EDAM ancestor index, then deduplicated
+    (and sorted) per tool. Same result as get_tools_concept_ids.
+    """
+    if "closureIds" not in _interned:
+        closureConcepts = get_edam_ancestor_index()[0]
+        _interned["closureIds"] = (
+            pd.Index(closureConcepts).get_indexer(concept_index()),
+            concept_index().get_indexer(closureConcepts),
+        )
+    toClosure, fromClosure = _interned["closureIds"]
+    _, offsets, ancestors = get_edam_ancestor_index()
+
+    direct, directBounds = get_tools_concept_ids(TRANSITIVE_TABLES[name], toolIds)
+    owners = np.repeat(np.arange(len(directBounds) - 1), np.diff(directBounds))
+    rows = toClosure[direct]
+    owners, rows = owners[rows >= 0], rows[rows >= 0]
+
+    counts = offsets[rows + 1] - offsets[rows]
+    starts = np.repeat(offsets[rows] - (np.cumsum(counts) - counts), counts)
+    conceptIds = fromClosure[ancestors[starts + np.arange(int(counts.sum()))]]
+    owners = np.repeat(owners, counts)
+    owners, conceptIds = owners[conceptIds >= 0], conceptIds[conceptIds >= 0]
+
+    # One key per (tool, concept) pair: np.unique deduplicates and groups by tool
+    nbConcepts = len(concept_index())
+    keys = np.unique(owners.astype(np.int64) * nbConcepts + conceptIds)
+    bounds = np.searchsorted(keys // nbConcepts, np.arange(len(directBounds)))
+    return (keys % nbConcepts).astype(np.int32), bounds.astype(np.int64)
+
+
+def get_interned_table(name: str) -> pd.DataFrame:
+    """
+    Return an annotation table as int32 (toolId, conceptId) pairs, grouped by tool.
+
+    Parameters
+    ----------
+    name : str
+        Name of the annotation table (a key of ANNOTATION_TABLES).
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns "toolId" and "conceptId".
+    """
+    offsets, concepts = get_csr_index(name)
+    toolIds = np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+    return pd.DataFrame({"toolId": toolIds, "conceptId": np.asarray(concepts)})
+
+
+def _tool_rows(name: str) -> np.ndarray:
+    """
+    Return, for a per-tool table of the registry, the array {tool id -> row number}
+    (-1 when the tool has no row).
+    """
+    key = ("rows", name)
+    if key not in _interned:
+        df = get_table(name)
+        rows = np.full(len(tool_index()), -1, dtype=np.int64)
+        positions = tool_index().get_indexer(df["tool"])
+        found = positions >= 0
+        # keep the first row of each tool, as df[df["tool"] == tool].iloc[0] does
+        rows[positions[found][::-1]] = np.flatnonzero(found)[::-1]
+        _interned[key] = rows
+    return _interned[key]
 
 
 # Configuration SPARQL end point
@@ -120,1495 +778,3920 @@ def set_file_paths(new_bioschemas_file: str = None, new_edam_file: str = None):
         edam_file = os.path.abspath(new_edam_file)
 
 
-def displaySparqlResults(results):
+# === Local EDAM hierarchy ===
+
+rdfNS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+rdfsNS = "http://www.w3.org/2000/01/rdf-schema#"
+owlNS = "http://www.w3.org/2002/07/owl#"
+oboInOwlNS = "http://www.geneontology.org/formats/oboInOwl#"
+owlDeprecatedClass = owlNS + "DeprecatedClass"
+
+_edam_hierarchy = {}
+_edam_hierarchy_lock = threading.Lock()
+
+
+def parse_edam_owl(path: str) -> dict:
     """
-    Displays as HTML the result of a SPARQLWrapper query in a Jupyter notebook.
+    Parse an EDAM OWL (RDF/XML) file into plain adjacency structures.
 
-        Parameters:
-            results (dictionnary): the result of a call to SPARQLWrapper.query().convert()
+    Parameters
+    ----------
+    path : str
+        Path of the EDAM OWL file.
+
+    Returns
+    -------
+    dict
+        "version": owl:versionIRI of the ontology (None if absent),
+        "classes": URIs declared as owl:Class,
+        "parents": {URI -> URIs of its direct named superclasses},
+        "labels": {URI -> rdfs:label},
+        "deprecated": URIs flagged with owl:deprecated true,
+        "consider": {URI -> URIs of its oboInOwl:consider alternatives},
+        "restrictions": {URI -> [property, neighbor] pairs of its
+        owl:someValuesFrom restrictions}.
     """
-    variableNames = results["head"]["vars"]
-    # tableCode = '<table><tr><th>{}</th></tr><tr>{}</tr></table>'.format('</th><th>'.join(variableNames), '</tr><tr>'.join('<td>{}</td>'.format('</td><td>'.join([row[vName]['value'] for vName in variableNames]))for row in results["results"]["bindings"]))
-    tableCode = "<table><tr><th>{}</th></tr><tr>{}</tr></table>".format(
-        "</th><th>".join(variableNames),
-        "</tr><tr>".join(
-            "<td>{}</td>".format(
-                "</td><td>".join(
-                    [
-                        row[vName]["value"] if vName in row.keys() else "&nbsp;"
-                        for vName in variableNames
-                    ]
-                )
+    root = ET.parse(path).getroot()
+    base = root.get("{http://www.w3.org/XML/1998/namespace}base", "")
+
+    def resolve(element, attribute):
+        value = element.get("{" + rdfNS + "}" + attribute)
+        if value is None and attribute == "about":
+            ident = element.get("{" + rdfNS + "}ID")
+            value = None if ident is None else "#" + ident
+        if value is not None and not value.startswith("http"):
+            value = (
+                base + value
+                if value.startswith("#")
+                else base.rstrip("/") + "/" + value
             )
-            for row in results["results"]["bindings"]
-        ),
-    )
-    IPython.display.display(IPython.display.HTML(tableCode))
+        return value
+
+    hierarchy = {
+        "version": None,
+        "classes": [],
+        "parents": {},
+        "labels": {},
+        "deprecated": [],
+        "consider": {},
+        "restrictions": {},
+    }
+    for element in root:
+        if element.tag == "{" + owlNS + "}Ontology":
+            versionIRI = element.find("{" + owlNS + "}versionIRI")
+            if versionIRI is not None:
+                hierarchy["version"] = resolve(versionIRI, "resource")
+            continue
+        if element.tag == "{" + owlNS + "}Class":
+            uri = resolve(element, "about")
+        elif element.tag == "{" + rdfNS + "}Description" and any(
+            resolve(t, "resource") == owlNS + "Class"
+            for t in element.findall("{" + rdfNS + "}type")
+        ):
+            uri = resolve(element, "about")
+        else:
+            continue
+        if uri is None:
+            continue
+
+        hierarchy["classes"].append(uri)
+        for child in element:
+            if child.tag == "{" + rdfsNS + "}subClassOf":
+                parent = resolve(child, "resource")
+                if parent is not None:
+                    hierarchy["parents"].setdefault(uri, []).append(parent)
+                for restriction in child.findall("{" + owlNS + "}Restriction"):
+                    relation = restriction.find("{" + owlNS + "}onProperty")
+                    neighbor = restriction.find("{" + owlNS + "}someValuesFrom")
+                    if relation is not None and neighbor is not None:
+                        hierarchy["restrictions"].setdefault(uri, []).append(
+                            [
+                                resolve(relation, "resource"),
+                                resolve(neighbor, "resource"),
+                            ]
+                        )
+            elif child.tag == "{" + rdfsNS + "}label":
+                hierarchy["labels"].setdefault(uri, child.text or "")
+            elif child.tag == "{" + owlNS + "}deprecated":
+                if (child.text or "").strip().lower() == "true":
+                    hierarchy["deprecated"].append(uri)
+            elif child.tag == "{" + oboInOwlNS + "}consider":
+                alternative = resolve(child, "resource")
+                if alternative is not None:
+                    hierarchy["consider"].setdefault(uri, []).append(alternative)
+    return hierarchy
+
+
+def _edam_file_fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def edam_version_number(versionIRI: str) -> float:
+    """
+    Return the EDAM version number of an owl:versionIRI, e.g. 1.25 for
+    http://edamontology.org/1.25 (as get_edam_version), or None.
+    """
+    if not versionIRI:
+        return None
+    try:
+        return float(versionIRI.replace(edamURI, ""))
+    except ValueError:
+        return None
 
 
-def sparql_results_to_dataframe(results):
+def edam_owl_version() -> float:
     """
-    Convert SPARQL JSON results to pandas DataFrame
+    Return the EDAM version of the OWL file edam_file (see edam_version_number),
+    or None if the file is missing or has no owl:versionIRI.
     """
-    # Extract variable names and bindings
-    variable_names = results["head"]["vars"]
-    bindings = results["results"]["bindings"]
+    if not os.path.exists(edam_file):
+        return None
+    return edam_version_number(get_edam_hierarchy()["version"])
 
-    # Create a list to store rows
-    rows = []
 
-    # Process each row
-    for row in bindings:
-        row_data = {}
-        for var_name in variable_names:
-            # if variable exists in row keys, get its value, else use None
-            if var_name in row.keys():
-                row_data[var_name] = row[var_name]["value"]
-            else:
-                row_data[var_name] = None
-        rows.append(row_data)
+def edam_hierarchy_available() -> bool:
+    """
+    Tell whether the local EDAM hierarchy can be used: the EDAM OWL file
+    edam_file exists and is the version of EDAM loaded in the knowledge graph
+    (see get_kg_edam_version). Otherwise, the hierarchy, the transitive and the
+    redundancy tables are queried from the SPARQL endpoint, so that they stay
+    consistent with the annotations extracted from it.
+    """
+    if not os.path.exists(edam_file):
+        return False
+    version = get_kg_edam_version()
+    return version is not None and edam_owl_version() == version
 
-    # Create DataFrame
-    df = pd.DataFrame(rows, columns=variable_names)
 
-    return df
+def snapshot_hierarchy_available() -> bool:
+    """
+    Tell whether the transitive tables of the snapshot can be derived from its
+    direct tables (see is_virtual_table): the EDAM OWL file edam_file exists and
+    is the version of EDAM of the knowledge graph the snapshot was extracted
+    from, as recorded by `init` (see get_snapshot_edam_version).
+    """
+    if not os.path.exists(edam_file):
+        return False
+    version = get_snapshot_edam_version()
+    return version is not None and edam_owl_version() == version
 
 
-def get_edam_version(endpointURL, prefixes):
-    query = """
-    SELECT ?ontology ?versionIRI (REPLACE(STR(?versionIRI), 'http://edamontology.org/', '') AS ?versionNumber)
-    WHERE {
-      ?ontology rdf:type owl:Ontology .
-      ?ontology owl:versionIRI ?versionIRI .
-    }
+def get_edam_hierarchy() -> dict:
     """
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-
-    # Extract the version number from the first result
-    version_str = results["results"]["bindings"][0]["versionNumber"]["value"]
-    return float(version_str)
+    Return the EDAM hierarchy parsed from edam_file (see parse_edam_owl), with the
+    children adjacency added under "children".
 
+    The parsed hierarchy is cached in the index folder (edam_hierarchy.json) and
+    only parsed again when the EDAM file changes.
+    """
+    fingerprint = _edam_file_fingerprint(edam_file)
+    if _edam_hierarchy.get("source") == fingerprint:
+        return _edam_hierarchy
+
+    with _edam_hierarchy_lock:
+        if _edam_hierarchy.get("source") == fingerprint:
+            return _edam_hierarchy
+        cache_path = os.path.join(index_dir(), "edam_hierarchy.json")
+        hierarchy = None
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                hierarchy = json.load(f)
+            # Caches written before the version was parsed are parsed again
+            if hierarchy.get("source") != fingerprint or "version" not in hierarchy:
+                hierarchy = None
+        if hierarchy is None:
+            hierarchy = parse_edam_owl(edam_file)
+            hierarchy["source"] = fingerprint
+            os.makedirs(index_dir(), exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump(hierarchy, f)
+
+        children = {}
+        for uri, parents in hierarchy["parents"].items():
+            for parent in parents:
+                children.setdefault(parent, []).append(uri)
+
+        _edam_hierarchy.clear()
+        _edam_hierarchy.update(
+            {key: value for key, value in hierarchy.items() if key != "source"}
+        )
+        _edam_hierarchy["classes"] = set(hierarchy["classes"])
+        _edam_hierarchy["deprecated"] = set(hierarchy["deprecated"])
+        _edam_hierarchy["children"] = children
+        _edam_hierarchy["closure"] = {}
+        # Set last: the unlocked check above only trusts a complete hierarchy
+        _edam_hierarchy["source"] = fingerprint
+        return _edam_hierarchy
 
-def getHierarchyGraph(
-    entityURI,
-    graph=None,
-    direction="ancestors",
-    displayIdentifier=False,
-    highlightEntity=False,
-):
-    """Return a graph representing the hierarchy of (in)direct superclasses or subclasses for an entity.
 
-    Keyword arguments:
-    entityURI -- the URI for the entity
-    graph -- the graph in which the hierarchy is added. A new graph is created if the value is None. (default: None)
-    direction -- should the hierarchy concern the ancestors and/or the descendants of the entity. Possible values: "ancestors", "descendants", "both" (default: "ancestors")
-    displayIdentifier -- should the nodes also display their URI (default: False)
-    highlightEntity -- should the entity be highlighted (default:False)
+def normalize_edam_uri(uri: str) -> str:
     """
-    if graph is None:
-        # graph = Digraph(graph_attr={'rankdir': 'BT'})
-        graph = pgv.AGraph(directed=True, rankdir="BT")
+    Return the full URI of an EDAM concept given as a URI, <URI> or edam:ident.
+    """
+    uri = uri.strip().removeprefix("<").removesuffix(">")
+    if uri.startswith("edam:"):
+        return edamURI + uri.removeprefix("edam:")
+    return uri
 
-    entityIdent = entityURI.replace(edamURI, "").replace("edam:", "")
 
-    entityType = "Class"
-    if entityIdent.startswith("topic_"):
-        entityType = "Topic"
-    elif entityIdent.startswith("operation_"):
-        entityType = "Operation"
+def _edam_closure(uri: str, adjacency: str) -> frozenset:
+    """
+    Return the concepts reachable from uri through "parents" or "children" (uri included).
+    """
+    hierarchy = get_edam_hierarchy()
+    key = (adjacency, uri)
+    if key not in hierarchy["closure"]:
+        reached = {uri}
+        stack = [uri]
+        while stack:
+            for neighbor in hierarchy[adjacency].get(stack.pop(), ()):
+                if neighbor not in reached:
+                    reached.add(neighbor)
+                    stack.append(neighbor)
+        hierarchy["closure"][key] = frozenset(reached)
+    return hierarchy["closure"][key]
+
+
+def get_edam_ancestors(uri: str, reflexive: bool = False) -> set:
+    """
+    Return the (in)direct superclasses of an EDAM concept (rdfs:subClassOf+, or
+    rdfs:subClassOf* if reflexive is True).
+    """
+    uri = normalize_edam_uri(uri)
+    ancestors = _edam_closure(uri, "parents")
+    return set(ancestors) if reflexive else ancestors - {uri}
 
-    conceptStyle = {}
-    conceptStyle["Class"] = "filled"
-    conceptStyle["Tool"] = "filled"
-    conceptStyle["Topic"] = "filled"
-    conceptStyle["Operation"] = "rounded,filled"
 
-    if entityURI.startswith("http"):
-        entityURI = "<" + entityURI + ">"
+def get_edam_descendants(uri: str, reflexive: bool = False) -> set:
+    """
+    Return the (in)direct subclasses of an EDAM concept (inverse of rdfs:subClassOf+,
+    or of rdfs:subClassOf* if reflexive is True).
+    """
+    uri = normalize_edam_uri(uri)
+    descendants = _edam_closure(uri, "children")
+    return set(descendants) if reflexive else descendants - {uri}
 
-    if (direction == "ancestors") or (direction == "both"):
-        query = (
-            """
-SELECT DISTINCT ?subConcept ?subConceptLabel ?superConcept ?superConceptLabel
-WHERE {
-  VALUES ?concept { """
-            + entityURI
-            + """ }
- 
-  ?concept rdfs:subClassOf* ?subConcept .
-  ?subConcept rdf:type owl:Class .
-  FILTER NOT EXISTS { ?subConcept rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?subConcept rdfs:label ?subLabel }
-  ?subConcept rdfs:subClassOf ?superConcept .
-  ?superConcept rdf:type owl:Class .
-  FILTER NOT EXISTS { ?superConcept rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?superConcept rdfs:label ?supLabel }
-  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
-  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
-}
-"""
-        )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        for result in results["results"]["bindings"]:
-            startClassIdent = result["subConcept"]["value"].replace(edamURI, "")
-            startClassLabel = result["subConceptLabel"]["value"] + (
-                "\n(" + startClassIdent + ")" if displayIdentifier else ""
-            )
-            endClassIdent = result["superConcept"]["value"].replace(edamURI, "")
-            endClassLabel = result["superConceptLabel"]["value"] + (
-                "\n(" + endClassIdent + ")" if displayIdentifier else ""
-            )
 
-            # graph.node(startClassIdent, label=startClassLabel, shape="box")
-            # graph.node(endClassIdent, label=endClassLabel, shape="box")
-            # graph.edge(startClassIdent, endClassIdent, arrowhead="onormal")
-            graph.add_node(
-                startClassIdent,
-                label=startClassLabel,
-                shape="box",
-                color="black",
-                nodeType=entityType,
-                style=conceptStyle[entityType],
-                fillcolor="#ffffff",
-            )
-            graph.add_node(
-                endClassIdent,
-                label=endClassLabel,
-                shape="box",
-                color="black",
-                nodeType=entityType,
-                style=conceptStyle[entityType],
-                fillcolor="#ffffff",
-            )
-            graph.add_edge(startClassIdent, endClassIdent, arrowhead="onormal")
+def is_edam_class(uri: str) -> bool:
+    """
+    Tell whether a concept is a current EDAM class, i.e. declared as owl:Class and
+    not rdfs:subClassOf? owl:DeprecatedClass (the filter used by all the queries).
+    """
+    hierarchy = get_edam_hierarchy()
+    return (
+        uri in hierarchy["classes"]
+        and uri != owlDeprecatedClass
+        and owlDeprecatedClass not in hierarchy["parents"].get(uri, ())
+    )
 
-    if (direction == "descendants") or (direction == "both"):
-        query = (
-            """
-SELECT DISTINCT ?subConcept ?subConceptLabel ?superConcept ?superConceptLabel
-WHERE {
-  VALUES ?concept { """
-            + entityURI
-            + """ }
-  
-  ?superConcept rdfs:subClassOf* ?concept .
-  ?superConcept rdf:type owl:Class .
-  FILTER NOT EXISTS { ?superConcept rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?superConcept rdfs:label ?supLabel }
-  ?subConcept rdfs:subClassOf ?superConcept .
-  ?subConcept rdf:type owl:Class .
-  FILTER NOT EXISTS { ?subConcept rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?subConcept rdfs:label ?subLabel }
 
-  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
-  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
-}
-"""
-        )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        for result in results["results"]["bindings"]:
-            startClassIdent = result["subConcept"]["value"].replace(edamURI, "")
-            startClassLabel = result["subConceptLabel"]["value"] + (
-                "\n(" + startClassIdent + ")" if displayIdentifier else ""
-            )
-            endClassIdent = result["superConcept"]["value"].replace(edamURI, "")
-            endClassLabel = result["superConceptLabel"]["value"] + (
-                "\n(" + endClassIdent + ")" if displayIdentifier else ""
-            )
+def is_edam_deprecated(uri: str) -> bool:
+    """
+    Tell whether a concept is deprecated (subclass of owl:DeprecatedClass or owl:deprecated true).
+    """
+    hierarchy = get_edam_hierarchy()
+    uri = normalize_edam_uri(uri)
+    return uri in hierarchy["deprecated"] or (
+        owlDeprecatedClass in hierarchy["parents"].get(uri, ())
+    )
 
-            # graph.node(startClassIdent, label=startClassLabel, shape="box")
-            # graph.node(endClassIdent, label=endClassLabel, shape="box")
-            # graph.edge(startClassIdent, endClassIdent, arrowhead="onormal")
-            graph.add_node(
-                startClassIdent,
-                label=startClassLabel,
-                shape="box",
-                color="black",
-                nodeType=entityType,
-                style=conceptStyle[entityType],
-                fillcolor="#ffffff",
-            )
-            graph.add_node(
-                endClassIdent,
-                label=endClassLabel,
-                shape="box",
-                color="black",
-                nodeType=entityType,
-                style=conceptStyle[entityType],
-                fillcolor="#ffffff",
-            )
-            graph.add_edge(startClassIdent, endClassIdent, arrowhead="onormal")
 
-    if highlightEntity:
-        if graph.has_node(entityIdent):
-            graph.get_node(entityIdent).attr["color"] = "red"
-        else:
-            graph.add_node(entityIdent, color="red")
-    return graph
+def get_edam_label(uri: str) -> str:
+    """
+    Return the rdfs:label of an EDAM concept (or empty string if no label is present).
+    """
+    return get_edam_hierarchy()["labels"].get(normalize_edam_uri(uri), "")
 
 
-def get_edam_neighbors_dataframe(endpointURL, prefixes):
+def get_edam_alternatives(uri: str) -> list:
     """
-    Execute SPARQL query to find EDAM concepts with neighbors and save as DataFrame/TSV.BZ2
+    Return the oboInOwl:consider alternatives of a (deprecated) EDAM concept.
+    """
+    return list(get_edam_hierarchy()["consider"].get(normalize_edam_uri(uri), []))
 
-    Parameters:
-    - endpoint_url: SPARQL endpoint URL
-    - prefixes: SPARQL prefixes string
-    - output_file: Optional output filename for TSV.BZ2 file
 
-    Returns:
-    - pandas DataFrame with query results
+def get_edam_hierarchy_edges(uri: str, direction: str = "ancestors") -> list:
     """
+    Return the rdfs:subClassOf edges between current EDAM classes above and/or below
+    a concept, as computed by the hierarchy queries of getHierarchyGraph.
 
-    query = """
-    # Find EDAM concept with neighbors that inherit other neighbors from one of its ancestors
-    SELECT DISTINCT ?concept ?conceptLabel ?neighborRelation ?conceptNeighbor ?conceptNeighborLabel ?conceptAncestor ?conceptAncestorLabel ?ancestorNeighborRelation ?conceptAncestorNeighbor ?conceptAncestorNeighborLabel 
-    WHERE {
-      ?concept rdf:type owl:Class .
-      OPTIONAL { ?concept rdfs:label ?conceptLabel . }
-      FILTER NOT EXISTS { ?concept rdfs:subClassOf? owl:DeprecatedClass }
-      
-      ?concept rdfs:subClassOf [
-        rdf:type owl:Restriction ;
-        owl:onProperty ?neighborRelation ;
-        owl:someValuesFrom ?conceptNeighbor
-      ] .
-      ?conceptNeighbor rdf:type owl:Class .
-      FILTER NOT EXISTS { ?conceptNeighbor rdfs:subClassOf? owl:DeprecatedClass }
-      OPTIONAL { ?conceptNeighbor rdfs:label ?conceptNeighborLabel . }
-      
-      ?concept rdfs:subClassOf+ ?conceptAncestor .
-      OPTIONAL { ?conceptAncestor rdfs:label ?conceptAncestorLabel . }
-      FILTER NOT EXISTS { ?conceptAncestor rdfs:subClassOf? owl:DeprecatedClass }
-      
-      ?conceptAncestor rdfs:subClassOf [
-        rdf:type owl:Restriction ;
-        owl:onProperty ?ancestorNeighborRelation ;
-        owl:someValuesFrom ?conceptAncestorNeighbor
-      ] .
-      ?conceptAncestorNeighbor rdf:type owl:Class .
-      FILTER NOT EXISTS { ?conceptAncestorNeighbor rdfs:subClassOf? owl:DeprecatedClass }
-      OPTIONAL { ?conceptAncestorNeighbor rdfs:label ?conceptAncestorNeighborLabel . }
-    }
+    Parameters
+    ----------
+    uri : str
+        URI of the concept.
+    direction : str
+        "ancestors", "descendants" or "both" (default: "ancestors").
+
+    Returns
+    -------
+    list[tuple[str, str, str, str]]
+        (subConceptURI, subConceptLabel, superConceptURI, superConceptLabel) tuples.
     """
+    hierarchy = get_edam_hierarchy()
+    uri = normalize_edam_uri(uri)
+    labels = hierarchy["labels"]
+    edges = set()
+    if direction in ("ancestors", "both"):
+        for sub in get_edam_ancestors(uri, reflexive=True):
+            if is_edam_class(sub):
+                for sup in hierarchy["parents"].get(sub, ()):
+                    if is_edam_class(sup):
+                        edges.add((sub, sup))
+    if direction in ("descendants", "both"):
+        for sup in get_edam_descendants(uri, reflexive=True):
+            if is_edam_class(sup):
+                for sub in hierarchy["children"].get(sup, ()):
+                    if is_edam_class(sub):
+                        edges.add((sub, sup))
+    return [
+        (sub, labels.get(sub, ""), sup, labels.get(sup, ""))
+        for sub, sup in sorted(edges)
+    ]
 
-    # Execute SPARQL query
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
 
-    # Convert to pandas DataFrame using the adapted function
-    df = sparql_results_to_dataframe(results)
-    return df
+def get_edam_neighbors(uri: str) -> list:
+    """
+    Return the owl:someValuesFrom restrictions of a concept and of its current EDAM
+    ancestors, as computed by the neighbor query of getEntityDescriptionGraph.
+
+    Returns
+    -------
+    list[tuple[str, str, str]]
+        (relationURI, neighborURI, neighborLabel) tuples.
+    """
+    hierarchy = get_edam_hierarchy()
+    neighbors = set()
+    for ancestor in get_edam_ancestors(uri, reflexive=True):
+        if is_edam_class(ancestor):
+            for relation, neighbor in hierarchy["restrictions"].get(ancestor, ()):
+                neighbors.add((relation, neighbor))
+    return [
+        (relation, neighbor, hierarchy["labels"].get(neighbor, ""))
+        for relation, neighbor in sorted(neighbors)
+    ]
 
 
-def get_edam_chained_neighbors_dataframe(endpointURL, prefixes):
+def get_edam_closure() -> tuple:
     """
-    Execute SPARQL query to find EDAM concepts with chained neighbors and save as DataFrame/TSV.BZ2
+    Return the reflexive ancestor closure of the EDAM concepts, as one bitset per concept.
 
-    Parameters:
-    - endpoint_url: SPARQL endpoint URL
-    - prefixes: SPARQL prefixes string
-    - output_file: Optional output filename for TSV.BZ2 file
+    Only current EDAM classes (see is_edam_class) are set in the bitsets, which is
+    what the rdfs:subClassOf* queries keep with their owl:DeprecatedClass filter.
 
-    Returns:
-    - pandas DataFrame with chained neighbor relationships
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The sorted concept URIs, and a (nbConcepts, ceil(nbConcepts / 8)) uint8 array
+        whose row i has bit j set if concepts[j] is an ancestor (or self) of concepts[i].
+    """
+    hierarchy = get_edam_hierarchy()
+    if "bitsets" not in hierarchy:
+        concepts = np.array(sorted(hierarchy["classes"]), dtype=object)
+        conceptIndex = {uri: i for i, uri in enumerate(concepts)}
+        current = np.array([is_edam_class(uri) for uri in concepts])
+        closure = np.zeros((len(concepts), len(concepts)), dtype=bool)
+        for i, uri in enumerate(concepts):
+            ancestors = [
+                conceptIndex[a]
+                for a in get_edam_ancestors(uri, reflexive=True)
+                if a in conceptIndex
+            ]
+            closure[i, ancestors] = True
+        closure &= current
+        hierarchy["bitsets"] = (concepts, np.packbits(closure, axis=1))
+    return hierarchy["bitsets"]
+
+
+def get_edam_ancestor_index() -> tuple:
     """
+    Return the ancestor closure of get_edam_closure as a CSR index over concept ids.
 
-    query = """
-    # Chained neighbors: Find EDAM concept with neighbors that have neighbors of their own
-    SELECT DISTINCT ?concept ?conceptLabel ?neighborRelation ?conceptNeighbor ?conceptNeighborLabel ?neighborNeighborRelation ?neighborNeighbor ?neighborNeighborLabel 
-    WHERE {
-      ?concept rdf:type owl:Class .
-      OPTIONAL { ?concept rdfs:label ?conceptLabel . }
-      FILTER NOT EXISTS { ?concept rdfs:subClassOf? owl:DeprecatedClass }
-      
-      ?concept rdfs:subClassOf [
-        rdf:type owl:Restriction ;
-        owl:onProperty ?neighborRelation ;
-        owl:someValuesFrom ?conceptNeighbor
-      ] .
-      ?conceptNeighbor rdf:type owl:Class .
-      FILTER NOT EXISTS { ?conceptNeighbor rdfs:subClassOf? owl:DeprecatedClass }
-      OPTIONAL { ?conceptNeighbor rdfs:label ?conceptNeighborLabel . }
-      
-      ?conceptNeighbor rdfs:subClassOf [
-        rdf:type owl:Restriction ;
-        owl:onProperty ?neighborNeighborRelation ;
-        owl:someValuesFrom ?neighborNeighbor
-      ] .
-      ?neighborNeighbor rdf:type owl:Class .
-      FILTER NOT EXISTS { ?neighborNeighbor rdfs:subClassOf? owl:DeprecatedClass }
-      OPTIONAL { ?neighborNeighbor rdfs:label ?neighborNeighborLabel . }
-    }
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The sorted concept URIs, the int64 offsets and the int32 ancestor ids:
+        the ancestors of concepts[i] are concepts[ancestors[offsets[i]:offsets[i + 1]]].
     """
+    hierarchy = get_edam_hierarchy()
+    if "ancestor_index" not in hierarchy:
+        concepts, bitsets = get_edam_closure()
+        rows, ancestors = np.nonzero(
+            np.unpackbits(bitsets, axis=1, count=len(concepts))
+        )
+        offsets = np.zeros(len(concepts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(concepts)), out=offsets[1:])
+        hierarchy["ancestor_index"] = (concepts, offsets, ancestors.astype(np.int32))
+    return hierarchy["ancestor_index"]
 
-    # Execute SPARQL query
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
 
-    # Convert to pandas DataFrame
-    df = sparql_results_to_dataframe(results)
+def expand_to_ancestors(dfDirect: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Derive a transitive annotation table from a direct one through the EDAM closure.
 
-    return df
+    Each (tool, concept) row is replaced by one row per current EDAM ancestor (or
+    self) of the concept, which is what sc:applicationSubCategory/(rdfs:subClassOf*)
+    and sc:featureList/(rdfs:subClassOf*) select.
 
+    Parameters
+    ----------
+    dfDirect : pd.DataFrame
+        Direct annotations, with columns ["tool", column].
+    column : str
+        "topic" or "operation".
 
-def getEntityDescriptionGraph(
-    entityURI,
-    graph=None,
-    direction="ancestors",
-    displayIdentifier=False,
-    highlightEntity=False,
-):
-    """Return a graph representing the neighbors of an entity.
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with columns ["tool", column, column + "Label"].
+    """
+    concepts, offsets, ancestors = get_edam_ancestor_index()
+    conceptIds = pd.Index(concepts).get_indexer(dfDirect[column])
+    known = conceptIds >= 0
+    tools = dfDirect["tool"].to_numpy()[known]
+    conceptIds = conceptIds[known]
+
+    counts = offsets[conceptIds + 1] - offsets[conceptIds]
+    total = int(counts.sum())
+    starts = np.repeat(offsets[conceptIds] - (np.cumsum(counts) - counts), counts)
+    ancestorIds = ancestors[starts + np.arange(total)]
+
+    dfTransitive = pd.DataFrame(
+        {"tool": np.repeat(tools, counts), column: concepts[ancestorIds]}
+    ).drop_duplicates(ignore_index=True)
+    labels = get_edam_hierarchy()["labels"]
+    dfTransitive[column + "Label"] = [
+        labels.get(uri, "") for uri in dfTransitive[column]
+    ]
+    return dfTransitive
 
-    Keyword arguments:
-    entityURI -- the URI for the entity
-    graph -- the graph in which the hierarchy is added. A new graph is created if the value is None. (default: None)
-    direction -- should the hierarchy concern the ancestors and/or the descendants of the entity. Possible values: "ancestors", "descendants", "both" (default: "ancestors")
-    displayIdentifier -- should the nodes also display their URI (default: False)
-    highlightEntity -- should the entity be highlighted (default:False)
+
+def find_redundant_annotations(dfDirect: pd.DataFrame, column: str) -> pd.DataFrame:
     """
-    entityIdent = entityURI.replace(edamURI, "").replace("edam:", "")
-    graph = getHierarchyGraph(
-        entityURI,
-        graph=graph,
-        direction=direction,
-        displayIdentifier=displayIdentifier,
-        highlightEntity=highlightEntity,
-    )
-    if entityURI.startswith("http"):
-        entityURI = "<" + entityURI + ">"
-    query = (
-        """
-SELECT DISTINCT ?concept ?relation ?neighbor ?neighborLabel
-WHERE {
-  VALUES ?concept { """
-        + entityURI
-        + """ }
- 
-  ?concept rdfs:subClassOf* ?conceptAncestor .
-  ?conceptAncestor rdf:type owl:Class .
-  FILTER NOT EXISTS { ?conceptAncestor rdfs:subClassOf? owl:DeprecatedClass }
-  
-  ?conceptAncestor rdfs:subClassOf ?restriction .
-  ?restriction rdf:type owl:Restriction .
-  ?restriction owl:onProperty ?relation .
-  ?restriction owl:someValuesFrom ?neighbor .
-  OPTIONAL { ?neighbor rdfs:label ?neighborConceptLabel }
-  BIND(COALESCE(?neighborConceptLabel, "") AS ?neighborLabel)
-}
-"""
+    Find the redundant direct annotations of every tool in one vectorized pass:
+    a direct concept is redundant when it is an (indirect) ancestor of another
+    direct concept of the same tool.
+
+    The direct concepts are expanded through the EDAM ancestor index and the
+    (tool, ancestor) pairs are matched against the (tool, concept) pairs of the
+    direct annotations, which is what the rdfs:subClassOf+ self-join of
+    generate_df_redundancy_topic / generate_df_redundancy_operation selects.
+
+    Parameters
+    ----------
+    dfDirect : pd.DataFrame
+        Direct annotations, with columns ["tool", column].
+    column : str
+        "topic" or "operation".
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns ["tool", "directConcept", "redundantConcept"]: redundantConcept
+        is an ancestor of directConcept, both are current EDAM classes, and both
+        annotate the tool.
+    """
+    concepts, offsets, ancestors = get_edam_ancestor_index()
+    conceptIds = pd.Index(concepts).get_indexer(dfDirect[column])
+    toolIds, tools = pd.factorize(dfDirect["tool"])
+    # A concept is current (rdf:type owl:Class and not deprecated) when it is one
+    # of its own ancestors: the closure only keeps the current classes
+    conceptRows = np.repeat(np.arange(len(concepts)), np.diff(offsets))
+    current = np.zeros(len(concepts), dtype=bool)
+    current[conceptRows[ancestors == conceptRows]] = True
+    known = conceptIds >= 0
+    known[known] = current[conceptIds[known]]
+    toolIds, conceptIds = toolIds[known].astype(np.int64), conceptIds[known]
+
+    counts = offsets[conceptIds + 1] - offsets[conceptIds]
+    starts = np.repeat(offsets[conceptIds] - (np.cumsum(counts) - counts), counts)
+    ancestorIds = ancestors[starts + np.arange(int(counts.sum()))]
+    rowTools = np.repeat(toolIds, counts)
+    rowConcepts = np.repeat(conceptIds, counts)
+
+    # Keep the strict ancestors that are also (current) direct annotations of the
+    # tool
+    directKeys = toolIds * len(concepts) + conceptIds
+    redundant = (ancestorIds != rowConcepts) & np.isin(
+        rowTools * len(concepts) + ancestorIds, directKeys
     )
-    conceptStyle = {}
-    conceptStyle["Class"] = "filled"
-    conceptStyle["Tool"] = "filled"
-    conceptStyle["Topic"] = "filled"
-    conceptStyle["Operation"] = "rounded,filled"
-    conceptStyle["Data"] = "filled"
-    conceptStyle["Format"] = "rounded,filled"
+    return pd.DataFrame(
+        {
+            "tool": np.asarray(tools)[rowTools[redundant]],
+            "directConcept": concepts[rowConcepts[redundant]],
+            "redundantConcept": concepts[ancestorIds[redundant]],
+        }
+    ).drop_duplicates(ignore_index=True)
 
-    conceptShape = {}
-    conceptShape["Class"] = "box"
-    conceptShape["Tool"] = "oval"
-    conceptShape["Topic"] = "box"
-    conceptShape["Operation"] = "box"
-    conceptShape["Data"] = "hexagon"
-    conceptShape["Format"] = "parallelogram"
 
-    conceptFillColor = (
-        {}
-    )  # values from ColorBrewer paster theme https://en.wikipedia.org/wiki/ColorBrewer
-    conceptFillColor["Class"] = "white"
-    conceptFillColor["Tool"] = "white"
-    conceptFillColor["Topic"] = "#ccebc5"  # green
-    conceptFillColor["Operation"] = "#b3cde3"  # blue
-    conceptFillColor["Data"] = "#fbb4ae"  # red
-    conceptFillColor["Format"] = "#fed9a6"  # orange
+# === Shared SPARQL client ===
 
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-    for result in results["results"]["bindings"]:
-        relationIdent = result["relation"]["value"].replace(edamURI, "")
-        neighborIdent = result["neighbor"]["value"].replace(edamURI, "")
-        neighborLabel = result["neighborLabel"]["value"] + (
-            "\n(" + neighborIdent + ")" if displayIdentifier else ""
-        )
-        neighborType = "Class"
-        if neighborIdent.startswith("topic_"):
-            neighborType = "Topic"
-        elif neighborIdent.startswith("operation_"):
-            neighborType = "Operation"
-        elif neighborIdent.startswith("data_"):
-            neighborType = "Data"
-        elif neighborIdent.startswith("format_"):
-            neighborType = "Format"
-        graph.add_node(
-            neighborIdent,
-            label=neighborLabel,
-            shape=conceptShape[neighborType],
-            color="black",
-            nodeType=neighborType,
-            style=conceptStyle[neighborType],
-            fillcolor=conceptFillColor[neighborType],
-        )
-        graph.add_edge(
-            entityIdent,
-            neighborIdent,
-            arrowhead="open",
-            label=relationIdent,
-            color="purple",
-            fontcolor="purple",
-        )
-    return graph
+# Connection pool size, number of queries sent at the same time, and timeout (in
+# seconds, None to wait for the endpoint) of the shared SPARQL client
+sparql_max_connections = 8
+sparql_max_concurrency = 8
+sparql_timeout = None
 
+_sparql_client = {}
+_sparql_client_lock = threading.Lock()
 
-def addToolAndAnnotationsToGraph(
-    toolURI,
-    graph=None,
-    showTopics=True,
-    showOperations=True,
-    showDeprecatedAnnotations=False,
-    highlightDirectAnnotations=False,
+# Number of rows parsed at a time from the results of iter_sparql_chunks
+sparql_chunk_rows = 50_000
+
+# Number of tools per query, and number of queries running at the same time, of
+# the sharded extractions (see sparql_sharded_dataframe)
+sparql_shard_size = 2000
+sparql_shard_workers = 4
+
+# Line of the WHERE clause of a sharded query replaced by the VALUES block of the
+# tools of each shard (a comment, so that the query also runs unsharded)
+sparql_shard_placeholder = "# VALUES ?tool"
+
+
+def configure_sparql_client(
+    max_connections: int = None, max_concurrency: int = None, timeout: float = None
 ):
-    """Return a graph representing a tool and its EDAM annotations.
+    """
+    Change the limits of the shared SPARQL client. The open connections are closed
+    and a new pool is created on the next query.
 
-    Keyword arguments:
-    toolURI -- the URI for the tool
-    graph -- the graph in which the tool and its annotations are added. A new graph is created if the value is None. (default: None)
-    showTopics -- should the topics annotating the tool be considered (default: True)
-    showOperations -- should the operations annotating the tool be considered (default: True)
-    showDeprecatedAnnotations -- should the deprecated topics and operations annotating the tool be considered (default: False)
-    highlightDirectAnnotations -- should the topics or operations annotated directly be highliigthed (default:False)
+    Parameters
+    ----------
+    max_connections : int, optional
+        Number of keep-alive connections kept open to the endpoint.
+    max_concurrency : int, optional
+        Maximum number of queries running at the same time (extra queries wait).
+    timeout : float, optional
+        Timeout of a query, in seconds.
     """
-    if graph is None:
-        graph = pgv.AGraph(directed=True, rankdir="BT")
+    global sparql_max_connections, sparql_max_concurrency, sparql_timeout
 
-    toolIdent = toolURI.replace(biotoolsURI, "")
+    if max_connections:
+        sparql_max_connections = max_connections
+    if max_concurrency:
+        sparql_max_concurrency = max_concurrency
+    if timeout:
+        sparql_timeout = timeout
+    with _sparql_client_lock:
+        if "session" in _sparql_client:
+            _sparql_client["session"].close()
+        _sparql_client.clear()
 
-    if toolURI.startswith("http"):
-        toolURI = "<" + toolURI + ">"
 
-    directAnnotationColor = "red" if highlightDirectAnnotations else "black"
+def get_sparql_session() -> tuple:
+    """
+    Return the HTTP session shared by all the queries: connections to the endpoint
+    are kept alive and pooled, and responses are requested gzip-compressed.
 
-    conceptStyle = {}
-    conceptStyle["Tool"] = "filled"
-    conceptStyle["Topic"] = "filled"
-    conceptStyle["TopicDeprecated"] = conceptStyle["Topic"] + ",dashed"
-    conceptStyle["TopicAlternative"] = conceptStyle["Topic"] + ",dotted"
-    conceptStyle["Operation"] = "rounded,filled"
-    conceptStyle["OperationDeprecated"] = conceptStyle["Operation"] + ",dashed"
-    conceptStyle["OperationAlternative"] = conceptStyle["Operation"] + ",dotted"
+    Returns
+    -------
+    tuple[requests.Session, threading.BoundedSemaphore]
+        (session, slots): the session and the semaphore bounding the number of
+        queries running at the same time, taken together so that a concurrent
+        configure_sparql_client cannot separate them.
+    """
+    with _sparql_client_lock:
+        if "session" in _sparql_client:
+            return _sparql_client["session"], _sparql_client["slots"]
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_maxsize=sparql_max_connections, pool_block=True
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        _sparql_client["slots"] = threading.BoundedSemaphore(sparql_max_concurrency)
+        _sparql_client["session"] = session
+        return session, _sparql_client["slots"]
 
-    query = (
+
+def sparql_query(query: str, endpoint: str = None, use_cache: bool = True) -> dict:
+    """
+    Run a SELECT query with the shared SPARQL client.
+
+    Parameters
+    ----------
+    query : str
+        The query, prefixes included.
+    endpoint : str, optional
+        URL of the SPARQL endpoint (default: endpointURL).
+    use_cache : bool
+        Read and store the results in the on-disk result cache when it is
+        enabled (see sparql_cache_enabled) and a knowledge graph version is
+        recorded (default: True).
+
+    Returns
+    -------
+    dict
+        The results in the SPARQL 1.1 JSON results format: the variable names
+        under ["head"]["vars"] and one {variable: {"type": ..., "value": ...}}
+        binding per row under ["results"]["bindings"].
+    """
+    endpoint = endpoint or endpointURL
+    use_cache = use_cache and _sparql_cache_usable()
+    if use_cache:
+        key = _sparql_cache_key(query, endpoint)
+        results = _sparql_cache_get(key)
+        if results is not None:
+            return results
+
+    session, slots = get_sparql_session()
+    with slots:
+        response = session.post(
+            endpoint,
+            data={"query": query},
+            headers={"Accept": "application/sparql-results+json"},
+            timeout=sparql_timeout,
+        )
+        response.raise_for_status()
+        results = response.json()
+
+    if use_cache:
+        _sparql_cache_put(key, results)
+    return results
+
+
+class _CompressingReader(io.RawIOBase):
+    """
+    Read-only stream over a response body which keeps a zlib-compressed copy of
+    what was read, for the result cache, until the copy grows over limit bytes.
+    """
+
+    def __init__(self, raw, limit: int = None):
+        self.raw = raw
+        self.limit = limit
+        self.compressor = zlib.compressobj() if limit is not None else None
+        self.parts = []
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(len(buffer))
+        buffer[: len(data)] = data
+        if self.compressor is not None and data:
+            part = self.compressor.compress(data)
+            self.parts.append(part)
+            self.size += len(part)
+            if self.size > self.limit:
+                self.compressor, self.parts = None, []
+        return len(data)
+
+    def compressed(self) -> bytes:
         """
-SELECT DISTINCT ?toolLabel 
-WHERE {
-  VALUES ?tool { """
-        + toolURI
-        + """ }
+        Return the compressed copy of the whole body (once it was read), or None
+        if it was too large or not kept.
+        """
+        if self.compressor is None:
+            return None
+        return b"".join(self.parts) + self.compressor.flush()
 
-  ?tool rdf:type sc:SoftwareApplication .
-  OPTIONAL { ?tool sc:name ?tLabel }
-  BIND(COALESCE(?tLabel, "") AS ?toolLabel)
-}
-"""
-    )
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-    for result in results["results"]["bindings"]:
-        # print("{}\t{}".format(toolIdent, result["toolLabel"]["value"]))
-        if not graph.has_node(toolIdent):
-            clusterTools = graph.get_subgraph(name="cluster_tools")
-            if clusterTools is None:
-                clusterTools = graph.add_subgraph(
-                    name="cluster_tools", rankdir="same", style="invis"
-                )  # style="invis"
-            clusterTools.add_node(
-                toolIdent,
-                label="{}".format(result["toolLabel"]["value"]),
-                shape="ellipse",
-                color="blue",
-                nodeType="Tool",
-                style=conceptStyle["Tool"],
-                fillcolor="#ffffff",
-            )
 
-    directConcepts = []
-    if showTopics:
-        directConcepts = []
-        conceptType = "Topic"
-        query = (
-            """
-SELECT DISTINCT ?conceptURI ?conceptLabel
-WHERE {
-  VALUES ?tool { """
-            + toolURI
-            + """ }
+def iter_sparql_chunks(
+    query: str,
+    endpoint: str = None,
+    chunksize: int = None,
+    dtype=str,
+    use_cache: bool = True,
+):
+    """
+    Run a SELECT query with the shared SPARQL client and yield its results as
+    DataFrames of at most chunksize rows. The results are requested as CSV and
+    parsed as they are received, so that only one chunk is held in its raw form.
 
-  ?tool sc:applicationSubCategory ?conceptURI .
-  ?conceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?conceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?conceptURI rdfs:label ?cLabel }
-  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
-}
-"""
+    Parameters
+    ----------
+    query : str
+        The query, prefixes included.
+    endpoint : str, optional
+        URL of the SPARQL endpoint (default: endpointURL).
+    chunksize : int, optional
+        Number of rows per chunk (default: sparql_chunk_rows).
+    dtype : type or dict
+        Type of the columns, or {variable: type} (default: str).
+    use_cache : bool
+        Read and store the results in the on-disk result cache when it is
+        enabled and a knowledge graph version is recorded (default: True).
+        Results whose compressed size is over the cache limit are not stored.
+
+    Yields
+    ------
+    pd.DataFrame
+        One column per variable, NaN for unbound values (and empty strings). At
+        least one, possibly empty, chunk is yielded.
+    """
+    endpoint = endpoint or endpointURL
+    options = {
+        "chunksize": chunksize or sparql_chunk_rows,
+        "dtype": dtype,
+        "keep_default_na": False,
+        "na_values": [""],
+    }
+    use_cache = use_cache and _sparql_cache_usable()
+    if use_cache:
+        key = _sparql_cache_key(query, endpoint, "csv")
+        blob = _sparql_cache_get_blob(key)
+        if blob is not None:
+            with pd.read_csv(io.BytesIO(zlib.decompress(blob)), **options) as reader:
+                yield from reader
+            return
+
+    session, slots = get_sparql_session()
+    with slots, session.post(
+        endpoint,
+        data={"query": query},
+        headers={"Accept": "text/csv"},
+        timeout=sparql_timeout,
+        stream=True,
+    ) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        body = _CompressingReader(
+            response.raw, sparql_cache_max_bytes // 8 if use_cache else None
         )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        for result in results["results"]["bindings"]:
-            directConcepts.append(result["conceptURI"]["value"])
-            conceptIdent = result["conceptURI"]["value"].replace(edamURI, "")
-            # print("\t{}\t{}".format(conceptIdent, result["conceptLabel"]["value"]))
-            if not graph.has_node(conceptIdent):
-                graph.add_node(
-                    conceptIdent,
-                    label="{}\n({})".format(
-                        result["conceptLabel"]["value"], conceptIdent
-                    ),
-                    nodeType=conceptType,
-                    shape="box",
-                    color=directAnnotationColor,
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
-                )
-            graph.add_edge(
-                toolIdent,
-                conceptIdent,
-                arrowhead="vee",
-                color="blue",
-                fontcolor="blue",
-                style="dashed",
-            )
+        with pd.read_csv(io.BufferedReader(body), **options) as reader:
+            yield from reader
 
-    for conceptURI in directConcepts:
-        query = (
-            """
-SELECT DISTINCT ?subConceptURI ?subConceptLabel ?superConceptURI ?superConceptLabel 
-WHERE {
-  VALUES ?conceptURI { <"""
-            + conceptURI
-            + """> }
-  ?conceptURI rdfs:subClassOf* ?subConceptURI .
-  ?subConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?subConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?subConceptURI rdfs:label ?subLabel }
-  ?subConceptURI rdfs:subClassOf ?superConceptURI .
-  ?superConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?superConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?superConceptURI rdfs:label ?supLabel }
-  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
-  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
-}
-"""
+    blob = body.compressed()
+    if blob is not None:
+        _sparql_cache_put_blob(key, blob)
+
+
+def sparql_dataframe(
+    query: str, endpoint: str = None, dtype=str, transform=None
+) -> pd.DataFrame:
+    """
+    Run a SELECT query with the shared SPARQL client and return the results as a
+    DataFrame (one column per variable, NaN for unbound values), parsed chunk by
+    chunk (see iter_sparql_chunks).
+
+    Parameters
+    ----------
+    query : str
+        The query, prefixes included.
+    endpoint : str, optional
+        URL of the SPARQL endpoint (default: endpointURL).
+    dtype : type or dict
+        Type of the columns, or {variable: type} (default: str).
+    transform : callable, optional
+        Function applied to each chunk before they are concatenated (renaming or
+        reformatting columns), returning a DataFrame.
+    """
+    chunks = iter_sparql_chunks(query, endpoint, dtype=dtype)
+    if transform is not None:
+        chunks = map(transform, chunks)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def sparql_sharded_dataframe(
+    query: str,
+    toolURIs,
+    output_path: str,
+    shardSize: int = None,
+    max_workers: int = None,
+) -> "_StoredTable":
+    """
+    Run a registry-wide SELECT query by batches of tools, appending the results
+    of each batch to a compressed TSV file as they are received.
+
+    Each shard restricts ?tool with a VALUES block, which replaces the
+    sparql_shard_placeholder line of the query, so that no single query hits the
+    result-size or time limits of the endpoint. At most max_workers shards are
+    queried at the same time, and they are written in the order of toolURIs as
+    soon as they are received: only the shards in flight are held in memory.
+
+    Parameters
+    ----------
+    query : str
+        The query, prefixes included, binding ?tool in its WHERE clause and
+        holding the sparql_shard_placeholder line.
+    toolURIs : iterable of str
+        The tools to query (e.g. the "tool" column of dfTool).
+    output_path : str
+        Path of the .tsv.bz2 file to write (see write_table).
+    shardSize : int, optional
+        Number of tools per query, at least 1 (default: sparql_shard_size).
+    max_workers : int, optional
+        Number of shards queried at the same time, at least 1 (default:
+        sparql_shard_workers).
+
+    Returns
+    -------
+    _StoredTable
+        The table written to output_path, read back by its load() method.
+    """
+    if sparql_shard_placeholder not in query:
+        raise ValueError(f"The query has no {sparql_shard_placeholder!r} line")
+    toolURIs = list(dict.fromkeys(toolURIs))
+    shardSize = sparql_shard_size if shardSize is None else shardSize
+    max_workers = sparql_shard_workers if max_workers is None else max_workers
+    if shardSize < 1:
+        raise ValueError(f"shardSize must be >= 1, not {shardSize}")
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be >= 1, not {max_workers}")
+    shards = (
+        query.replace(
+            sparql_shard_placeholder,
+            "VALUES ?tool { " + valuesClause(toolURIs[i : i + shardSize]) + " }",
         )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        directConcepts = []
-        for result in results["results"]["bindings"]:
-            subConceptIdent = result["subConceptURI"]["value"].replace(edamURI, "")
-            superConceptIdent = result["superConceptURI"]["value"].replace(edamURI, "")
-            if not graph.has_node(subConceptIdent):
-                graph.add_node(
-                    subConceptIdent,
-                    label="{}\n{}".format(
-                        result["subConceptLabel"]["value"], subConceptIdent
-                    ),
-                    shape="box",
-                    color="black",
-                    nodeType=conceptType,
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
+        for i in range(0, max(len(toolURIs), 1), shardSize)
+    )
+
+    with contextlib.ExitStack() as stack:
+        pool = stack.enter_context(concurrent.futures.ThreadPoolExecutor(max_workers))
+        # The Feather copy is closed last, so that it is not older than the TSV
+        columnarStack = stack.enter_context(contextlib.ExitStack())
+        output = stack.enter_context(bz2.open(output_path, "wt", newline=""))
+        header, columnar = True, None
+
+        def write(df):
+            nonlocal header, columnar
+            df.to_csv(output, sep="\t", index=False, header=header)
+            header = False
+            if pyarrow is None:
+                return
+            # Feather copy, written shard by shard as well (see _write_columnar)
+            schema = pyarrow.schema([(name, pyarrow.string()) for name in df])
+            if columnar is None:
+                columnar = columnarStack.enter_context(
+                    pyarrow.ipc.new_file(
+                        columnar_path(output_path),
+                        schema,
+                        options=pyarrow.ipc.IpcWriteOptions(compression="lz4"),
+                    )
                 )
-            if not graph.has_node(superConceptIdent):
-                graph.add_node(
-                    superConceptIdent,
-                    label="{}\n{}".format(
-                        result["superConceptLabel"]["value"], superConceptIdent
-                    ),
-                    shape="box",
-                    color="black",
-                    nodeType=conceptType,
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
+            columnar.write_table(
+                pyarrow.Table.from_pandas(
+                    df.replace("", None), schema=schema, preserve_index=False
                 )
-            graph.add_edge(subConceptIdent, superConceptIdent, arrowhead="onormal")
+            )
 
-    if showOperations:
-        directConcepts = []
-        conceptType = "Operation"
-        query = (
-            """
-SELECT DISTINCT ?conceptURI ?conceptLabel
-WHERE {
-  VALUES ?tool { """
-            + toolURI
-            + """ }
+        window = collections.deque()
+        for shard in shards:
+            window.append(pool.submit(sparql_dataframe, shard))
+            if len(window) >= max_workers:
+                write(window.popleft().result())
+        while window:
+            write(window.popleft().result())
+    return _StoredTable(output_path)
 
-  ?tool sc:featureList ?conceptURI .
-  ?conceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?conceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?conceptURI rdfs:label ?cLabel }
-  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
+
+# === On-disk SPARQL result cache ===
+
+# Results of the queries are kept in an SQLite file of the snapshot folder, keyed
+# by (endpoint, query, knowledge graph version), and evicted least recently used
+# first when the file grows over sparql_cache_max_bytes. The cache is only used
+# once a knowledge graph version is recorded (see update_kg_version).
+sparql_cache_enabled = True
+sparql_cache_max_bytes = 256 * 1024 * 1024
+
+# Hits and misses of the current process (sparql_cache_info also reports the
+# totals recorded in the cache file)
+sparql_cache_stats = {"hits": 0, "misses": 0}
+
+# Number of cache reads whose bookkeeping (last use of the entries, hit and miss
+# counters) is kept in memory before it is written to the cache file
+sparql_cache_flush_reads = 256
+
+_sparql_cache = {}
+_sparql_cache_lock = threading.Lock()
+_sparql_cache_pending = {"used": {}, "hits": 0, "misses": 0}
+
+
+def sparql_cache_path() -> str:
+    """
+    Return the path of the SPARQL result cache file.
+    """
+    return os.path.join(dataframe_dir, "sparql_cache.sqlite")
+
+
+def _sparql_cache_connect() -> sqlite3.Connection:
+    # The tables are created by the first connection of the process to the file
+    path = sparql_cache_path()
+    if path in _sparql_cache.setdefault("schemas", set()) and os.path.exists(path):
+        return sqlite3.connect(path, timeout=60)
+    os.makedirs(dataframe_dir, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS results"
+        " (key TEXT PRIMARY KEY, result BLOB NOT NULL, size INTEGER NOT NULL,"
+        " last_used REAL NOT NULL)"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+    )
+    _sparql_cache["schemas"].add(path)
+    return connection
+
+
+def _sparql_cache_count(counter: str, key: str = None):
+    # Record a hit (with the entry used) or a miss, written by _sparql_cache_flush
+    with _sparql_cache_lock:
+        sparql_cache_stats[counter] += 1
+        _sparql_cache_pending[counter] += 1
+        if key is not None:
+            _sparql_cache_pending["used"][key] = time.time()
+        pending = _sparql_cache_pending["hits"] + _sparql_cache_pending["misses"]
+    if pending >= sparql_cache_flush_reads:
+        _sparql_cache_flush()
+
+
+def _sparql_cache_flush(connection: sqlite3.Connection = None):
+    """
+    Write the pending bookkeeping of the cache reads (see _sparql_cache_count) in
+    one transaction, on the given connection (in its transaction) or a new one.
+    """
+    with _sparql_cache_lock:
+        pending = dict(_sparql_cache_pending)
+        _sparql_cache_pending.update(used={}, hits=0, misses=0)
+    if not (pending["used"] or pending["hits"] or pending["misses"]):
+        return
+    if connection is not None:
+        _sparql_cache_flush_pending(connection, pending)
+        return
+    with contextlib.closing(_sparql_cache_connect()) as connection, connection:
+        _sparql_cache_flush_pending(connection, pending)
+
+
+def _sparql_cache_flush_pending(connection: sqlite3.Connection, pending: dict):
+    connection.executemany(
+        "UPDATE results SET last_used = MAX(last_used, ?) WHERE key = ?",
+        [(used, key) for key, used in pending["used"].items()],
+    )
+    connection.executemany(
+        "INSERT INTO meta VALUES (?, ?)"
+        " ON CONFLICT(name) DO UPDATE SET value = CAST(value AS INTEGER) + ?",
+        [
+            (counter, str(pending[counter]), pending[counter])
+            for counter in ("hits", "misses")
+            if pending[counter]
+        ],
+    )
+
+
+atexit.register(lambda: _sparql_cache_flush())
+
+
+def _sparql_cache_usable() -> bool:
+    # No result is read or stored before a knowledge graph version is recorded:
+    # they could not be told apart from the results of another version
+    return sparql_cache_enabled and get_kg_version() != ""
+
+
+def get_kg_version() -> str:
+    """
+    Return the knowledge graph version recorded in the cache by the last `init`
+    (see update_kg_version), or an empty string if none was recorded.
+    """
+    if "version" not in _sparql_cache:
+        with contextlib.closing(_sparql_cache_connect()) as connection:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE name = 'kg_version'"
+            ).fetchone()
+        _sparql_cache["version"] = row[0] if row else ""
+    return _sparql_cache["version"]
+
+
+def get_kg_edam_version() -> float:
+    """
+    Return the version of EDAM loaded in the knowledge graph: the one recorded
+    by the last `init` (see update_kg_version), otherwise queried from the
+    endpoint (see get_edam_version). None if it is unknown and the endpoint
+    cannot be reached.
+    """
+    if "edamVersion" not in _sparql_cache:
+        version = get_snapshot_edam_version()
+        if version is None:
+            try:
+                version = get_edam_version(endpointURL, prefixes)
+            except (requests.RequestException, LookupError, ValueError):
+                version = None
+        _sparql_cache["edamVersion"] = version
+    return _sparql_cache["edamVersion"]
+
+
+def snapshot_edam_version_path() -> str:
+    """
+    Return the path of the file recording the EDAM version of the snapshot, written
+    by `init` next to the tables (unlike the SPARQL cache, which can be deleted), so
+    that a copied snapshot with virtual transitive tables stays readable. It is not
+    tracked by git: the committed tables were extracted with an unrecorded EDAM
+    version, so their transitive tables are always stored.
+    """
+    return os.path.join(dataframe_dir, "edam_version.txt")
+
+
+def record_snapshot_edam_version(version: float):
+    """
+    Record the EDAM version of the knowledge graph the tables of the snapshot are
+    extracted from (see get_snapshot_edam_version).
+    """
+    os.makedirs(dataframe_dir, exist_ok=True)
+    with open(snapshot_edam_version_path(), "w") as f:
+        f.write(f"{version}\n")
+
+
+def get_snapshot_edam_version() -> float:
+    """
+    Return the EDAM version of the knowledge graph the tables of the snapshot
+    were extracted from, as recorded by the last `init` (see update_kg_version),
+    or None if it was not recorded.
+    """
+    if os.path.exists(snapshot_edam_version_path()):
+        with open(snapshot_edam_version_path()) as f:
+            return edam_version_number(f.read().strip())
+    # Recorded in the cache by the previous versions of `init`
+    if not os.path.exists(sparql_cache_path()):
+        return None
+    with contextlib.closing(_sparql_cache_connect()) as connection:
+        row = connection.execute(
+            "SELECT value FROM meta WHERE name = 'edam_version'"
+        ).fetchone()
+    return None if row is None else float(row[0])
+
+
+def get_kg_dump_digest() -> str:
+    """
+    Return the SHA-256 of the bioschemas dump the knowledge graph is loaded from
+    (bioschemas_file, see set_file_paths), or None if the file is not available.
+    The digest is kept in the cache and only computed again when the size or the
+    date of the file change.
+    """
+    if not os.path.exists(bioschemas_file):
+        return None
+    fingerprint = json.dumps(_edam_file_fingerprint(bioschemas_file), sort_keys=True)
+    with contextlib.closing(_sparql_cache_connect()) as connection, connection:
+        row = connection.execute(
+            "SELECT value FROM meta WHERE name = 'dump_digest'"
+        ).fetchone()
+        recorded = json.loads(row[0]) if row else {}
+        if recorded.get("fingerprint") != fingerprint:
+            recorded = {
+                "fingerprint": fingerprint,
+                "digest": file_digest(bioschemas_file),
+            }
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('dump_digest', ?)",
+                (json.dumps(recorded),),
+            )
+    return recorded["digest"]
+
+
+def get_kg_annotation_counts(endpoint: str = None) -> tuple:
+    """
+    Return the number of tools and of topic and operation annotations of the
+    knowledge graph, queried from the endpoint (default: endpointURL). Each count
+    is one triple pattern, so the query does not scan the whole graph.
+
+    Returns
+    -------
+    tuple[int, int, int]
+        (tools, topics, operations)
+    """
+    query = """
+SELECT ?tools ?topics ?operations WHERE {
+  { SELECT (COUNT(*) AS ?tools) WHERE { ?tool rdf:type sc:SoftwareApplication } }
+  { SELECT (COUNT(*) AS ?topics) WHERE { ?tool sc:applicationSubCategory ?topic } }
+  { SELECT (COUNT(*) AS ?operations) WHERE { ?tool sc:featureList ?operation } }
 }
 """
+    results = sparql_query(prefixes + query, endpoint, use_cache=False)
+    counts = results["results"]["bindings"][0]
+    return tuple(
+        int(counts[name]["value"]) for name in ("tools", "topics", "operations")
+    )
+
+
+def update_kg_version() -> bool:
+    """
+    Compute the version of the knowledge graph (EDAM version from get_edam_version,
+    and digest of the bioschemas dump from get_kg_dump_digest, or the annotation
+    counts from get_kg_annotation_counts when the dump is not available) and
+    record it in the cache, and the EDAM version next to the snapshot (see
+    record_snapshot_edam_version). The cached results are discarded when the
+    version changed.
+
+    Returns
+    -------
+    bool
+        True if the version changed (or was not recorded yet).
+    """
+    edamVersion = get_edam_version(endpointURL, prefixes)
+    dumpDigest = get_kg_dump_digest()
+    if dumpDigest:
+        version = "EDAM {} | dump {}".format(edamVersion, dumpDigest[:16])
+    else:
+        version = "EDAM {} | {} tools, {} topics, {} operations".format(
+            edamVersion, *get_kg_annotation_counts()
         )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        for result in results["results"]["bindings"]:
-            directConcepts.append(result["conceptURI"]["value"])
-            conceptIdent = result["conceptURI"]["value"].replace(edamURI, "")
-            # print("\t{}\t{}".format(conceptIdent, result["conceptLabel"]["value"]))
-            if not graph.has_node(conceptIdent):
-                graph.add_node(
-                    conceptIdent,
-                    label="{}\n({})".format(
-                        result["conceptLabel"]["value"], conceptIdent
-                    ),
-                    nodeType=conceptType,
-                    shape="box",
-                    color=directAnnotationColor,
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
+    _sparql_cache.pop("version", None)
+    changed = version != get_kg_version()
+    with contextlib.closing(_sparql_cache_connect()) as connection, connection:
+        _sparql_cache_flush(connection)
+        if changed:
+            connection.execute("DELETE FROM results")
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('kg_version', ?)", (version,)
+            )
+    record_snapshot_edam_version(edamVersion)
+    _sparql_cache["version"] = version
+    _sparql_cache["edamVersion"] = edamVersion
+    return changed
+
+
+def _sparql_cache_key(query: str, endpoint: str, resultFormat: str = "json") -> str:
+    text = "\0".join((endpoint, query, resultFormat, get_kg_version()))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _sparql_cache_get(key: str):
+    blob = _sparql_cache_get_blob(key)
+    return json.loads(zlib.decompress(blob)) if blob is not None else None
+
+
+def _sparql_cache_get_blob(key: str) -> bytes:
+    # Read only: the last use and the counters are written in batches
+    with contextlib.closing(_sparql_cache_connect()) as connection:
+        row = connection.execute(
+            "SELECT result FROM results WHERE key = ?", (key,)
+        ).fetchone()
+    if row is None:
+        _sparql_cache_count("misses")
+        return None
+    _sparql_cache_count("hits", key)
+    return row[0]
+
+
+def _sparql_cache_put(key: str, results: dict):
+    blob = zlib.compress(json.dumps(results, separators=(",", ":")).encode())
+    _sparql_cache_put_blob(key, blob)
+
+
+def _sparql_cache_put_blob(key: str, blob: bytes):
+    # Registry-wide extractions would evict everything else: do not keep them
+    if len(blob) > sparql_cache_max_bytes // 8:
+        return
+    with contextlib.closing(_sparql_cache_connect()) as connection, connection:
+        _sparql_cache_flush(connection)
+        connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (key, blob, len(blob), time.time()),
+        )
+        total = connection.execute("SELECT SUM(size) FROM results").fetchone()[0]
+        if total > sparql_cache_max_bytes:
+            evicted = []
+            for oldKey, size in connection.execute(
+                "SELECT key, size FROM results ORDER BY last_used"
+            ):
+                if total <= sparql_cache_max_bytes:
+                    break
+                evicted.append((oldKey,))
+                total -= size
+            connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+
+def sparql_cache_info() -> dict:
+    """
+    Return the state of the SPARQL result cache: number of entries, size in bytes,
+    knowledge graph version, and hit/miss counters (of this process and in total).
+    """
+    _sparql_cache_flush()
+    with contextlib.closing(_sparql_cache_connect()) as connection:
+        entries, size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        totals = dict(
+            connection.execute(
+                "SELECT name, CAST(value AS INTEGER) FROM meta"
+                " WHERE name IN ('hits', 'misses')"
+            ).fetchall()
+        )
+    return {
+        "path": sparql_cache_path(),
+        "version": get_kg_version(),
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": sparql_cache_max_bytes,
+        "hits": sparql_cache_stats["hits"],
+        "misses": sparql_cache_stats["misses"],
+        "total_hits": totals.get("hits", 0),
+        "total_misses": totals.get("misses", 0),
+    }
+
+
+def clear_sparql_cache():
+    """
+    Remove all the results of the SPARQL result cache (the recorded version is kept).
+    """
+    with _sparql_cache_lock:
+        _sparql_cache_pending.update(used={}, hits=0, misses=0)
+    with contextlib.closing(_sparql_cache_connect()) as connection, connection:
+        connection.execute("DELETE FROM results")
+        connection.execute("DELETE FROM meta WHERE name IN ('hits', 'misses')")
+    with contextlib.closing(sqlite3.connect(sparql_cache_path())) as connection:
+        connection.execute("VACUUM")
+
+
+def displaySparqlResults(results):
+    """
+    Displays as HTML the result of a SPARQL query in a Jupyter notebook.
+
+        Parameters:
+            results (dictionnary): the SPARQL JSON results of the query (see sparql_query)
+    """
+    variableNames = results["head"]["vars"]
+    # tableCode = '<table><tr><th>{}</th></tr><tr>{}</tr></table>'.format('</th><th>'.join(variableNames), '</tr><tr>'.join('<td>{}</td>'.format('</td><td>'.join([row[vName]['value'] for vName in variableNames]))for row in results["results"]["bindings"]))
+    tableCode = "<table><tr><th>{}</th></tr><tr>{}</tr></table>".format(
+        "</th><th>".join(variableNames),
+        "</tr><tr>".join(
+            "<td>{}</td>".format(
+                "</td><td>".join(
+                    [
+                        row[vName]["value"] if vName in row.keys() else "&nbsp;"
+                        for vName in variableNames
+                    ]
                 )
-            graph.add_edge(
-                toolIdent,
-                conceptIdent,
-                arrowhead="vee",
-                color="blue",
-                fontcolor="blue",
-                style="dashed",
             )
+            for row in results["results"]["bindings"]
+        ),
+    )
+    IPython.display.display(IPython.display.HTML(tableCode))
 
-    for conceptURI in directConcepts:
-        query = (
-            """
-SELECT DISTINCT ?subConceptURI ?subConceptLabel ?superConceptURI ?superConceptLabel 
-WHERE {
-  VALUES ?conceptURI { <"""
-            + conceptURI
-            + """> }
-  ?conceptURI rdfs:subClassOf* ?subConceptURI .
-  ?subConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?subConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?subConceptURI rdfs:label ?subLabel }
-  ?subConceptURI rdfs:subClassOf ?superConceptURI .
-  ?superConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?superConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?superConceptURI rdfs:label ?supLabel }
-  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
-  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
+
+def sparql_results_to_dataframe(results):
+    """
+    Convert SPARQL JSON results to pandas DataFrame
+    """
+    # Extract variable names and bindings
+    variable_names = results["head"]["vars"]
+    bindings = results["results"]["bindings"]
+
+    # Create a list to store rows
+    rows = []
+
+    # Process each row
+    for row in bindings:
+        row_data = {}
+        for var_name in variable_names:
+            # if variable exists in row keys, get its value, else use None
+            if var_name in row.keys():
+                row_data[var_name] = row[var_name]["value"]
+            else:
+                row_data[var_name] = None
+        rows.append(row_data)
+
+    # Create DataFrame
+    df = pd.DataFrame(rows, columns=variable_names)
+
+    return df
+
+
+def get_edam_version(endpointURL, prefixes):
+    query = """
+    SELECT ?ontology ?versionIRI (REPLACE(STR(?versionIRI), 'http://edamontology.org/', '') AS ?versionNumber)
+    WHERE {
+      ?ontology rdf:type owl:Ontology .
+      ?ontology owl:versionIRI ?versionIRI .
+    }
+    """
+    results = sparql_query(prefixes + query, endpointURL, use_cache=False)
+
+    # Extract the version number from the first result
+    version_str = results["results"]["bindings"][0]["versionNumber"]["value"]
+    return float(version_str)
+
+
+# Property linking a tool to its annotations of each type
+annotationProperties = {
+    "Topic": "sc:applicationSubCategory",
+    "Operation": "sc:featureList",
 }
-"""
+
+
+def normalize_uri(uri: str) -> str:
+    """
+    Return the full URI of a resource given as a URI, <URI> or prefixed name
+    (e.g. bt:star), resolved with the PREFIX declarations of prefixes.
+
+    Raises a ValueError if it is neither a URI nor a name with a known prefix.
+    """
+    uri = uri.strip().removeprefix("<").removesuffix(">")
+    if uri.startswith(("http://", "https://")):
+        return uri
+    prefix, separator, name = uri.partition(":")
+    namespaces = dict(re.findall(r"PREFIX\s+([\w-]*):\s*<([^>]*)>", prefixes))
+    if not separator or prefix not in namespaces:
+        raise ValueError(
+            f"Not a URI: {uri!r} (expected a full URI or a prefixed name, e.g. bt:star)"
         )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        directConcepts = []
-        for result in results["results"]["bindings"]:
-            subConceptIdent = result["subConceptURI"]["value"].replace(edamURI, "")
-            superConceptIdent = result["superConceptURI"]["value"].replace(edamURI, "")
-            if not graph.has_node(subConceptIdent):
-                graph.add_node(
-                    subConceptIdent,
-                    label="{}\n{}".format(
-                        result["subConceptLabel"]["value"], subConceptIdent
-                    ),
-                    shape="box",
-                    color="black",
-                    nodeType=conceptType,
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
-                )
-            if not graph.has_node(superConceptIdent):
-                graph.add_node(
-                    superConceptIdent,
-                    label="{}\n{}".format(
-                        result["superConceptLabel"]["value"], superConceptIdent
-                    ),
-                    shape="box",
-                    color="black",
-                    nodeType=conceptType,
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
-                )
-            graph.add_edge(subConceptIdent, superConceptIdent, arrowhead="onormal")
+    return namespaces[prefix] + name
 
-    if showDeprecatedAnnotations:
-        # conceptType = "TopicDeprecated"
+
+def valuesClause(listURI):
+    """Return the content of a VALUES block for a list of URIs (full or prefixed)."""
+    return " ".join(
+        "<" + uri + ">" if uri.startswith("http") else uri for uri in listURI
+    )
+
+
+def get_hierarchy_edges(conceptURI, direction="ancestors"):
+    """
+    Return the rdfs:subClassOf edges between current EDAM classes above and/or below a concept.
+
+    The edges are computed from the local EDAM hierarchy (see get_edam_hierarchy_edges)
+    when the EDAM OWL file has the EDAM version of the knowledge graph (see
+    edam_hierarchy_available), and queried from the SPARQL endpoint otherwise.
+
+    Parameters
+    ----------
+    conceptURI : str
+        URI of the concept (full URI, <URI> or edam:ident).
+    direction : str
+        "ancestors", "descendants" or "both" (default: "ancestors").
+
+    Returns
+    -------
+    list[tuple[str, str, str, str]]
+        (subConceptURI, subConceptLabel, superConceptURI, superConceptLabel) tuples.
+    """
+    return get_hierarchies_edges([conceptURI], direction)[
+        normalize_edam_uri(conceptURI)
+    ]
+
+
+def get_hierarchies_edges(conceptURIs, direction="ancestors"):
+    """
+    Return the hierarchy edges (see get_hierarchy_edges) of many concepts at once.
+
+    Without a matching EDAM OWL file, the hierarchies of all the concepts are fetched with
+    one `VALUES ?concept { ... }` query per direction.
+
+    Parameters
+    ----------
+    conceptURIs : list[str]
+        URIs of the concepts (full URI, <URI> or edam:ident).
+    direction : str
+        "ancestors", "descendants" or "both" (default: "ancestors").
+
+    Returns
+    -------
+    dict
+        {full concept URI -> list of (subConceptURI, subConceptLabel, superConceptURI, superConceptLabel)}
+    """
+    conceptURIs = list(dict.fromkeys(normalize_edam_uri(uri) for uri in conceptURIs))
+    if edam_hierarchy_available():
+        return {uri: get_edam_hierarchy_edges(uri, direction) for uri in conceptURIs}
+
+    patterns = []
+    if (direction == "ancestors") or (direction == "both"):
+        patterns.append("""
+  ?concept rdfs:subClassOf* ?subConcept .
+  ?subConcept rdfs:subClassOf ?superConcept .
+""")
+    if (direction == "descendants") or (direction == "both"):
+        patterns.append("""
+  ?superConcept rdfs:subClassOf* ?concept .
+  ?subConcept rdfs:subClassOf ?superConcept .
+""")
+
+    edges = {uri: {} for uri in conceptURIs}
+    for pattern in patterns if conceptURIs else []:
         query = (
             """
-SELECT DISTINCT ?conceptURI ?conceptLabel ?conceptAlternative ?conceptAlternativeLabel
+SELECT DISTINCT ?concept ?subConcept ?subConceptLabel ?superConcept ?superConceptLabel
 WHERE {
-  VALUES ?tool { """
-            + toolURI
+  VALUES ?concept { """
+            + valuesClause(conceptURIs)
             + """ }
-
-  ?tool sc:applicationSubCategory ?conceptURI .
-  #?conceptURI rdf:type owl:Class .
-  { ?conceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  UNION
-  { ?conceptURI owl:deprecated true }
-  UNION
-  { ?conceptURI owl:deprecated "true" }
-  UNION
-  { ?conceptURI owl:deprecated "True" }
-  OPTIONAL { ?conceptURI rdfs:label ?cLabel }
-  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
-  
-  OPTIONAL {
-    ?conceptURI oboInOwl:consider ?conceptAlternative .
-    OPTIONAL { ?conceptAlternative rdfs:label ?caLabel }
-    BIND(COALESCE(?caLabel, "") AS ?conceptAlternativeLabel)
-  }
+"""
+            + pattern
+            + """
+  ?subConcept rdf:type owl:Class .
+  FILTER NOT EXISTS { ?subConcept rdfs:subClassOf? owl:DeprecatedClass }
+  OPTIONAL { ?subConcept rdfs:label ?subLabel }
+  ?superConcept rdf:type owl:Class .
+  FILTER NOT EXISTS { ?superConcept rdfs:subClassOf? owl:DeprecatedClass }
+  OPTIONAL { ?superConcept rdfs:label ?supLabel }
+  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
+  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
 }
 """
         )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
+        results = sparql_query(prefixes + query)
         for result in results["results"]["bindings"]:
-            conceptType = "TopicDeprecated"
-            directConcepts.append(result["conceptURI"]["value"])
-            conceptIdent = result["conceptURI"]["value"].replace(edamURI, "")
-            # print("\t{}\t{}".format(conceptIdent, result["conceptLabel"]["value"]))
-            if not graph.has_node(conceptIdent):
-                graph.add_node(
-                    conceptIdent,
-                    label="{}\n({})".format(
-                        result["conceptLabel"]["value"], conceptIdent
-                    ),
-                    nodeType=conceptType,
-                    shape="box",
-                    color="grey",
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
-                )
-            graph.add_edge(
-                toolIdent,
-                conceptIdent,
-                arrowhead="vee",
-                color="grey",
-                fontcolor="grey",
-                style="dashed",
+            edge = (
+                result["subConcept"]["value"],
+                result["subConceptLabel"]["value"],
+                result["superConcept"]["value"],
+                result["superConceptLabel"]["value"],
             )
-            if "conceptAlternative" in result.keys():
-                conceptType = "TopicAlternative"
-                alternativeIdent = result["conceptAlternative"]["value"].replace(
-                    edamURI, ""
-                )
-                if not graph.has_node(alternativeIdent):
-                    graph.add_node(
-                        alternativeIdent,
-                        label="{}\n({})".format(
-                            result["conceptAlternativeLabel"]["value"], alternativeIdent
-                        ),
-                        nodeType=conceptType,
-                        shape="box",
-                        color="grey",
-                        style=conceptStyle[conceptType],
-                        fillcolor="#ffffff",
-                    )
-                    queryHierarchy = (
-                        """
-SELECT DISTINCT ?subConceptURI ?subConceptLabel ?superConceptURI ?superConceptLabel 
-WHERE {
-  VALUES ?conceptURI { <"""
-                        + alternativeURI
-                        + """> }
-  ?conceptURI rdfs:subClassOf* ?subConceptURI .
-  ?subConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?subConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?subConceptURI rdfs:label ?subLabel }
-  ?subConceptURI rdfs:subClassOf ?superConceptURI .
-  ?superConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?superConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?superConceptURI rdfs:label ?supLabel }
-  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
-  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
-}
-"""
-                    )
-                    sparqlHierarchy = SPARQLWrapper(endpointURL)
-                    sparqlHierarchy.setQuery(prefixes + queryHierarchy)
-                    sparqlHierarchy.setReturnFormat(JSON)
-                    resultsHierarchy = sparqlHierarchy.query().convert()
-                    for resultHierarchy in resultsHierarchy["results"]["bindings"]:
-                        subConceptIdent = resultHierarchy["subConceptURI"][
-                            "value"
-                        ].replace(edamURI, "")
-                        superConceptIdent = resultHierarchy["superConceptURI"][
-                            "value"
-                        ].replace(edamURI, "")
-                        if not graph.has_node(subConceptIdent):
-                            graph.add_node(
-                                subConceptIdent,
-                                label="{}\n{}".format(
-                                    resultHierarchy["subConceptLabel"]["value"],
-                                    subConceptIdent,
-                                ),
-                                shape="box",
-                                color="grey",
-                                nodeType=conceptType,
-                                style=conceptStyle[conceptType],
-                                fillcolor="#ffffff",
-                            )
-                        if not graph.has_node(superConceptIdent):
-                            graph.add_node(
-                                superConceptIdent,
-                                label="{}\n{}".format(
-                                    resultHierarchy["superConceptLabel"]["value"],
-                                    superConceptIdent,
-                                ),
-                                shape="box",
-                                color="grey",
-                                nodeType=conceptType,
-                                style=conceptStyle[conceptType],
-                                fillcolor="#ffffff",
-                            )
-                        if not graph.has_edge(subConceptIdent, superConceptIdent):
-                            graph.add_edge(
-                                subConceptIdent,
-                                superConceptIdent,
-                                arrowhead="onormal",
-                                color="grey",
-                                style="dotted",
-                            )
+            edges[result["concept"]["value"]][edge] = None
+    return {uri: list(conceptEdges) for uri, conceptEdges in edges.items()}
 
-                graph.add_edge(
-                    conceptIdent,
-                    alternativeIdent,
-                    arrowhead="vee",
-                    color="grey",
-                    fontcolor="grey",
-                    style="dotted",
-                )
 
-        # conceptType = "OperationDeprecated"
-        query = (
-            """
-SELECT DISTINCT ?conceptURI ?conceptLabel ?conceptAlternative ?conceptAlternativeLabel
-WHERE {
-  VALUES ?tool { """
-            + toolURI
-            + """ }
+def get_neighbor_restrictions(conceptURI):
+    """
+    Return the owl:someValuesFrom restrictions of a concept and of its current EDAM ancestors.
 
-  ?tool sc:featureList ?conceptURI .
-  #?conceptURI rdf:type owl:Class .
-  { ?conceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  UNION
-  { ?conceptURI owl:deprecated true }
-  UNION
-  { ?conceptURI owl:deprecated "true" }
-  UNION
-  { ?conceptURI owl:deprecated "True" }
-  OPTIONAL { ?conceptURI rdfs:label ?cLabel }
-  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
+    The restrictions are read from the local EDAM hierarchy (see get_edam_neighbors)
+    when the EDAM OWL file has the EDAM version of the knowledge graph (see
+    edam_hierarchy_available), and queried from the SPARQL endpoint otherwise.
+
+    Returns
+    -------
+    list[tuple[str, str, str]]
+        (relationURI, neighborURI, neighborLabel) tuples.
+    """
+    if edam_hierarchy_available():
+        return get_edam_neighbors(conceptURI)
+
+    if conceptURI.startswith("http"):
+        conceptURI = "<" + conceptURI + ">"
+    query = (
+        """
+SELECT DISTINCT ?concept ?relation ?neighbor ?neighborLabel
+WHERE {
+  VALUES ?concept { """
+        + conceptURI
+        + """ }
+ 
+  ?concept rdfs:subClassOf* ?conceptAncestor .
+  ?conceptAncestor rdf:type owl:Class .
+  FILTER NOT EXISTS { ?conceptAncestor rdfs:subClassOf? owl:DeprecatedClass }
   
-  OPTIONAL {
-    ?conceptURI oboInOwl:consider ?conceptAlternative .
-    OPTIONAL { ?conceptAlternative rdfs:label ?caLabel }
-    BIND(COALESCE(?caLabel, "") AS ?conceptAlternativeLabel)
-  }
+  ?conceptAncestor rdfs:subClassOf ?restriction .
+  ?restriction rdf:type owl:Restriction .
+  ?restriction owl:onProperty ?relation .
+  ?restriction owl:someValuesFrom ?neighbor .
+  OPTIONAL { ?neighbor rdfs:label ?neighborConceptLabel }
+  BIND(COALESCE(?neighborConceptLabel, "") AS ?neighborLabel)
 }
 """
+    )
+    results = sparql_query(prefixes + query)
+    return [
+        (
+            result["relation"]["value"],
+            result["neighbor"]["value"],
+            result["neighborLabel"]["value"],
         )
-        sparql = SPARQLWrapper(endpointURL)
-        sparql.setQuery(prefixes + query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        for result in results["results"]["bindings"]:
-            conceptType = "OperationDeprecated"
-            directConcepts.append(result["conceptURI"]["value"])
-            conceptIdent = result["conceptURI"]["value"].replace(edamURI, "")
-            # print("\t{}\t{}".format(conceptIdent, result["conceptLabel"]["value"]))
-            if not graph.has_node(conceptIdent):
-                graph.add_node(
-                    conceptIdent,
-                    label="{}\n({})".format(
-                        result["conceptLabel"]["value"], conceptIdent
-                    ),
-                    nodeType=conceptType,
-                    shape="box",
-                    color="grey",
-                    style=conceptStyle[conceptType],
-                    fillcolor="#ffffff",
-                )
-            graph.add_edge(
-                toolIdent,
-                conceptIdent,
-                arrowhead="vee",
-                color="grey",
-                fontcolor="grey",
-                style="dashed",
-            )
-            if "conceptAlternative" in result.keys():
-                conceptType = "OperationAlternative"
-                alternativeURI = result["conceptAlternative"]["value"]
-                alternativeIdent = alternativeURI.replace(edamURI, "")
-                if not graph.has_node(alternativeIdent):
-                    graph.add_node(
-                        alternativeIdent,
-                        label="{}\n({})".format(
-                            result["conceptAlternativeLabel"]["value"], alternativeIdent
-                        ),
-                        nodeType=conceptType,
-                        shape="box",
-                        color="grey",
-                        style=conceptStyle[conceptType],
-                        fillcolor="#ffffff",
-                    )
-                    queryHierarchy = (
-                        """
-SELECT DISTINCT ?subConceptURI ?subConceptLabel ?superConceptURI ?superConceptLabel 
-WHERE {
-  VALUES ?conceptURI { <"""
-                        + alternativeURI
-                        + """> }
-  ?conceptURI rdfs:subClassOf* ?subConceptURI .
-  ?subConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?subConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?subConceptURI rdfs:label ?subLabel }
-  ?subConceptURI rdfs:subClassOf ?superConceptURI .
-  ?superConceptURI rdf:type owl:Class .
-  FILTER NOT EXISTS { ?superConceptURI rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?superConceptURI rdfs:label ?supLabel }
-  BIND(COALESCE(?subLabel, "") AS ?subConceptLabel)
-  BIND(COALESCE(?supLabel, "") AS ?superConceptLabel)
-}
-"""
-                    )
-                    sparqlHierarchy = SPARQLWrapper(endpointURL)
-                    sparqlHierarchy.setQuery(prefixes + queryHierarchy)
-                    sparqlHierarchy.setReturnFormat(JSON)
-                    resultsHierarchy = sparqlHierarchy.query().convert()
-                    for resultHierarchy in resultsHierarchy["results"]["bindings"]:
-                        subConceptIdent = resultHierarchy["subConceptURI"][
-                            "value"
-                        ].replace(edamURI, "")
-                        superConceptIdent = resultHierarchy["superConceptURI"][
-                            "value"
-                        ].replace(edamURI, "")
-                        if not graph.has_node(subConceptIdent):
-                            graph.add_node(
-                                subConceptIdent,
-                                label="{}\n{}".format(
-                                    resultHierarchy["subConceptLabel"]["value"],
-                                    subConceptIdent,
-                                ),
-                                shape="box",
-                                color="grey",
-                                nodeType=conceptType,
-                                style=conceptStyle[conceptType],
-                                fillcolor="#ffffff",
-                            )
-                        if not graph.has_node(superConceptIdent):
-                            graph.add_node(
-                                superConceptIdent,
-                                label="{}\n{}".format(
-                                    resultHierarchy["superConceptLabel"]["value"],
-                                    superConceptIdent,
-                                ),
-                                shape="box",
-                                color="grey",
-                                nodeType=conceptType,
-                                style=conceptStyle[conceptType],
-                                fillcolor="#ffffff",
-                            )
-                        if not graph.has_edge(subConceptIdent, superConceptIdent):
-                            graph.add_edge(
-                                subConceptIdent,
-                                superConceptIdent,
-                                arrowhead="onormal",
-                                color="grey",
-                                style="dotted",
-                            )
-                graph.add_edge(
-                    conceptIdent,
-                    alternativeIdent,
-                    arrowhead="vee",
-                    color="grey",
-                    fontcolor="grey",
-                    style="dotted",
-                )
-
-    return graph
+        for result in results["results"]["bindings"]
+    ]
 
 
-def getToolLabel(toolURI):
-    """Return the label of a tool (or empty string if no label is present).
+def getHierarchyGraph(
+    entityURI,
+    graph=None,
+    direction="ancestors",
+    displayIdentifier=False,
+    highlightEntity=False,
+):
+    """Return a graph representing the hierarchy of (in)direct superclasses or subclasses for an entity.
 
     Keyword arguments:
-    toolURI -- the URI for the tool
+    entityURI -- the URI for the entity
+    graph -- the graph in which the hierarchy is added. A new graph is created if the value is None. (default: None)
+    direction -- should the hierarchy concern the ancestors and/or the descendants of the entity. Possible values: "ancestors", "descendants", "both" (default: "ancestors")
+    displayIdentifier -- should the nodes also display their URI (default: False)
+    highlightEntity -- should the entity be highlighted (default:False)
     """
+    if graph is None:
+        # graph = Digraph(graph_attr={'rankdir': 'BT'})
+        graph = pgv.AGraph(directed=True, rankdir="BT")
 
-    if toolURI.startswith("http"):
-        toolURI = "<" + toolURI + ">"
-    query = (
-        """
-SELECT DISTINCT ?tool ?toolLabel
-WHERE {
-  VALUES ?tool { """
-        + toolURI
-        + """ }
+    entityIdent = entityURI.replace(edamURI, "").replace("edam:", "")
 
-  ?tool rdf:type sc:SoftwareApplication .
-  OPTIONAL { ?tool sc:name ?tLabel }
-  BIND(COALESCE(?tLabel, "") AS ?toolLabel)
-}
-"""
-    )
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.queryAndConvert()
-    return results["results"]["bindings"][0]["toolLabel"]["value"]
+    entityType = "Class"
+    if entityIdent.startswith("topic_"):
+        entityType = "Topic"
+    elif entityIdent.startswith("operation_"):
+        entityType = "Operation"
+
+    conceptStyle = {}
+    conceptStyle["Class"] = "filled"
+    conceptStyle["Tool"] = "filled"
+    conceptStyle["Topic"] = "filled"
+    conceptStyle["Operation"] = "rounded,filled"
 
+    for (
+        subConceptURI,
+        subConceptLabel,
+        superConceptURI,
+        superConceptLabel,
+    ) in get_hierarchy_edges(entityURI, direction):
+        startClassIdent = subConceptURI.replace(edamURI, "")
+        startClassLabel = subConceptLabel + (
+            "\n(" + startClassIdent + ")" if displayIdentifier else ""
+        )
+        endClassIdent = superConceptURI.replace(edamURI, "")
+        endClassLabel = superConceptLabel + (
+            "\n(" + endClassIdent + ")" if displayIdentifier else ""
+        )
+
+        # graph.node(startClassIdent, label=startClassLabel, shape="box")
+        # graph.node(endClassIdent, label=endClassLabel, shape="box")
+        # graph.edge(startClassIdent, endClassIdent, arrowhead="onormal")
+        graph.add_node(
+            startClassIdent,
+            label=startClassLabel,
+            shape="box",
+            color="black",
+            nodeType=entityType,
+            style=conceptStyle[entityType],
+            fillcolor="#ffffff",
+        )
+        graph.add_node(
+            endClassIdent,
+            label=endClassLabel,
+            shape="box",
+            color="black",
+            nodeType=entityType,
+            style=conceptStyle[entityType],
+            fillcolor="#ffffff",
+        )
+        graph.add_edge(startClassIdent, endClassIdent, arrowhead="onormal")
+
+    if highlightEntity:
+        if graph.has_node(entityIdent):
+            graph.get_node(entityIdent).attr["color"] = "red"
+        else:
+            graph.add_node(entityIdent, color="red")
+    return graph
+
+
+def get_edam_neighbors_dataframe(endpointURL, prefixes):
+    """
+    Execute SPARQL query to find EDAM concepts with neighbors and save as DataFrame/TSV.BZ2
+
+    Parameters:
+    - endpoint_url: SPARQL endpoint URL
+    - prefixes: SPARQL prefixes string
+    - output_file: Optional output filename for TSV.BZ2 file
+
+    Returns:
+    - pandas DataFrame with query results
+    """
+
+    query = """
+    # Find EDAM concept with neighbors that inherit other neighbors from one of its ancestors
+    SELECT DISTINCT ?concept ?conceptLabel ?neighborRelation ?conceptNeighbor ?conceptNeighborLabel ?conceptAncestor ?conceptAncestorLabel ?ancestorNeighborRelation ?conceptAncestorNeighbor ?conceptAncestorNeighborLabel 
+    WHERE {
+      ?concept rdf:type owl:Class .
+      OPTIONAL { ?concept rdfs:label ?conceptLabel . }
+      FILTER NOT EXISTS { ?concept rdfs:subClassOf? owl:DeprecatedClass }
+      
+      ?concept rdfs:subClassOf [
+        rdf:type owl:Restriction ;
+        owl:onProperty ?neighborRelation ;
+        owl:someValuesFrom ?conceptNeighbor
+      ] .
+      ?conceptNeighbor rdf:type owl:Class .
+      FILTER NOT EXISTS { ?conceptNeighbor rdfs:subClassOf? owl:DeprecatedClass }
+      OPTIONAL { ?conceptNeighbor rdfs:label ?conceptNeighborLabel . }
+      
+      ?concept rdfs:subClassOf+ ?conceptAncestor .
+      OPTIONAL { ?conceptAncestor rdfs:label ?conceptAncestorLabel . }
+      FILTER NOT EXISTS { ?conceptAncestor rdfs:subClassOf? owl:DeprecatedClass }
+      
+      ?conceptAncestor rdfs:subClassOf [
+        rdf:type owl:Restriction ;
+        owl:onProperty ?ancestorNeighborRelation ;
+        owl:someValuesFrom ?conceptAncestorNeighbor
+      ] .
+      ?conceptAncestorNeighbor rdf:type owl:Class .
+      FILTER NOT EXISTS { ?conceptAncestorNeighbor rdfs:subClassOf? owl:DeprecatedClass }
+      OPTIONAL { ?conceptAncestorNeighbor rdfs:label ?conceptAncestorNeighborLabel . }
+    }
+    """
+
+    # Execute SPARQL query
+    results = sparql_query(prefixes + query, endpointURL)
+
+    # Convert to pandas DataFrame using the adapted function
+    df = sparql_results_to_dataframe(results)
+    return df
+
+
+def get_edam_chained_neighbors_dataframe(endpointURL, prefixes):
+    """
+    Execute SPARQL query to find EDAM concepts with chained neighbors and save as DataFrame/TSV.BZ2
+
+    Parameters:
+    - endpoint_url: SPARQL endpoint URL
+    - prefixes: SPARQL prefixes string
+    - output_file: Optional output filename for TSV.BZ2 file
+
+    Returns:
+    - pandas DataFrame with chained neighbor relationships
+    """
+
+    query = """
+    # Chained neighbors: Find EDAM concept with neighbors that have neighbors of their own
+    SELECT DISTINCT ?concept ?conceptLabel ?neighborRelation ?conceptNeighbor ?conceptNeighborLabel ?neighborNeighborRelation ?neighborNeighbor ?neighborNeighborLabel 
+    WHERE {
+      ?concept rdf:type owl:Class .
+      OPTIONAL { ?concept rdfs:label ?conceptLabel . }
+      FILTER NOT EXISTS { ?concept rdfs:subClassOf? owl:DeprecatedClass }
+      
+      ?concept rdfs:subClassOf [
+        rdf:type owl:Restriction ;
+        owl:onProperty ?neighborRelation ;
+        owl:someValuesFrom ?conceptNeighbor
+      ] .
+      ?conceptNeighbor rdf:type owl:Class .
+      FILTER NOT EXISTS { ?conceptNeighbor rdfs:subClassOf? owl:DeprecatedClass }
+      OPTIONAL { ?conceptNeighbor rdfs:label ?conceptNeighborLabel . }
+      
+      ?conceptNeighbor rdfs:subClassOf [
+        rdf:type owl:Restriction ;
+        owl:onProperty ?neighborNeighborRelation ;
+        owl:someValuesFrom ?neighborNeighbor
+      ] .
+      ?neighborNeighbor rdf:type owl:Class .
+      FILTER NOT EXISTS { ?neighborNeighbor rdfs:subClassOf? owl:DeprecatedClass }
+      OPTIONAL { ?neighborNeighbor rdfs:label ?neighborNeighborLabel . }
+    }
+    """
+
+    # Execute SPARQL query
+    results = sparql_query(prefixes + query, endpointURL)
+
+    # Convert to pandas DataFrame
+    df = sparql_results_to_dataframe(results)
+
+    return df
+
+
+def getEntityDescriptionGraph(
+    entityURI,
+    graph=None,
+    direction="ancestors",
+    displayIdentifier=False,
+    highlightEntity=False,
+):
+    """Return a graph representing the neighbors of an entity.
+
+    Keyword arguments:
+    entityURI -- the URI for the entity
+    graph -- the graph in which the hierarchy is added. A new graph is created if the value is None. (default: None)
+    direction -- should the hierarchy concern the ancestors and/or the descendants of the entity. Possible values: "ancestors", "descendants", "both" (default: "ancestors")
+    displayIdentifier -- should the nodes also display their URI (default: False)
+    highlightEntity -- should the entity be highlighted (default:False)
+    """
+    entityIdent = entityURI.replace(edamURI, "").replace("edam:", "")
+    graph = getHierarchyGraph(
+        entityURI,
+        graph=graph,
+        direction=direction,
+        displayIdentifier=displayIdentifier,
+        highlightEntity=highlightEntity,
+    )
+    conceptStyle = {}
+    conceptStyle["Class"] = "filled"
+    conceptStyle["Tool"] = "filled"
+    conceptStyle["Topic"] = "filled"
+    conceptStyle["Operation"] = "rounded,filled"
+    conceptStyle["Data"] = "filled"
+    conceptStyle["Format"] = "rounded,filled"
+
+    conceptShape = {}
+    conceptShape["Class"] = "box"
+    conceptShape["Tool"] = "oval"
+    conceptShape["Topic"] = "box"
+    conceptShape["Operation"] = "box"
+    conceptShape["Data"] = "hexagon"
+    conceptShape["Format"] = "parallelogram"
+
+    conceptFillColor = (
+        {}
+    )  # values from ColorBrewer paster theme https://en.wikipedia.org/wiki/ColorBrewer
+    conceptFillColor["Class"] = "white"
+    conceptFillColor["Tool"] = "white"
+    conceptFillColor["Topic"] = "#ccebc5"  # green
+    conceptFillColor["Operation"] = "#b3cde3"  # blue
+    conceptFillColor["Data"] = "#fbb4ae"  # red
+    conceptFillColor["Format"] = "#fed9a6"  # orange
+
+    for relationURI, neighborURI, neighborLabel in get_neighbor_restrictions(entityURI):
+        relationIdent = relationURI.replace(edamURI, "")
+        neighborIdent = neighborURI.replace(edamURI, "")
+        neighborLabel = neighborLabel + (
+            "\n(" + neighborIdent + ")" if displayIdentifier else ""
+        )
+        neighborType = "Class"
+        if neighborIdent.startswith("topic_"):
+            neighborType = "Topic"
+        elif neighborIdent.startswith("operation_"):
+            neighborType = "Operation"
+        elif neighborIdent.startswith("data_"):
+            neighborType = "Data"
+        elif neighborIdent.startswith("format_"):
+            neighborType = "Format"
+        graph.add_node(
+            neighborIdent,
+            label=neighborLabel,
+            shape=conceptShape[neighborType],
+            color="black",
+            nodeType=neighborType,
+            style=conceptStyle[neighborType],
+            fillcolor=conceptFillColor[neighborType],
+        )
+        graph.add_edge(
+            entityIdent,
+            neighborIdent,
+            arrowhead="open",
+            label=relationIdent,
+            color="purple",
+            fontcolor="purple",
+        )
+    return graph
+
+
+def getToolsGraphData(
+    listToolURI,
+    showTopics=True,
+    showOperations=True,
+    showDeprecatedAnnotations=False,
+):
+    """Fetch everything addToolAndAnnotationsToGraph draws for a list of tools, in a constant number of queries.
+
+    The labels, direct annotations and deprecated annotations of all the tools are
+    retrieved with one `VALUES ?tool { ... }` query each, and the hierarchy of all
+    the annotations with get_hierarchies_edges.
+
+    Keyword arguments:
+    listToolURI -- list of the URIs for the tools
+    showTopics -- should the topics annotating the tools be considered (default: True)
+    showOperations -- should the operations annotating the tools be considered (default: True)
+    showDeprecatedAnnotations -- should the deprecated topics and operations annotating the tools be considered (default: False)
+
+    Returns a dictionary with the keys:
+    "labels" -- {toolURI -> label}, for the tools found in the knowledge graph
+    "Topic", "Operation" -- {toolURI -> [(conceptURI, conceptLabel)]}
+    "TopicDeprecated", "OperationDeprecated" -- {toolURI -> [(conceptURI, conceptLabel, alternativeURI or None, alternativeLabel)]}
+    "hierarchy" -- {conceptURI -> hierarchy edges (see get_hierarchy_edges)}
+
+    The tools are keyed by their full URI, the prefixed ones being resolved with
+    normalize_uri.
+    """
+    toolValues = valuesClause([normalize_uri(toolURI) for toolURI in listToolURI])
+    graphData = {"labels": {}}
+
+    query = (
+        """
+SELECT DISTINCT ?tool ?toolLabel
+WHERE {
+  VALUES ?tool { """
+        + toolValues
+        + """ }
+
+  ?tool rdf:type sc:SoftwareApplication .
+  OPTIONAL { ?tool sc:name ?tLabel }
+  BIND(COALESCE(?tLabel, "") AS ?toolLabel)
+}
+"""
+    )
+    results = sparql_query(prefixes + query)
+    for result in results["results"]["bindings"]:
+        graphData["labels"].setdefault(
+            result["tool"]["value"], result["toolLabel"]["value"]
+        )
+
+    hierarchyConcepts = []
+    for conceptType, shown in (("Topic", showTopics), ("Operation", showOperations)):
+        if not shown:
+            continue
+        graphData[conceptType] = {}
+        query = (
+            """
+SELECT DISTINCT ?tool ?conceptURI ?conceptLabel
+WHERE {
+  VALUES ?tool { """
+            + toolValues
+            + """ }
+
+  ?tool """
+            + annotationProperties[conceptType]
+            + """ ?conceptURI .
+  ?conceptURI rdf:type owl:Class .
+  FILTER NOT EXISTS { ?conceptURI rdfs:subClassOf? owl:DeprecatedClass }
+  OPTIONAL { ?conceptURI rdfs:label ?cLabel }
+  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
+}
+"""
+        )
+        results = sparql_query(prefixes + query)
+        for result in results["results"]["bindings"]:
+            graphData[conceptType].setdefault(result["tool"]["value"], []).append(
+                (result["conceptURI"]["value"], result["conceptLabel"]["value"])
+            )
+            hierarchyConcepts.append(result["conceptURI"]["value"])
+
+    if showDeprecatedAnnotations:
+        for conceptType in ("Topic", "Operation"):
+            graphData[conceptType + "Deprecated"] = {}
+            query = (
+                """
+SELECT DISTINCT ?tool ?conceptURI ?conceptLabel ?conceptAlternative ?conceptAlternativeLabel
+WHERE {
+  VALUES ?tool { """
+                + toolValues
+                + """ }
+
+  ?tool """
+                + annotationProperties[conceptType]
+                + """ ?conceptURI .
+  #?conceptURI rdf:type owl:Class .
+  { ?conceptURI rdfs:subClassOf? owl:DeprecatedClass }
+  UNION
+  { ?conceptURI owl:deprecated true }
+  UNION
+  { ?conceptURI owl:deprecated "true" }
+  UNION
+  { ?conceptURI owl:deprecated "True" }
+  OPTIONAL { ?conceptURI rdfs:label ?cLabel }
+  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
+  
+  OPTIONAL {
+    ?conceptURI oboInOwl:consider ?conceptAlternative .
+    OPTIONAL { ?conceptAlternative rdfs:label ?caLabel }
+    BIND(COALESCE(?caLabel, "") AS ?conceptAlternativeLabel)
+  }
+}
+"""
+            )
+            results = sparql_query(prefixes + query)
+            for result in results["results"]["bindings"]:
+                alternativeURI = None
+                alternativeLabel = ""
+                if "conceptAlternative" in result.keys():
+                    alternativeURI = result["conceptAlternative"]["value"]
+                    alternativeLabel = result["conceptAlternativeLabel"]["value"]
+                    hierarchyConcepts.append(alternativeURI)
+                graphData[conceptType + "Deprecated"].setdefault(
+                    result["tool"]["value"], []
+                ).append(
+                    (
+                        result["conceptURI"]["value"],
+                        result["conceptLabel"]["value"],
+                        alternativeURI,
+                        alternativeLabel,
+                    )
+                )
+
+    graphData["hierarchy"] = get_hierarchies_edges(hierarchyConcepts)
+    return graphData
+
+
+def addToolAndAnnotationsToGraph(
+    toolURI,
+    graph=None,
+    showTopics=True,
+    showOperations=True,
+    showDeprecatedAnnotations=False,
+    highlightDirectAnnotations=False,
+    graphData=None,
+):
+    """Return a graph representing a tool and its EDAM annotations.
+
+    Keyword arguments:
+    toolURI -- the URI for the tool
+    graph -- the graph in which the tool and its annotations are added. A new graph is created if the value is None. (default: None)
+    showTopics -- should the topics annotating the tool be considered (default: True)
+    showOperations -- should the operations annotating the tool be considered (default: True)
+    showDeprecatedAnnotations -- should the deprecated topics and operations annotating the tool be considered (default: False)
+    highlightDirectAnnotations -- should the topics or operations annotated directly be highliigthed (default:False)
+    graphData -- the annotations of the tool, as returned by getToolsGraphData for a list of tools including this one. They are fetched if the value is None. (default: None)
+    """
+    if graph is None:
+        graph = pgv.AGraph(directed=True, rankdir="BT")
+
+    if graphData is None:
+        graphData = getToolsGraphData(
+            [toolURI],
+            showTopics=showTopics,
+            showOperations=showOperations,
+            showDeprecatedAnnotations=showDeprecatedAnnotations,
+        )
+
+    toolURI = normalize_uri(toolURI)
+    toolIdent = toolURI.replace(biotoolsURI, "")
+
+    directAnnotationColor = "red" if highlightDirectAnnotations else "black"
+
+    conceptStyle = {}
+    conceptStyle["Tool"] = "filled"
+    conceptStyle["Topic"] = "filled"
+    conceptStyle["TopicDeprecated"] = conceptStyle["Topic"] + ",dashed"
+    conceptStyle["TopicAlternative"] = conceptStyle["Topic"] + ",dotted"
+    conceptStyle["Operation"] = "rounded,filled"
+    conceptStyle["OperationDeprecated"] = conceptStyle["Operation"] + ",dashed"
+    conceptStyle["OperationAlternative"] = conceptStyle["Operation"] + ",dotted"
+
+    if toolURI in graphData["labels"]:
+        # print("{}\t{}".format(toolIdent, graphData["labels"][toolURI]))
+        if not graph.has_node(toolIdent):
+            clusterTools = graph.get_subgraph(name="cluster_tools")
+            if clusterTools is None:
+                clusterTools = graph.add_subgraph(
+                    name="cluster_tools", rankdir="same", style="invis"
+                )  # style="invis"
+            clusterTools.add_node(
+                toolIdent,
+                label="{}".format(graphData["labels"][toolURI]),
+                shape="ellipse",
+                color="blue",
+                nodeType="Tool",
+                style=conceptStyle["Tool"],
+                fillcolor="#ffffff",
+            )
+
+    for conceptType, shown in (("Topic", showTopics), ("Operation", showOperations)):
+        if not shown:
+            continue
+        directConcepts = []
+        for conceptURI, conceptLabel in graphData[conceptType].get(toolURI, []):
+            directConcepts.append(conceptURI)
+            conceptIdent = conceptURI.replace(edamURI, "")
+            # print("\t{}\t{}".format(conceptIdent, conceptLabel))
+            if not graph.has_node(conceptIdent):
+                graph.add_node(
+                    conceptIdent,
+                    label="{}\n({})".format(conceptLabel, conceptIdent),
+                    nodeType=conceptType,
+                    shape="box",
+                    color=directAnnotationColor,
+                    style=conceptStyle[conceptType],
+                    fillcolor="#ffffff",
+                )
+            graph.add_edge(
+                toolIdent,
+                conceptIdent,
+                arrowhead="vee",
+                color="blue",
+                fontcolor="blue",
+                style="dashed",
+            )
+
+        for conceptURI in directConcepts:
+            for (
+                subConceptURI,
+                subConceptLabel,
+                superConceptURI,
+                superConceptLabel,
+            ) in graphData["hierarchy"][conceptURI]:
+                subConceptIdent = subConceptURI.replace(edamURI, "")
+                superConceptIdent = superConceptURI.replace(edamURI, "")
+                if not graph.has_node(subConceptIdent):
+                    graph.add_node(
+                        subConceptIdent,
+                        label="{}\n{}".format(subConceptLabel, subConceptIdent),
+                        shape="box",
+                        color="black",
+                        nodeType=conceptType,
+                        style=conceptStyle[conceptType],
+                        fillcolor="#ffffff",
+                    )
+                if not graph.has_node(superConceptIdent):
+                    graph.add_node(
+                        superConceptIdent,
+                        label="{}\n{}".format(superConceptLabel, superConceptIdent),
+                        shape="box",
+                        color="black",
+                        nodeType=conceptType,
+                        style=conceptStyle[conceptType],
+                        fillcolor="#ffffff",
+                    )
+                graph.add_edge(subConceptIdent, superConceptIdent, arrowhead="onormal")
+
+    if showDeprecatedAnnotations:
+        for conceptType in ("Topic", "Operation"):
+            deprecatedAnnotations = graphData[conceptType + "Deprecated"].get(
+                toolURI, []
+            )
+            for (
+                conceptURI,
+                conceptLabel,
+                alternativeURI,
+                alternativeLabel,
+            ) in deprecatedAnnotations:
+                conceptIdent = conceptURI.replace(edamURI, "")
+                # print("\t{}\t{}".format(conceptIdent, conceptLabel))
+                if not graph.has_node(conceptIdent):
+                    graph.add_node(
+                        conceptIdent,
+                        label="{}\n({})".format(conceptLabel, conceptIdent),
+                        nodeType=conceptType + "Deprecated",
+                        shape="box",
+                        color="grey",
+                        style=conceptStyle[conceptType + "Deprecated"],
+                        fillcolor="#ffffff",
+                    )
+                graph.add_edge(
+                    toolIdent,
+                    conceptIdent,
+                    arrowhead="vee",
+                    color="grey",
+                    fontcolor="grey",
+                    style="dashed",
+                )
+                if alternativeURI is None:
+                    continue
+                alternativeType = conceptType + "Alternative"
+                alternativeIdent = alternativeURI.replace(edamURI, "")
+                if not graph.has_node(alternativeIdent):
+                    graph.add_node(
+                        alternativeIdent,
+                        label="{}\n({})".format(alternativeLabel, alternativeIdent),
+                        nodeType=alternativeType,
+                        shape="box",
+                        color="grey",
+                        style=conceptStyle[alternativeType],
+                        fillcolor="#ffffff",
+                    )
+                    for (
+                        subConceptURI,
+                        subConceptLabel,
+                        superConceptURI,
+                        superConceptLabel,
+                    ) in graphData["hierarchy"][alternativeURI]:
+                        subConceptIdent = subConceptURI.replace(edamURI, "")
+                        superConceptIdent = superConceptURI.replace(edamURI, "")
+                        if not graph.has_node(subConceptIdent):
+                            graph.add_node(
+                                subConceptIdent,
+                                label="{}\n{}".format(
+                                    subConceptLabel,
+                                    subConceptIdent,
+                                ),
+                                shape="box",
+                                color="grey",
+                                nodeType=alternativeType,
+                                style=conceptStyle[alternativeType],
+                                fillcolor="#ffffff",
+                            )
+                        if not graph.has_node(superConceptIdent):
+                            graph.add_node(
+                                superConceptIdent,
+                                label="{}\n{}".format(
+                                    superConceptLabel,
+                                    superConceptIdent,
+                                ),
+                                shape="box",
+                                color="grey",
+                                nodeType=alternativeType,
+                                style=conceptStyle[alternativeType],
+                                fillcolor="#ffffff",
+                            )
+                        if not graph.has_edge(subConceptIdent, superConceptIdent):
+                            graph.add_edge(
+                                subConceptIdent,
+                                superConceptIdent,
+                                arrowhead="onormal",
+                                color="grey",
+                                style="dotted",
+                            )
+                graph.add_edge(
+                    conceptIdent,
+                    alternativeIdent,
+                    arrowhead="vee",
+                    color="grey",
+                    fontcolor="grey",
+                    style="dotted",
+                )
+
+    return graph
+
+
+def getToolLabel(toolURI):
+    """Return the label of a tool (or empty string if no label is present).
+
+    Keyword arguments:
+    toolURI -- the URI for the tool
+    """
+
+    if toolURI.startswith("http"):
+        toolURI = "<" + toolURI + ">"
+    query = (
+        """
+SELECT DISTINCT ?tool ?toolLabel
+WHERE {
+  VALUES ?tool { """
+        + toolURI
+        + """ }
+
+  ?tool rdf:type sc:SoftwareApplication .
+  OPTIONAL { ?tool sc:name ?tLabel }
+  BIND(COALESCE(?tLabel, "") AS ?toolLabel)
+}
+"""
+    )
+    results = sparql_query(prefixes + query)
+    return results["results"]["bindings"][0]["toolLabel"]["value"]
+
+
+def getToolURIByLabel(toolLabel):
+    """Return the URI of a tool designated by its label (or None).
+
+    Keyword arguments:
+    toolLabel -- the label for the tool
+    """
+
+    query = (
+        """
+SELECT DISTINCT ?tool ?toolLabel
+WHERE {
+  VALUES ?toolLabel { \""""
+        + toolLabel
+        + """\" }
+
+  ?tool rdf:type sc:SoftwareApplication .
+  ?tool sc:name ?toolLabel .
+}
+"""
+    )
+    results = sparql_query(prefixes + query)
+    return (
+        None
+        if len(results["results"]["bindings"]) == 0
+        else results["results"]["bindings"][0]["tool"]["value"]
+    )
+
+
+def getToolTopics(toolURI, transitive=False):
+    """Return the list of the (URI, label) tuples for the topics associated to a tool.
+
+    Keyword arguments:
+    toolURI -- the URI for the tool
+    transitive -- also consider the ancestors of the topics directly associated to the tool (default: False)
+    """
+
+    if toolURI.startswith("http"):
+        toolURI = "<" + toolURI + ">"
+    transitiveClause = "/(rdfs:subClassOf*)" if transitive else ""
+    query = (
+        """
+SELECT DISTINCT ?tool ?topic ?topicLabel
+WHERE {
+  VALUES ?tool { """
+        + toolURI
+        + """ }
+
+  ?tool sc:applicationSubCategory"""
+        + transitiveClause
+        + """ ?topic .
+  ?topic rdf:type owl:Class .
+  FILTER NOT EXISTS { ?topic rdfs:subClassOf? owl:DeprecatedClass }
+  OPTIONAL { ?topic rdfs:label ?tLabel }
+  BIND(COALESCE(?tLabel, "") AS ?topicLabel)
+}
+"""
+    )
+    results = sparql_query(prefixes + query)
+    toolTopics = [
+        (result["topic"]["value"], result["topicLabel"]["value"])
+        for result in results["results"]["bindings"]
+    ]
+    return toolTopics
+
+
+def getToolOperations(toolURI, transitive=False):
+    """Return the list of the (URI, label) tuples for the operations associated to a tool.
+
+    Keyword arguments:
+    toolURI -- the URI for the tool
+    transitive -- also consider the ancestors of the operations directly associated to the tool (default: False)
+    """
+
+    if toolURI.startswith("http"):
+        toolURI = "<" + toolURI + ">"
+    transitiveClause = "/(rdfs:subClassOf*)" if transitive else ""
+    query = (
+        """
+SELECT DISTINCT ?tool ?operation ?operationLabel
+WHERE {
+  VALUES ?tool { """
+        + toolURI
+        + """ }
+
+  ?tool sc:featureList"""
+        + transitiveClause
+        + """ ?operation .
+  ?operation rdf:type owl:Class .
+  FILTER NOT EXISTS { ?operation rdfs:subClassOf? owl:DeprecatedClass }
+  OPTIONAL { ?operation rdfs:label ?oLabel }
+  BIND(COALESCE(?oLabel, "") AS ?operationLabel)
+}
+"""
+    )
+    results = sparql_query(prefixes + query)
+    toolOperations = [
+        (result["operation"]["value"], result["operationLabel"]["value"])
+        for result in results["results"]["bindings"]
+    ]
+    return toolOperations
+
+
+def getToolsConcepts(listToolURI, conceptType, transitive=False):
+    """Return {toolURI -> list of the (URI, label) tuples} for the topics or operations associated to a list of tools, with one query.
+
+    Keyword arguments:
+    listToolURI -- list of the URIs for the tools
+    conceptType -- "Topic" or "Operation"
+    transitive -- also consider the ancestors of the concepts directly associated to a tool (default: False)
+    """
+    listToolURI = [normalize_uri(toolURI) for toolURI in listToolURI]
+    toolsConcepts = {toolURI: [] for toolURI in listToolURI}
+    if len(listToolURI) == 0:
+        return toolsConcepts
+    transitiveClause = "/(rdfs:subClassOf*)" if transitive else ""
+    query = (
+        """
+SELECT DISTINCT ?tool ?concept ?conceptLabel
+WHERE {
+  VALUES ?tool { """
+        + valuesClause(listToolURI)
+        + """ }
+
+  ?tool """
+        + annotationProperties[conceptType]
+        + transitiveClause
+        + """ ?concept .
+  ?concept rdf:type owl:Class .
+  FILTER NOT EXISTS { ?concept rdfs:subClassOf? owl:DeprecatedClass }
+  OPTIONAL { ?concept rdfs:label ?cLabel }
+  BIND(COALESCE(?cLabel, "") AS ?conceptLabel)
+}
+"""
+    )
+    results = sparql_query(prefixes + query)
+    for result in results["results"]["bindings"]:
+        toolsConcepts.setdefault(result["tool"]["value"], []).append(
+            (result["concept"]["value"], result["conceptLabel"]["value"])
+        )
+    return toolsConcepts
+
+
+def getToolsCommonConcepts(listToolURI, conceptType, transitive=False):
+    """Return the list of the (URI, label) tuples for the topics or operations associated to all the tools of a list.
+
+    Keyword arguments:
+    listToolURI -- list of the URIs for the tools
+    conceptType -- "Topic" or "Operation"
+    transitive -- also consider the ancestors of the concepts directly associated to a tool (default: False)
+    """
+    commonConcepts = None
+    for concepts in getToolsConcepts(listToolURI, conceptType, transitive).values():
+        if commonConcepts is None:
+            commonConcepts = set(concepts)
+        else:
+            commonConcepts = commonConcepts.intersection(concepts)
+    return list(commonConcepts or [])
+
+
+def getToolsCommonTopics(listToolURI, transitive=False):
+    """Return the list of the (URI, label) tuples for the topics associated to all the tools of a list.
+
+    Keyword arguments:
+    listToolURI -- list of the URIs for the tools
+    transitive -- also consider the ancestors of the topics directly associated to a tool (default: False)
+    """
+    return getToolsCommonConcepts(listToolURI, "Topic", transitive=transitive)
+
+
+def getToolsCommonOperations(listToolURI, transitive=False):
+    """Return the list of the (URI, label) tuples for the operations associated to all the tools of a list.
+
+    Keyword arguments:
+    listToolURI -- list of the URIs for the tools
+    transitive -- also consider the ancestors of the operations directly associated to a tool (default: False)
+    """
+    return getToolsCommonConcepts(listToolURI, "Operation", transitive=transitive)
+
+
+def addToolsAndAnnotationsToGraph(
+    listToolURI,
+    graph=None,
+    showTopics=True,
+    showOperations=True,
+    highlightDirectAnnotations=False,
+    highlightIntersection=False,
+):
+    """Return a graph representing tools and their EDAM annotations.
+
+    Keyword arguments:
+      listToolURI -- list of the URIs for the tools
+      graph -- the graph in which the tool and its annotations are added. A new graph is created if the value is None.
+      showTopics -- should the topics annotating the tool be considered
+      showOperations -- should the operations annotating the tool be considered
+      highlightDirectAnnotations -- should the topics or operations annotated directly be highlighted
+      highlightIntersection -- should the common topics or operations common to all the tools be highlighted
+    """
+    if graph is None:
+        graph = pgv.AGraph(directed=True, rankdir="BT")
+
+    # Fetch the annotations of all the tools at once, keyed by their full URI
+    listToolURI = [normalize_uri(toolURI) for toolURI in listToolURI]
+    graphData = getToolsGraphData(
+        listToolURI, showTopics=showTopics, showOperations=showOperations
+    )
+    for toolURI in listToolURI:
+        addToolAndAnnotationsToGraph(
+            toolURI,
+            graph=graph,
+            showTopics=showTopics,
+            showOperations=showOperations,
+            highlightDirectAnnotations=highlightDirectAnnotations,
+            graphData=graphData,
+        )
+
+    if highlightIntersection:
+        commonConcepts = []
+        if showTopics:
+            commonConcepts += getToolsCommonTopics(listToolURI, transitive=True)
+        if showOperations:
+            commonConcepts += getToolsCommonOperations(listToolURI, transitive=True)
+
+        for currentConcept, currentLabel in commonConcepts:
+            currentConceptIdent = currentConcept.replace(edamURI, "")
+            node = graph.get_node(currentConceptIdent)
+            node.attr["color"] = "red"
+            node.attr["penwidth"] = "3"  # Thicker border
+            node.attr["style"] = "filled,bold"  # Bold border and filled style
+            node.attr["fillcolor"] = "red"  # Red fill to highlight
+            node.attr["highlightIntersection"] = "True"  # Mark this node as highlighted
+
+    return graph
+
+
+def getScoreColorRGB(scoreValue, scoreMaxValue, color="red"):
+    """Return the RGB color (in hex) associated to a score, varying from white (0 score)
+    to a target color at the maximum score.
+
+    Keyword arguments:
+    scoreValue -- the score to consider (positive number)
+    scoreMaxValue -- the maximum value for the score (positive number, >= scoreValue)
+    color -- name of the color for the gradient. Possible values are:
+             "red", "green", "blue", "orange", "yellow", "pink", "grey".
+             (default: "red")
+    """
+    # Avoid division by 0.
+    scoreMaxValue = max(1, scoreMaxValue)
+    fraction = scoreValue / scoreMaxValue
+
+    # Define the target color values.
+    if color == "red":
+        target = (255, 0, 0)
+    elif color == "green":
+        target = (0, 255, 0)
+    elif color == "blue":
+        target = (0, 0, 255)
+    elif color == "orange":
+        target = (255, 165, 0)
+    elif color == "yellow":
+        target = (255, 255, 0)
+    elif color == "pink":
+        target = (255, 192, 203)  # Light pink (alternative: hot pink (255,105,180))
+    elif color == "grey":
+        target = (128, 128, 128)
+    else:
+        return "#ffffff"
+
+    # Interpolate from white (255,255,255) to the target color.
+    r = int(255 - fraction * (255 - target[0]))
+    g = int(255 - fraction * (255 - target[1]))
+    b = int(255 - fraction * (255 - target[2]))
+
+    return "#{:02x}{:02x}{:02x}".format(r, g, b)
+
+
+def dictTopic(dfTopicmetrics, metric_col, edamURI=edamURI):
+    """
+    Extract a dictionary for a given metric from dfTopicmetrics.
+    Returns only the dict (no max needed).
+    """
+
+    raw_dict = (
+        dfTopicmetrics[["topic", metric_col]].set_index("topic").to_dict()[metric_col]
+    )
+
+    dict_clean = {topic.replace(edamURI, ""): val for topic, val in raw_dict.items()}
+
+    return dict_clean
+
+
+def dictOperation(dfOperationmetrics, metric_col, edamURI=edamURI):
+    """
+    Extract a dictionary for a given operation metric from dfOperationmetrics.
+    Returns only the dict (no max).
+    """
+
+    raw_dict = (
+        dfOperationmetrics[["operation", metric_col]]
+        .set_index("operation")
+        .to_dict()[metric_col]
+    )
+
+    dict_clean = {op.replace(edamURI, ""): val for op, val in raw_dict.items()}
+
+    return dict_clean
+
+
+def buildTopicOperationDicts(metric_col):
+    """
+    Build the pair (dictTopicScore, dictOperationScore)
+    corresponding to a given metric column.
+    """
+    dictTopicScore = dictTopic(get_table("dfTopicmetrics"), metric_col)
+    dictOperationScore = dictOperation(get_table("dfOperationmetrics"), metric_col)
+    return dictTopicScore, dictOperationScore
+
+
+def colorGraphNodesAccordingToScore(
+    graph, dictTopicScore, dictOperationScore, color="red"
+):
+    """Modify nodes color according to a score associated to the node. Nodes that are not associated to a score are unaffected.
+
+    Keyword arguments:
+    graph -- the graph to be modified
+    dictTopicScore -- a dictionary {nodeIdent -> score} for topic nodes
+    dictOperationScore -- a dictionary {nodeIdent -> score} for operation nodes
+    color -- name of the color that will vary according to scores. Possible values are "red", "green" or "blue" (default: "red")
+    """
+    topicMaxValue = max(dictTopicScore.values(), default=0)
+    operationMaxValue = max(dictOperationScore.values(), default=0)
+    for currentNode in graph.nodes_iter():
+        if "nodeType" in currentNode.attr.keys():
+            currentNodeType = currentNode.attr["nodeType"]
+            # currentNode.attr['style'] = conceptStyle[currentNodeType]
+            if currentNodeType == "Topic":
+                if currentNode in dictTopicScore.keys():
+                    graph.get_node(currentNode).attr["fillcolor"] = getScoreColorRGB(
+                        dictTopicScore[currentNode], topicMaxValue, color=color
+                    )
+            elif currentNodeType == "Operation":
+                if currentNode in dictOperationScore.keys():
+                    graph.get_node(currentNode).attr["fillcolor"] = getScoreColorRGB(
+                        dictOperationScore[currentNode], operationMaxValue, color=color
+                    )
+
+
+def getToolScore(toolURI, transitive=False, dictTopicScore={}, dictOperationScore={}):
+    """Return a score for a tool computed as the sum of the scores of its annotations (0 if the tool has no annotation).
+
+    Keyword arguments:
+    toolURI -- the URI for the tool
+    transitive -- also consider the ancestors of the topics or operations directly associated to the tool (default: False)
+    dictTopicScore -- a dictionary {nodeIdent -> score} for topic nodes (default: {})
+    dictOperationScore -- a dictionary {nodeIdent -> score} for operation nodes (default: {})
+    """
+    toolScore = 0
+    for currentTopic in getToolTopics(toolURI, transitive=transitive):
+        currentTopicIdent = currentTopic[0].replace(edamURI, "")
+        if currentTopicIdent in dictTopicScore.keys():
+            toolScore += dictTopicScore[currentTopicIdent]
+    for currentOperation in getToolOperations(toolURI, transitive=transitive):
+        currentOperationIdent = currentOperation[0].replace(edamURI, "")
+        if currentOperationIdent in dictOperationScore.keys():
+            toolScore += dictOperationScore[currentOperationIdent]
+    return toolScore
+
+
+def getMutualInformation(
+    toolURI1: str,
+    toolURI2: str,
+    dfToolTopicTransitive,
+    dfToolOperationTransitive,
+    nbToolsWithTopic: int,
+    dictAnnotationPairsMutualInformation: dict | None = None,
+):
+    """
+    Compute Mutual Information between two tools based on their
+    transitive EDAM Topic + Operation annotations.
+    To score many pairs of tools, use MutualInformationEngine.
+
+    Parameters
+    ----------
+    toolURI1 : str
+    toolURI2 : str
+    dfToolTopicTransitive : pd.DataFrame
+        DataFrame with columns ["tool", "topic"].
+    dfToolOperationTransitive : pd.DataFrame
+        DataFrame with columns ["tool", "operation"].
+    nbToolsWithTopic : int
+        Total number of tools (normalizing denominator).
+    dictAnnotationPairsMutualInformation : dict, optional
+        Cache for mutual information computation, keyed by the pairs of
+        annotations in sorted order. A MutualInformationCache keeps it across
+        runs within a memory budget; it must be created for nbToolsWithTopic
+        and the same annotation tables.
+
+    Returns
+    -------
+    float
+        Mutual information score.
+    """
+
+    mi = 0.0
+
+    # ----------------------------
+    # Get annotation lists
+    # ----------------------------
+    annotT1 = (
+        dfToolTopicTransitive[dfToolTopicTransitive["tool"] == toolURI1][
+            "topic"
+        ].to_list()
+        + dfToolOperationTransitive[dfToolOperationTransitive["tool"] == toolURI1][
+            "operation"
+        ].to_list()
+    )
+
+    annotT2 = (
+        dfToolTopicTransitive[dfToolTopicTransitive["tool"] == toolURI2][
+            "topic"
+        ].to_list()
+        + dfToolOperationTransitive[dfToolOperationTransitive["tool"] == toolURI2][
+            "operation"
+        ].to_list()
+    )
+
+    # Pre-cache annotation -> tool sets for speed (topics and operations)
+    annotation2tools = {
+        annotation: set(
+            dfToolTopicTransitive[dfToolTopicTransitive["topic"] == annotation]["tool"]
+        )
+        | set(
+            dfToolOperationTransitive[
+                dfToolOperationTransitive["operation"] == annotation
+            ]["tool"]
+        )
+        for annotation in set(annotT1 + annotT2)
+    }
+
+    if (
+        isinstance(dictAnnotationPairsMutualInformation, MutualInformationCache)
+        and dictAnnotationPairsMutualInformation.nbTools != nbToolsWithTopic
+    ):
+        raise ValueError(
+            f"The cache holds terms for {dictAnnotationPairsMutualInformation.nbTools}"
+            f" tools, not {nbToolsWithTopic}"
+        )
+
+    # ----------------------------
+    # Compute MI
+    # ----------------------------
+    for a1 in annotT1:
+
+        toolsA1 = annotation2tools[a1]
+        pa1 = len(toolsA1) / nbToolsWithTopic
+
+        for a2 in annotT2:
+
+            # Check cached value (the term is symmetric: one entry per pair)
+            pair = (a1, a2) if a1 <= a2 else (a2, a1)
+            if dictAnnotationPairsMutualInformation is not None:
+                if pair in dictAnnotationPairsMutualInformation:
+                    mi += dictAnnotationPairsMutualInformation[pair]
+                    continue
+
+            toolsA2 = annotation2tools[a2]
+            pa2 = len(toolsA2) / nbToolsWithTopic
+            pa1a2 = len(toolsA1.intersection(toolsA2)) / nbToolsWithTopic
+
+            if pa1 * pa2 * pa1a2 != 0:
+                result = pa1a2 * np.log2(pa1a2 / (pa1 * pa2))
+            else:
+                result = 0.0
+
+            mi += result
+
+            # Save cached value
+            if dictAnnotationPairsMutualInformation is not None:
+                dictAnnotationPairsMutualInformation[pair] = result
+
+    return mi
+
+
+# === Persistent mutual information cache ===
+
+# Mutual information terms of pairs of annotations (see getMutualInformation),
+# kept across runs in the index folder for the snapshot they were computed on,
+# and evicted least recently used first beyond mi_cache_max_bytes
+mi_cache_max_bytes = 64 * 1024 * 1024
+
+# Approximate memory of an entry (key, value and slot of the OrderedDict)
+_MI_CACHE_ENTRY_BYTES = 160
+
+
+def snapshot_version() -> str:
+    """
+    Return the version of the snapshot: SHA-256 of the knowledge graph version,
+    of the tool and annotation tables and of the interned concept ids, which
+    changes whenever the values computed from them may change.
+    """
+    digest = hashlib.sha256(get_kg_version().encode())
+    paths = [
+        os.path.join(dataframe_dir, TABLE_FILES[name])
+        for name in ["dfTool", *ANNOTATION_TABLES]
+    ]
+    for path in paths + [os.path.join(index_dir(), "concepts.tsv.bz2")]:
+        digest.update(f"\0{os.path.basename(path)}\0".encode())
+        if os.path.exists(path):
+            digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+
+class MutualInformationCache(collections.abc.MutableMapping):
+    """
+    Bounded, persistent cache of the mutual information terms of pairs of
+    annotations, usable as the dictAnnotationPairsMutualInformation of
+    getMutualInformation.
+
+    The terms depend on the normalizing number of tools and on the annotation
+    tables they are computed from, which the cache is created for: the
+    getMutualInformation calls must pass the same ones.
+
+    The keys are pairs of concepts, given as URIs or interned ids (see
+    concept_index). The term being symmetric, (a1, a2) and (a2, a1) are one
+    entry, stored under the ordered pair of interned ids; pairs with a concept
+    outside the snapshot are not stored. Beyond max_bytes, the least recently
+    used entries are evicted. save() writes the entries to the index folder
+    with their version: the snapshot version (see snapshot_version), the number
+    of tools and a digest of the annotation tables (see frame_digest). The
+    entries saved with another version are discarded when the cache is loaded.
+
+    Parameters
+    ----------
+    nbToolsWithTopic : int
+        Normalizing number of tools of the terms (see getMutualInformation).
+    *tables : pd.DataFrame
+        Annotation tables the terms are computed from, e.g.
+        dfToolTopicTransitive and dfToolOperationTransitive.
+    path : str, optional
+        Cache file (default: mutual_information.npz in the index folder).
+    max_bytes : int, optional
+        Memory budget of the entries (default: mi_cache_max_bytes).
+    version : str, optional
+        Snapshot version of the values (default: snapshot_version()).
+
+    Examples
+    --------
+    >>> with MutualInformationCache(nbTools, dfTopics, dfOperations) as cache:
+    ...     mi = getMutualInformation(t1, t2, dfTopics, dfOperations, nbTools, cache)
+    """
+
+    def __init__(
+        self,
+        nbToolsWithTopic: int,
+        *tables: pd.DataFrame,
+        path: str = None,
+        max_bytes: int = None,
+        version: str = None,
+    ):
+        self.path = path or os.path.join(index_dir(), "mutual_information.npz")
+        self.maxEntries = max(
+            1, (max_bytes or mi_cache_max_bytes) // _MI_CACHE_ENTRY_BYTES
+        )
+        self.nbTools = nbToolsWithTopic
+        digest = hashlib.sha256((version or snapshot_version()).encode())
+        digest.update(f"\0{nbToolsWithTopic}".encode())
+        for df in tables:
+            digest.update(f"\0{frame_digest(df)}".encode())
+        self.version = digest.hexdigest()
+        concepts = concept_index()
+        self._ids = dict(zip(concepts, range(len(concepts))))
+        self._values = collections.OrderedDict()
+        if os.path.exists(self.path):
+            with np.load(self.path) as npz:
+                if str(npz["version"]) == self.version:
+                    keys = npz["keys"][-self.maxEntries :].tolist()
+                    values = npz["values"][-self.maxEntries :].tolist()
+                    self._values.update(zip(keys, values))
+
+    def _key(self, pair) -> int:
+        ids = [
+            self._ids.get(concept, -1) if isinstance(concept, str) else int(concept)
+            for concept in pair
+        ]
+        if len(ids) != 2 or not all(0 <= i < len(self._ids) for i in ids):
+            raise KeyError(pair)
+        return (min(ids) << 32) | max(ids)
+
+    def __getitem__(self, pair) -> float:
+        key = self._key(pair)
+        value = self._values[key]
+        self._values.move_to_end(key)
+        return value
+
+    def __contains__(self, pair) -> bool:
+        try:
+            return self._key(pair) in self._values
+        except KeyError:
+            return False
+
+    def __setitem__(self, pair, value):
+        try:
+            key = self._key(pair)
+        except KeyError:
+            return
+        self._values[key] = float(value)
+        self._values.move_to_end(key)
+        while len(self._values) > self.maxEntries:
+            self._values.popitem(last=False)
+
+    def __delitem__(self, pair):
+        del self._values[self._key(pair)]
+
+    def __iter__(self):
+        # Pairs of interned concept ids, least recently used first
+        for key in list(self._values):
+            yield key >> 32, key & 0xFFFFFFFF
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self):
+        self._values.clear()
+
+    def save(self):
+        """
+        Write the entries (least recently used first) and the snapshot version
+        to the cache file.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(
+                f,
+                version=np.array(self.version),
+                keys=np.fromiter(self._values.keys(), np.int64, len(self._values)),
+                values=np.fromiter(
+                    self._values.values(), np.float64, len(self._values)
+                ),
+            )
+        os.replace(temporary, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+
+# === Mutual information engine ===
+
+
+def _incidence_matrix(annotations) -> tuple:
+    # Binary tool x concept CSR matrix of (DataFrame, column) annotation tables,
+    # with the tool and concept URIs of its rows and columns
+    toolCodes, tools = pd.factorize(
+        pd.concat([df["tool"] for df, _ in annotations], ignore_index=True)
+    )
+    conceptCodes, concepts = pd.factorize(
+        pd.concat([df[column] for df, column in annotations], ignore_index=True)
+    )
+    incidence = sparse.csr_matrix(
+        (np.ones(len(toolCodes)), (toolCodes, conceptCodes)),
+        shape=(len(tools), len(concepts)),
+    )
+    incidence.sum_duplicates()
+    incidence.data[:] = 1.0
+    return incidence, pd.Index(tools), pd.Index(concepts)
+
+
+class MutualInformationEngine:
+    """
+    Mutual information between tools, computed from a sparse tool x concept
+    incidence matrix.
+
+    The mutual information of two tools is the sum, over the pairs (a1, a2) of an
+    annotation of each tool, of p(a1, a2) * log2(p(a1, a2) / (p(a1) * p(a2))),
+    where p(a) is the fraction of the tools annotated with a and p(a1, a2) the
+    fraction annotated with both (see getMutualInformation). The per-concept
+    marginals and the concept x concept matrix of these terms are computed once,
+    the co-occurrence counts being the sparse product incidence.T @ incidence, so
+    that the mutual information of tools is a product of sparse matrices.
+
+    Parameters
+    ----------
+    incidence : scipy.sparse matrix
+        Tool x concept matrix, non-zero where the tool is annotated with the concept.
+    tools : pd.Index
+        Tool URI of each row.
+    concepts : pd.Index
+        Concept URI of each column.
+    nbTools : int, optional
+        Number of tools the probabilities are relative to (default: the number of
+        tools with at least one annotation).
+    pairs : scipy.sparse matrix, optional
+        Concept x concept matrix of the mutual information terms, when it was
+        already computed for the same incidence matrix (see get_similarity_index).
+    """
+
+    def __init__(self, incidence, tools, concepts, nbTools: int = None, pairs=None):
+        if sparse is None:
+            raise ImportError("scipy is required to compute the mutual information")
+        incidence = sparse.csc_matrix(incidence, dtype=np.float64)
+        incidence.sum_duplicates()
+        incidence.data[:] = 1.0
+        self.incidence = incidence
+        self.rows = incidence.tocsr()
+        self.tools = pd.Index(tools)
+        self.concepts = pd.Index(concepts)
+        self.nbTools = nbTools or int(np.count_nonzero(np.diff(self.rows.indptr)))
+
+        # Number of tools of each concept, and mutual information of the pairs of
+        # concepts annotating at least one common tool (the other pairs have 0)
+        self.marginals = np.asarray(incidence.sum(axis=0)).ravel()
+        if pairs is not None:
+            self.pairs = sparse.csr_matrix(pairs)
+            return
+        pairs = (incidence.T @ incidence).tocoo()
+        pa1a2 = pairs.data / self.nbTools
+        pa1 = self.marginals[pairs.row] / self.nbTools
+        pa2 = self.marginals[pairs.col] / self.nbTools
+        self.pairs = sparse.csr_matrix(
+            (pa1a2 * np.log2(pa1a2 / (pa1 * pa2)), (pairs.row, pairs.col)),
+            shape=pairs.shape,
+        )
+
+    @classmethod
+    def from_tables(cls, *annotations, nbTools: int = None):
+        """
+        Build the engine from tool-concept tables, given as (DataFrame, column)
+        pairs, e.g. (dfToolTopicTransitive, "topic"), (dfToolOperationTransitive,
+        "operation").
+        """
+        if sparse is None:
+            raise ImportError("scipy is required to compute the mutual information")
+        incidence, tools, concepts = _incidence_matrix(annotations)
+        return cls(incidence, tools, concepts, nbTools=nbTools)
+
+    def tool_rows(self, tools) -> np.ndarray:
+        """
+        Return the rows of tools (URIs or bio.tools identifiers), -1 for the
+        tools without annotation.
+        """
+        return self.tools.get_indexer(normalize_tool_input(tools))
+
+    def _select(self, rows: np.ndarray):
+        # Incidence rows of the tools, empty for the unknown ones
+        known = rows >= 0
+        selection = self.rows[np.where(known, rows, 0)]
+        return sparse.diags(known.astype(np.float64)) @ selection
+
+    def annotation_pair(self, annotation1: str, annotation2: str) -> float:
+        """
+        Return the mutual information term of two annotations (0 when they never
+        annotate the same tool).
+        """
+        a1, a2 = self.concepts.get_indexer([annotation1, annotation2])
+        if a1 < 0 or a2 < 0:
+            return 0.0
+        return float(self.pairs[a1, a2])
+
+    def pair(self, tool1: str, tool2: str) -> float:
+        """
+        Return the mutual information of two tools.
+        """
+        return float(self.block([tool1], [tool2])[0, 0])
+
+    def one_vs_many(self, tool: str, tools=None) -> pd.Series:
+        """
+        Return the mutual information of a tool with many tools.
+
+        Parameters
+        ----------
+        tool : str
+            Tool URI or bio.tools identifier.
+        tools : list, optional
+            The other tools (default: all the tools with an annotation).
+
+        Returns
+        -------
+        pd.Series
+            Mutual information, indexed by the URI of the other tools.
+        """
+        vector = self.pairs @ self._select(self.tool_rows(tool)).T
+        if tools is None:
+            others, index = self.rows, self.tools
+        else:
+            others = self._select(self.tool_rows(tools))
+            index = pd.Index(normalize_tool_input(tools))
+        return pd.Series((others @ vector).toarray().ravel(), index=index)
+
+    def block(self, tools1, tools2=None) -> np.ndarray:
+        """
+        Return the mutual information of every tool of tools1 with every tool of
+        tools2 (default: tools1), as a dense len(tools1) x len(tools2) array.
+        """
+        left = self._select(self.tool_rows(tools1))
+        right = left if tools2 is None else self._select(self.tool_rows(tools2))
+        return (left @ self.pairs @ right.T).toarray()
+
+
+def get_mutual_information_engine(heritage: bool = True) -> MutualInformationEngine:
+    """
+    Return the mutual information engine of the topics and operations of the
+    snapshot, built once from the CSR index of the annotation tables (see
+    get_csr_index).
+
+    Parameters
+    ----------
+    heritage : bool
+        Use the transitive annotations (default), or the directly assigned ones.
+    """
+    names = (
+        ("dfToolTopicTransitive", "dfToolOperationTransitive")
+        if heritage
+        else ("dfToolTopic", "dfToolOperation")
+    )
+    key = ("mutualInformation", names)
+    if key not in _interned:
+        if sparse is None:
+            raise ImportError("scipy is required to compute the mutual information")
+        shape = (len(tool_index()), len(concept_index()))
+        incidence = sum(
+            sparse.csr_matrix(
+                (np.ones(len(concepts)), np.asarray(concepts), np.asarray(offsets)),
+                shape=shape,
+            )
+            for offsets, concepts in map(get_csr_index, names)
+        )
+        _interned[key] = MutualInformationEngine(
+            incidence, tool_index(), concept_index()
+        )
+    return _interned[key]
 
-def getToolURIByLabel(toolLabel):
-    """Return the URI of a tool designated by its label (or None).
 
-    Keyword arguments:
-    toolLabel -- the label for the tool
-    """
+# === Tool similarity index ===
 
-    query = (
-        """
-SELECT DISTINCT ?tool ?toolLabel
-WHERE {
-  VALUES ?toolLabel { \""""
-        + toolLabel
-        + """\" }
+SIMILARITY_METRICS = ("mi", "jaccard", "ic-weighted")
 
-  ?tool rdf:type sc:SoftwareApplication .
-  ?tool sc:name ?toolLabel .
-}
-"""
-    )
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.queryAndConvert()
-    return (
-        None
-        if len(results["results"]["bindings"]) == 0
-        else results["results"]["bindings"][0]["tool"]["value"]
-    )
+# Range of the scores of the bounded metrics: a Jaccard index, and a cosine of
+# vectors of non-negative Information Contents (the mutual information is not
+# bounded)
+SIMILARITY_SCORE_BOUNDS = {"jaccard": (0.0, 1.0), "ic-weighted": (0.0, 1.0)}
 
 
-def getToolTopics(toolURI, transitive=False):
-    """Return the list of the (URI, label) tuples for the topics associated to a tool.
+class SimilarityIndex:
+    """
+    Index of the tools most similar to a given tool, on their transitive topic
+    and operation annotations.
 
-    Keyword arguments:
-    toolURI -- the URI for the tool
-    transitive -- also consider the ancestors of the topics directly associated to the tool (default: False)
+    The incidence matrix of the mutual information engine is also the inverted
+    index {concept -> tools} (CSC columns), used to restrict the search to the
+    tools sharing a topic; the tools are represented by their binary annotation
+    vectors (Jaccard index), by their IC-weighted vectors normalized to unit
+    length (cosine) and by the mutual information terms of their annotations, so
+    that the scores of all the tools are one sparse matrix-vector product.
+
+    Parameters
+    ----------
+    engine : MutualInformationEngine
+        Engine of the transitive annotations.
+    ic : np.ndarray
+        Information Content of each concept (column) of the engine.
+    topics : np.ndarray
+        Whether each concept of the engine is a topic.
+    labels : array-like, optional
+        Label of each tool (row) of the engine.
     """
 
-    if toolURI.startswith("http"):
-        toolURI = "<" + toolURI + ">"
-    transitiveClause = "/(rdfs:subClassOf*)" if transitive else ""
-    query = (
-        """
-SELECT DISTINCT ?tool ?topic ?topicLabel
-WHERE {
-  VALUES ?tool { """
-        + toolURI
-        + """ }
+    def __init__(self, engine, ic, topics, labels=None):
+        self.engine = engine
+        self.ic = np.asarray(ic, dtype=np.float64)
+        self.topics = np.asarray(topics, dtype=bool)
+        self.labels = (
+            np.asarray(labels, dtype=object)
+            if labels is not None
+            else np.full(len(engine.tools), None, dtype=object)
+        )
+        self.sizes = np.diff(engine.rows.indptr)
 
-  ?tool sc:applicationSubCategory"""
-        + transitiveClause
-        + """ ?topic .
-  ?topic rdf:type owl:Class .
-  FILTER NOT EXISTS { ?topic rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?topic rdfs:label ?tLabel }
-  BIND(COALESCE(?tLabel, "") AS ?topicLabel)
-}
-"""
-    )
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.queryAndConvert()
-    toolTopics = [
-        (result["topic"]["value"], result["topicLabel"]["value"])
-        for result in results["results"]["bindings"]
-    ]
-    return toolTopics
+        weighted = engine.rows @ sparse.diags(self.ic)
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        self.weighted = sparse.csr_matrix(sparse.diags(inverse) @ weighted)
 
+    def scores(self, row: int, metric: str = "mi") -> np.ndarray:
+        """
+        Return the similarity of the tool of a row with every tool (row) of the index.
+        """
+        # Sparse matrix x dense vector products: one pass over the incidence matrix
+        rows = self.engine.rows
+        query = np.zeros(rows.shape[1])
+        query[rows.indices[rows.indptr[row] : rows.indptr[row + 1]]] = 1.0
+        if metric == "mi":
+            return rows @ (self.engine.pairs @ query)
+        if metric == "jaccard":
+            common = rows @ query
+            union = self.sizes + self.sizes[row] - common
+            return np.divide(common, union, out=np.zeros(len(union)), where=union > 0)
+        if metric == "ic-weighted":
+            return self.weighted @ self.weighted[row].toarray().ravel()
+        raise ValueError(f"Unknown similarity metric: {metric}")
+
+    def most_similar(
+        self, tool: str, k: int = 20, metric: str = "mi", share_topic: bool = False
+    ) -> pd.DataFrame:
+        """
+        Return the k tools most similar to a tool.
+
+        Parameters
+        ----------
+        tool : str
+            Tool name or bio.tools URI.
+        k : int
+            Number of tools, at least 1 (default: 20).
+        metric : str
+            "mi" (mutual information), "jaccard" (Jaccard index of the annotation
+            sets) or "ic-weighted" (cosine of the IC-weighted annotation vectors).
+        share_topic : bool
+            Only consider the tools sharing at least one topic with the tool.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns tool, toolLabel and score, by decreasing score (ties in the
+            order of the tool ids).
+        """
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        (row,) = self.engine.tool_rows(tool)
+        if row < 0 or self.sizes[row] == 0:
+            raise ValueError(f"Tool not found: {get_tool_url(tool)}")
+        scores = self.scores(row, metric)
+
+        candidates = self.sizes > 0
+        if share_topic:
+            # Tools of the postings of the topics of the tool (CSC columns)
+            incidence, rows = self.engine.incidence, self.engine.rows
+            concepts = rows.indices[rows.indptr[row] : rows.indptr[row + 1]]
+            shared = np.zeros(len(candidates), dtype=bool)
+            for topic in concepts[self.topics[concepts]]:
+                shared[
+                    incidence.indices[
+                        incidence.indptr[topic] : incidence.indptr[topic + 1]
+                    ]
+                ] = True
+            candidates &= shared
+        candidates[row] = False
+        candidates = np.flatnonzero(candidates)
+
+        # Candidates scoring at least the k-th best score, then sorted
+        if len(candidates) > k:
+            kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth]
+        best = candidates[np.lexsort((candidates, -scores[candidates]))[:k]]
+
+        return pd.DataFrame(
+            {
+                "tool": self.engine.tools[best],
+                "toolLabel": self.labels[best],
+                "score": scores[best],
+            }
+        )
 
-def getToolOperations(toolURI, transitive=False):
-    """Return the list of the (URI, label) tuples for the operations associated to a tool.
 
-    Keyword arguments:
-    toolURI -- the URI for the tool
-    transitive -- also consider the ancestors of the operations directly associated to the tool (default: False)
+def similarity_index_path() -> str:
+    """
+    Return the path of the similarity index file (see build_similarity_index).
     """
+    return os.path.join(index_dir(), "similarity.npz")
 
-    if toolURI.startswith("http"):
-        toolURI = "<" + toolURI + ">"
-    transitiveClause = "/(rdfs:subClassOf*)" if transitive else ""
-    query = (
-        """
-SELECT DISTINCT ?tool ?operation ?operationLabel
-WHERE {
-  VALUES ?tool { """
-        + toolURI
-        + """ }
 
-  ?tool sc:featureList"""
-        + transitiveClause
-        + """ ?operation .
-  ?operation rdf:type owl:Class .
-  FILTER NOT EXISTS { ?operation rdfs:subClassOf? owl:DeprecatedClass }
-  OPTIONAL { ?operation rdfs:label ?oLabel }
-  BIND(COALESCE(?oLabel, "") AS ?operationLabel)
-}
-"""
-    )
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.queryAndConvert()
-    toolOperations = [
-        (result["operation"]["value"], result["operationLabel"]["value"])
-        for result in results["results"]["bindings"]
+def similarity_index_is_fresh() -> bool:
+    """
+    Tell whether the similarity index was built after the interned URI index and
+    the concept metrics tables.
+    """
+    path = similarity_index_path()
+    if not index_is_fresh() or not os.path.exists(path):
+        return False
+    sources = [os.path.join(index_dir(), "concepts.tsv.bz2")] + [
+        os.path.join(dataframe_dir, TABLE_FILES[name])
+        for name in ("dfTopicmetrics", "dfOperationmetrics")
     ]
-    return toolOperations
+    return all(
+        os.path.getmtime(path) >= os.path.getmtime(source)
+        for source in sources
+        if os.path.exists(source)
+    )
 
 
-def getToolsCommonTopics(listToolURI, transitive=False):
-    """Return the list of the (URI, label) tuples for the topics associated to all the tools of a list.
+def _similarity_arrays() -> dict:
+    # Arrays of the similarity index, over the interned tool and concept ids
+    engine = get_mutual_information_engine()
+    concepts = concept_index()
+    ic = np.zeros(len(concepts))
+    for name, column in (
+        ("dfTopicmetrics", "topic"),
+        ("dfOperationmetrics", "operation"),
+    ):
+        df = get_table(name, columns=[column, "IC"])
+        ids = concepts.get_indexer(df[column])
+        ic[ids[ids >= 0]] = df["IC"].to_numpy()[ids >= 0]
+    return {
+        "indptr": engine.rows.indptr,
+        "indices": engine.rows.indices,
+        "pairs_indptr": engine.pairs.indptr,
+        "pairs_indices": engine.pairs.indices,
+        "pairs_data": engine.pairs.data,
+        "ic": ic,
+        "topics": concepts.str.startswith(edamURI + "topic_"),
+        "nbTools": np.array(engine.nbTools),
+    }
 
-    Keyword arguments:
-    listToolURI -- list of the URIs for the tools
-    transitive -- also consider the ancestors of the topics directly associated to a tool (default: False)
+
+def build_similarity_index(output_dir: str = None) -> list:
     """
-    commonConcepts = []
-    if len(listToolURI) > 0:
-        commonConcepts = set(getToolTopics(listToolURI[0], transitive=transitive))
-    for toolURI in listToolURI[1:]:
-        currentConcepts = set(getToolTopics(toolURI, transitive=transitive))
-        commonConcepts = commonConcepts.intersection(currentConcepts)
-    return list(commonConcepts)
+    Save the similarity index of the tools (see SimilarityIndex) as similarity.npz:
+    the transitive topic and operation incidence matrix, the mutual information
+    terms of the pairs of concepts, and the IC of the concepts.
 
+    Parameters
+    ----------
+    output_dir : str, optional
+        Destination folder (default: index_dir()).
 
-def getToolsCommonOperations(listToolURI, transitive=False):
-    """Return the list of the (URI, label) tuples for the operations associated to all the tools of a list.
+    Returns
+    -------
+    list[str]
+        Paths of the written files.
+    """
+    if sparse is None:
+        raise ImportError("scipy is required to build the similarity index")
+    path = os.path.join(output_dir or index_dir(), "similarity.npz")
+    np.savez(path, **_similarity_arrays())
+    _interned.pop("similarity", None)
+    return [path]
 
-    Keyword arguments:
-    listToolURI -- list of the URIs for the tools
-    transitive -- also consider the ancestors of the operations directly associated to a tool (default: False)
+
+def get_similarity_index() -> SimilarityIndex:
+    """
+    Return the similarity index of the tools, loaded from the index folder when
+    it is up to date, otherwise computed from the snapshot.
     """
-    commonConcepts = []
-    if len(listToolURI) > 0:
-        commonConcepts = set(getToolOperations(listToolURI[0], transitive=transitive))
-    for toolURI in listToolURI[1:]:
-        currentConcepts = set(getToolOperations(toolURI, transitive=transitive))
-        commonConcepts = commonConcepts.intersection(currentConcepts)
-    return list(commonConcepts)
+    if "similarity" not in _interned:
+        if sparse is None:
+            raise ImportError("scipy is required to compute the similarity of tools")
+        if similarity_index_is_fresh():
+            with np.load(similarity_index_path()) as npz:
+                arrays = dict(npz)
+        else:
+            arrays = _similarity_arrays()
+        shape = (len(tool_index()), len(concept_index()))
+        incidence = sparse.csr_matrix(
+            (np.ones(len(arrays["indices"])), arrays["indices"], arrays["indptr"]),
+            shape=shape,
+        )
+        pairs = sparse.csr_matrix(
+            (arrays["pairs_data"], arrays["pairs_indices"], arrays["pairs_indptr"]),
+            shape=(shape[1], shape[1]),
+        )
+        engine = MutualInformationEngine(
+            incidence,
+            tool_index(),
+            concept_index(),
+            nbTools=int(arrays["nbTools"]),
+            pairs=pairs,
+        )
+        _interned["similarity"] = SimilarityIndex(
+            engine,
+            arrays["ic"],
+            arrays["topics"],
+            labels=get_uri_dictionary()[0]["toolLabel"],
+        )
+    return _interned["similarity"]
 
 
-def addToolsAndAnnotationsToGraph(
-    listToolURI,
-    graph=None,
-    showTopics=True,
-    showOperations=True,
-    highlightDirectAnnotations=False,
-    highlightIntersection=False,
-):
-    """Return a graph representing tools and their EDAM annotations.
+# === Tool similarity matrix ===
 
-    Keyword arguments:
-      listToolURI -- list of the URIs for the tools
-      graph -- the graph in which the tool and its annotations are added. A new graph is created if the value is None.
-      showTopics -- should the topics annotating the tool be considered
-      showOperations -- should the operations annotating the tool be considered
-      highlightDirectAnnotations -- should the topics or operations annotated directly be highlighted
-      highlightIntersection -- should the common topics or operations common to all the tools be highlighted
-    """
-    if graph is None:
-        graph = pgv.AGraph(directed=True, rankdir="BT")
+# Arrays of the similarity matrix workers, attached to the shared memory segments
+# created by compute_similarity_matrix
+_similarity_worker = {}
 
-    for toolURI in listToolURI:
-        addToolAndAnnotationsToGraph(
-            toolURI,
-            graph=graph,
-            showTopics=showTopics,
-            showOperations=showOperations,
-            highlightDirectAnnotations=highlightDirectAnnotations,
-        )
 
-    if highlightIntersection:
-        commonConcepts = []
-        if showTopics:
-            commonConcepts += getToolsCommonTopics(listToolURI, transitive=True)
-        if showOperations:
-            commonConcepts += getToolsCommonOperations(listToolURI, transitive=True)
+def _share_arrays(arrays: dict) -> tuple:
+    # Copy arrays into new shared memory segments: (segments, {name: (segment
+    # name, shape, dtype)} to attach them in the workers)
+    segments, specs = [], {}
+    for name, array in arrays.items():
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        segments.append(segment)
+        np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+        specs[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, specs
 
-        for currentConcept, currentLabel in commonConcepts:
-            currentConceptIdent = currentConcept.replace(edamURI, "")
-            node = graph.get_node(currentConceptIdent)
-            node.attr["color"] = "red"
-            node.attr["penwidth"] = "3"  # Thicker border
-            node.attr["style"] = "filled,bold"  # Bold border and filled style
-            node.attr["fillcolor"] = "red"  # Red fill to highlight
-            node.attr["highlightIntersection"] = "True"  # Mark this node as highlighted
 
-    return graph
+def _attach_similarity_arrays(specs: dict, nbTools: int, nbConcepts: int):
+    # Pool initializer: sparse matrices over the shared arrays, without copy
+    segments = {
+        name: shared_memory.SharedMemory(name=segment)
+        for name, (segment, _, _) in specs.items()
+    }
+    arrays = {
+        name: np.ndarray(shape, dtype, buffer=segments[name].buf)
+        for name, (_, shape, dtype) in specs.items()
+    }
+    _similarity_worker.clear()
+    _similarity_worker["segments"] = segments
+    _similarity_worker.update(_similarity_matrices(arrays, nbTools, nbConcepts))
+
+
+def _similarity_matrices(arrays: dict, nbTools: int, nbConcepts: int) -> dict:
+    # Incidence, IC-weighted and mutual information term matrices of the arrays
+    # of _similarity_matrix_arrays
+    return {
+        "rows": sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=(nbTools, nbConcepts),
+        ),
+        "weighted": sparse.csr_matrix(
+            (
+                arrays["weighted_data"],
+                arrays["weighted_indices"],
+                arrays["weighted_indptr"],
+            ),
+            shape=(nbTools, nbConcepts),
+        ),
+        "pairs": sparse.csr_matrix(
+            (arrays["pairs_data"], arrays["pairs_indices"], arrays["pairs_indptr"]),
+            shape=(nbConcepts, nbConcepts),
+        ),
+    }
 
 
-def getScoreColorRGB(scoreValue, scoreMaxValue, color="red"):
-    """Return the RGB color (in hex) associated to a score, varying from white (0 score)
-    to a target color at the maximum score.
+def _similarity_matrix_arrays(index: SimilarityIndex) -> dict:
+    rows, weighted, pairs = index.engine.rows, index.weighted, index.engine.pairs
+    return {
+        "data": rows.data,
+        "indices": rows.indices,
+        "indptr": rows.indptr,
+        "weighted_data": weighted.data,
+        "weighted_indices": weighted.indices,
+        "weighted_indptr": weighted.indptr,
+        "pairs_data": pairs.data,
+        "pairs_indices": pairs.indices,
+        "pairs_indptr": pairs.indptr,
+    }
 
-    Keyword arguments:
-    scoreValue -- the score to consider (positive number)
-    scoreMaxValue -- the maximum value for the score (positive number, >= scoreValue)
-    color -- name of the color for the gradient. Possible values are:
-             "red", "green", "blue", "orange", "yellow", "pink", "grey".
-             (default: "red")
-    """
-    # Avoid division by 0.
-    scoreMaxValue = max(1, scoreMaxValue)
-    fraction = scoreValue / scoreMaxValue
 
-    # Define the target color values.
-    if color == "red":
-        target = (255, 0, 0)
-    elif color == "green":
-        target = (0, 255, 0)
-    elif color == "blue":
-        target = (0, 0, 255)
-    elif color == "orange":
-        target = (255, 165, 0)
-    elif color == "yellow":
-        target = (255, 255, 0)
-    elif color == "pink":
-        target = (255, 192, 203)  # Light pink (alternative: hot pink (255,105,180))
-    elif color == "grey":
-        target = (128, 128, 128)
+def _similarity_block(
+    start: int, end: int, metric: str, k: int = None, threshold: float = None
+) -> tuple:
+    # Kept entries (rows, columns, scores) of the rows start:end of the matrix
+    rows = _similarity_worker["rows"]
+    sizes = np.diff(rows.indptr)
+    # Scores of all the tools (rows) with the tools of the block (columns)
+    if metric == "mi":
+        scores = rows @ (rows[start:end] @ _similarity_worker["pairs"]).T.toarray()
+    elif metric == "jaccard":
+        scores = rows @ rows[start:end].T.toarray()
+        union = np.add.outer(sizes, sizes[start:end]).astype(np.float64)
+        union -= scores
+        np.divide(scores, union, out=scores, where=union > 0)
+    elif metric == "ic-weighted":
+        weighted = _similarity_worker["weighted"]
+        scores = weighted @ weighted[start:end].T.toarray()
     else:
-        return "#ffffff"
+        raise ValueError(f"Unknown similarity metric: {metric}")
+    # Rows of the block, contiguous and negated to select the best scores first,
+    # transposed by chunks of tools that stay in the CPU cache
+    products, scores = scores, np.empty((end - start, len(sizes)))
+    for chunk in range(0, len(sizes), 2048):
+        np.negative(
+            products[chunk : chunk + 2048].T, out=scores[:, chunk : chunk + 2048]
+        )
 
-    # Interpolate from white (255,255,255) to the target color.
-    r = int(255 - fraction * (255 - target[0]))
-    g = int(255 - fraction * (255 - target[1]))
-    b = int(255 - fraction * (255 - target[2]))
+    # Neither the tool itself nor the tools without annotation
+    scores[:, np.flatnonzero(sizes == 0)] = np.inf
+    scores[np.arange(end - start), np.arange(start, end)] = np.inf
+    scores[sizes[start:end] == 0] = np.inf
+    if k is not None and k < scores.shape[1]:
+        # Tools scoring at least the k-th best score, the ties being broken by
+        # tool id as in SimilarityIndex.most_similar
+        kth = np.partition(scores, k - 1, axis=1)[:, k - 1 : k]
+        better = scores < kth
+        tieRows, tieColumns = np.nonzero((scores == kth) & np.isfinite(scores))
+        # The ties are in increasing tool id in each row: keep the first ones
+        counts = np.bincount(tieRows, minlength=end - start)
+        ranks = np.arange(len(tieRows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        missing = k - np.count_nonzero(better, axis=1)
+        tie = ranks < missing[tieRows]
+        betterRows, betterColumns = np.nonzero(better)
+        blockRows = np.concatenate([betterRows, tieRows[tie]])
+        columns = np.concatenate([betterColumns, tieColumns[tie]])
+    else:
+        blockRows, columns = np.nonzero(np.isfinite(scores))
+    values = -scores[blockRows, columns]
+    kept = np.isfinite(values)
+    if threshold is not None:
+        kept &= values >= threshold
+    return (
+        (blockRows[kept] + start).astype(np.int32),
+        columns[kept].astype(np.int32),
+        values[kept],
+    )
 
-    return "#{:02x}{:02x}{:02x}".format(r, g, b)
 
+# Memory of an entry kept in the similarity matrix: int32 row and column and
+# float64 score, then its copy in the CSR matrix
+_SIMILARITY_ENTRY_BYTES = 32
 
-def dictTopic(dfTopicmetrics, metric_col, edamURI=edamURI):
+
+def similarity_block_size(
+    nbTools: int, max_memory: int = None, max_workers: int = 1, block_size: int = 32
+) -> int:
     """
-    Extract a dictionary for a given metric from dfTopicmetrics.
-    Returns only the dict (no max needed).
+    Return the number of rows of the blocks of the similarity matrix, so that the
+    dense blocks of all the workers (the scores and their temporaries, about 4
+    arrays of float64 of block_size x nbTools each) stay under max_memory bytes.
+    """
+    if max_memory is None:
+        return block_size
+    return max(1, min(block_size, max_memory // (4 * 8 * nbTools * max_workers)))
+
+
+def compute_similarity_matrix(
+    metric: str = "mi",
+    k: int = None,
+    threshold: float = None,
+    block_size: int = 32,
+    max_workers: int = None,
+    max_memory: int = None,
+    on_progress=None,
+):
     """
+    Compute the tool x tool similarity matrix of the similarity index, keeping
+    the k best scores of each row and/or the scores above a threshold.
 
-    raw_dict = (
-        dfTopicmetrics[["topic", metric_col]].set_index("topic").to_dict()[metric_col]
+    The dense matrix (30,000 x 30,000 float64, 7 GB) is never built: it is
+    computed by blocks of rows, each a product of sparse matrices with a dense
+    block, in a pool of worker processes that attach the incidence matrices
+    through shared memory (copied there once, instead of once per worker).
+
+    Parameters
+    ----------
+    metric : str
+        "mi", "jaccard" or "ic-weighted" (see SimilarityIndex.most_similar).
+    k : int, optional
+        Number of entries kept per row, at least 1: the most similar tools, the ties at the
+        k-th score being broken by increasing tool id (as
+        SimilarityIndex.most_similar).
+    threshold : float, optional
+        Smallest score kept, within SIMILARITY_SCORE_BOUNDS for the bounded
+        metrics. Without k, every score above the threshold is kept.
+    block_size : int
+        Largest number of rows of a block, at least 1 (default: 32).
+    max_workers : int, optional
+        Number of worker processes (default: the number of CPUs); 1 computes the
+        blocks in this process.
+    max_memory : int, optional
+        Memory ceiling of the kept entries and of the blocks of all the workers,
+        in bytes. With k, the blocks are made smaller to fit next to the k
+        entries of every row (see similarity_block_size); with a threshold only,
+        they get half of it, and the computation stops with a ValueError as soon
+        as the kept entries exceed the rest.
+    on_progress : callable, optional
+        Called as on_progress(nbRowsDone, nbRows) after each block.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        Similarity of the tools of the rows of the similarity index (see
+        get_similarity_index) with the tools of the columns. A tool is not
+        compared with itself nor with the tools without annotation.
+    """
+    if sparse is None:
+        raise ImportError("scipy is required to compute the similarity of tools")
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Unknown similarity metric: {metric}")
+    if k is None and threshold is None:
+        raise ValueError("Give the number of entries per row (k) or a threshold")
+    if k is not None and k < 1:
+        raise ValueError(f"k must be >= 1, not {k}")
+    if block_size < 1:
+        raise ValueError(f"block_size must be >= 1, not {block_size}")
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be >= 1, not {max_workers}")
+    if threshold is not None and metric in SIMILARITY_SCORE_BOUNDS:
+        low, high = SIMILARITY_SCORE_BOUNDS[metric]
+        if not low <= threshold <= high:
+            raise ValueError(
+                f"The {metric} scores are between {low:g} and {high:g}: a threshold"
+                f" of {threshold:g} is out of range"
+            )
+    index = get_similarity_index()
+    nbTools, nbConcepts = index.engine.rows.shape
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Budget of the kept entries, the blocks getting the rest of max_memory
+    keptBudget = None
+    if max_memory is not None:
+        if k is not None:
+            keptBudget = nbTools * min(k, nbTools) * _SIMILARITY_ENTRY_BYTES
+        else:
+            keptBudget = max_memory // 2
+        if keptBudget >= max_memory:
+            raise ValueError(
+                f"The {k} best entries of the {nbTools} tools need more than"
+                f" {max_memory} bytes"
+            )
+    size = similarity_block_size(
+        nbTools,
+        max_memory and max_memory - keptBudget,
+        max_workers,
+        block_size,
     )
+    blocks = [(start, min(start + size, nbTools)) for start in range(0, nbTools, size)]
+
+    results, done, keptBytes = [], 0, 0
+
+    def collect(block, result):
+        nonlocal done, keptBytes
+        results.append(result)
+        keptBytes += len(result[2]) * _SIMILARITY_ENTRY_BYTES
+        if keptBudget is not None and keptBytes > keptBudget:
+            raise ValueError(
+                f"The entries kept above the threshold exceed the memory ceiling"
+                f" ({max_memory} bytes) after {done} of {nbTools} tools: raise the"
+                " threshold, keep the k best entries, or raise the ceiling"
+            )
+        done += block[1] - block[0]
+        if on_progress:
+            on_progress(done, nbTools)
+
+    arrays = _similarity_matrix_arrays(index)
+    if max_workers == 1:
+        _similarity_worker.clear()
+        _similarity_worker.update(_similarity_matrices(arrays, nbTools, nbConcepts))
+        try:
+            for block in blocks:
+                collect(block, _similarity_block(*block, metric, k, threshold))
+        finally:
+            _similarity_worker.clear()
+    else:
+        segments, specs = _share_arrays(arrays)
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers,
+                initializer=_attach_similarity_arrays,
+                initargs=(specs, nbTools, nbConcepts),
+            ) as pool:
+                futures = {
+                    pool.submit(_similarity_block, *block, metric, k, threshold): block
+                    for block in blocks
+                }
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        collect(futures[future], future.result())
+                except ValueError:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    if results:
+        rows, columns, values = (np.concatenate(parts) for parts in zip(*results))
+    else:
+        rows = columns = np.empty(0, dtype=np.int32)
+        values = np.empty(0)
+    return sparse.csr_matrix((values, (rows, columns)), shape=(nbTools, nbTools))
 
-    dict_clean = {topic.replace(edamURI, ""): val for topic, val in raw_dict.items()}
 
-    return dict_clean
+def save_similarity_matrix(matrix, path: str) -> list:
+    """
+    Write a similarity matrix (see compute_similarity_matrix) as a scipy sparse
+    .npz file (scipy.sparse.load_npz), and the tools of its rows and columns, in
+    order, in a .tools.tsv file next to it (columns tool and toolLabel).
+
+    Returns
+    -------
+    list[str]
+        Paths of the written files.
+    """
+    sparse.save_npz(path, matrix)
+    if not path.endswith(".npz"):
+        path += ".npz"
+    toolsPath = path[: -len(".npz")] + ".tools.tsv"
+    index = get_similarity_index()
+    pd.DataFrame({"tool": index.engine.tools, "toolLabel": index.labels}).to_csv(
+        toolsPath, sep="\t", index=False
+    )
+    return [path, toolsPath]
 
 
-def dictOperation(dfOperationmetrics, metric_col, edamURI=edamURI):
+# === Init stage scheduler ===
+
+
+def run_stages(stages: dict, max_workers: int = None, on_finish=None) -> tuple:
     """
-    Extract a dictionary for a given operation metric from dfOperationmetrics.
-    Returns only the dict (no max).
+    Run a dependency graph of stages on a bounded thread pool. A stage starts as
+    soon as all the stages it depends on are finished, so independent SPARQL
+    extractions run at the same time and the pandas stages run once their inputs
+    are there.
+
+    Parameters
+    ----------
+    stages : dict
+        {name: (function, dependencies)}. The function is called with the results
+        of its dependencies as keyword arguments: dependencies are a list of stage
+        names, passed as the argument of the same name, or {argument: stage}.
+        Dependencies that are not parameters of the function only order the stages.
+        A dependency "stage.key" passes the item key of the result (a dict) of
+        the stage.
+    max_workers : int, optional
+        Number of stages running at the same time, at least 1 (default:
+        sparql_max_concurrency).
+    on_finish : callable, optional
+        Called as on_finish(name, (start, end)) when a stage is finished.
+
+    Returns
+    -------
+    tuple
+        (results, timings): {name: result} and {name: (start, end)}, the times
+        being in seconds from the start of the run.
     """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be >= 1, not {max_workers}")
+    arguments = {name: _stage_arguments(deps) for name, (_, deps) in stages.items()}
+    unknown = {
+        _dependency_stage(dep) for deps in arguments.values() for dep in deps.values()
+    } - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown stage dependencies: {sorted(unknown)}")
+
+    results, timings = {}, {}
+    waiting, running = dict(stages), {}
+    origin = time.perf_counter()
+
+    def run(function, kwargs):
+        start = time.perf_counter() - origin
+        result = function(**kwargs)
+        return result, (start, time.perf_counter() - origin)
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers or sparql_max_concurrency)
+    try:
+        while waiting or running:
+            for name, (function, _) in list(waiting.items()):
+                if all(
+                    _dependency_stage(dep) in results
+                    for dep in arguments[name].values()
+                ):
+                    del waiting[name]
+                    kwargs = {
+                        argument: _dependency_result(results, dep)
+                        for argument, dep in arguments[name].items()
+                        if _accepts_argument(function, argument)
+                    }
+                    running[pool.submit(run, function, kwargs)] = name
+            if not running:
+                raise ValueError(f"Circular stage dependencies: {sorted(waiting)}")
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                name = running.pop(future)
+                results[name], timings[name] = future.result()
+                if on_finish is not None:
+                    on_finish(name, timings[name])
+    finally:
+        pool.shutdown(cancel_futures=True)
+    return results, timings
 
-    raw_dict = (
-        dfOperationmetrics[["operation", metric_col]]
-        .set_index("operation")
-        .to_dict()[metric_col]
-    )
 
-    dict_clean = {op.replace(edamURI, ""): val for op, val in raw_dict.items()}
+def _stage_arguments(deps) -> dict:
+    return dict(deps) if isinstance(deps, dict) else {dep: dep for dep in deps}
 
-    return dict_clean
 
+def _dependency_stage(dep: str) -> str:
+    return dep.partition(".")[0]
 
-def buildTopicOperationDicts(metric_col):
-    """
-    Build the pair (dictTopicScore, dictOperationScore)
-    corresponding to a given metric column.
-    """
-    dictTopicScore = dictTopic(dfTopicmetrics, metric_col)
-    dictOperationScore = dictOperation(dfOperationmetrics, metric_col)
-    return dictTopicScore, dictOperationScore
 
+def _dependency_result(results: dict, dep: str):
+    stage, _, key = dep.partition(".")
+    return results[stage][key] if key else results[stage]
 
-def colorGraphNodesAccordingToScore(
-    graph, dictTopicScore, dictOperationScore, color="red"
-):
-    """Modify nodes color according to a score associated to the node. Nodes that are not associated to a score are unaffected.
 
-    Keyword arguments:
-    graph -- the graph to be modified
-    dictTopicScore -- a dictionary {nodeIdent -> score} for topic nodes
-    dictOperationScore -- a dictionary {nodeIdent -> score} for operation nodes
-    color -- name of the color that will vary according to scores. Possible values are "red", "green" or "blue" (default: "red")
+def _accepts_argument(function, name: str) -> bool:
+    parameters = inspect.signature(function).parameters
+    return name in parameters or any(
+        parameter.kind == inspect.Parameter.VAR_KEYWORD
+        for parameter in parameters.values()
+    )
+
+
+def critical_path(stages: dict, timings: dict) -> list:
     """
-    topicMaxValue = max(dictTopicScore.values(), default=0)
-    operationMaxValue = max(dictOperationScore.values(), default=0)
-    for currentNode in graph.nodes_iter():
-        if "nodeType" in currentNode.attr.keys():
-            currentNodeType = currentNode.attr["nodeType"]
-            # currentNode.attr['style'] = conceptStyle[currentNodeType]
-            if currentNodeType == "Topic":
-                if currentNode in dictTopicScore.keys():
-                    graph.get_node(currentNode).attr["fillcolor"] = getScoreColorRGB(
-                        dictTopicScore[currentNode], topicMaxValue, color=color
-                    )
-            elif currentNodeType == "Operation":
-                if currentNode in dictOperationScore.keys():
-                    graph.get_node(currentNode).attr["fillcolor"] = getScoreColorRGB(
-                        dictOperationScore[currentNode], operationMaxValue, color=color
-                    )
+    Return the chain of stages that determined the duration of a run_stages run:
+    starting from the last stage to finish, follow the dependency that finished
+    last.
+    """
+    if not timings:
+        return []
+    path = [max(timings, key=lambda name: timings[name][1])]
+    while stages[path[-1]][1]:
+        deps = map(_dependency_stage, _stage_arguments(stages[path[-1]][1]).values())
+        path.append(max(deps, key=lambda name: timings[name][1]))
+    return path[::-1]
 
 
-def getToolScore(toolURI, transitive=False, dictTopicScore={}, dictOperationScore={}):
-    """Return a score for a tool computed as the sum of the scores of its annotations (0 if the tool has no annotation).
+# === Incremental init ===
 
-    Keyword arguments:
-    toolURI -- the URI for the tool
-    transitive -- also consider the ancestors of the topics or operations directly associated to the tool (default: False)
-    dictTopicScore -- a dictionary {nodeIdent -> score} for topic nodes (default: {})
-    dictOperationScore -- a dictionary {nodeIdent -> score} for operation nodes (default: {})
-    """
-    toolScore = 0
-    for currentTopic in getToolTopics(toolURI, transitive=transitive):
-        currentTopicIdent = currentTopic[0].replace(edamURI, "")
-        if currentTopicIdent in dictTopicScore.keys():
-            toolScore += dictTopicScore[currentTopicIdent]
-    for currentOperation in getToolOperations(toolURI, transitive=transitive):
-        currentOperationIdent = currentOperation[0].replace(edamURI, "")
-        if currentOperationIdent in dictOperationScore.keys():
-            toolScore += dictOperationScore[currentOperationIdent]
-    return toolScore
+# The manifest records, for each file written by a stage of run_stages_incremental,
+# the stage and function that produced it, the content hash of its inputs and of
+# the table (see frame_digest), the hash of the file, the knowledge graph version
+# and the hash of the source of the function.
 
 
-def getMutualInformation(
-    toolURI1: str,
-    toolURI2: str,
-    dfToolTopicTransitive,
-    dfToolOperationTransitive,
-    nbToolsWithTopic: int,
-    dictAnnotationPairsMutualInformation: dict | None = None,
-):
+def manifest_path() -> str:
     """
-    Compute Mutual Information between two tools based on their
-    transitive EDAM Topic + Operation annotations.
+    Return the path of the manifest of the snapshot files.
+    """
+    return os.path.join(dataframe_dir, "manifest.json")
 
-    Parameters
-    ----------
-    toolURI1 : str
-    toolURI2 : str
-    dfToolTopicTransitive : pd.DataFrame
-        DataFrame with columns ["tool", "topic"].
-    dfToolOperationTransitive : pd.DataFrame
-        DataFrame with columns ["tool", "operation"].
-    nbToolsWithTopic : int
-        Total number of tools (normalizing denominator).
-    dictAnnotationPairsMutualInformation : dict, optional
-        Cache for mutual information computation.
 
-    Returns
-    -------
-    float
-        Mutual information score.
+def load_manifest() -> dict:
     """
+    Return the manifest of the snapshot files ({path: record}), empty if none was written.
+    """
+    if not os.path.exists(manifest_path()):
+        return {}
+    with open(manifest_path()) as f:
+        return json.load(f)
 
-    mi = 0.0
-
-    # ----------------------------
-    # Get annotation lists
-    # ----------------------------
-    annotT1 = (
-        dfToolTopicTransitive[dfToolTopicTransitive["tool"] == toolURI1][
-            "topic"
-        ].to_list()
-        + dfToolOperationTransitive[dfToolOperationTransitive["tool"] == toolURI1][
-            "operation"
-        ].to_list()
-    )
 
-    annotT2 = (
-        dfToolTopicTransitive[dfToolTopicTransitive["tool"] == toolURI2][
-            "topic"
-        ].to_list()
-        + dfToolOperationTransitive[dfToolOperationTransitive["tool"] == toolURI2][
-            "operation"
-        ].to_list()
-    )
+def file_digest(path: str) -> str:
+    """
+    Return the SHA-256 of the content of a file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-    # Pre-cache annotation -> tool sets for speed
-    topic2tools = {
-        topic: set(
-            dfToolTopicTransitive[dfToolTopicTransitive["topic"] == topic]["tool"]
-        )
-        for topic in set(annotT1 + annotT2)
-    }
 
-    # ----------------------------
-    # Compute MI
-    # ----------------------------
-    for a1 in annotT1:
+def frame_digest(df: pd.DataFrame) -> str:
+    """
+    Return the SHA-256 of the content (column names and values) of a table.
+    """
+    digest = hashlib.sha256("\t".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+# SHA-256 of the source of the stage functions with their helpers (see
+# code_digest), and of each top-level definition of their modules
+_code_digests = {}
+_source_digests = {}
+
+
+def _code_names(obj) -> set:
+    # Global names used by a function (nested functions and comprehensions
+    # included) or by the methods of a class
+    if inspect.isclass(obj):
+        names = set()
+        for member in vars(obj).values():
+            member = getattr(member, "__func__", getattr(member, "fget", member))
+            if inspect.isfunction(member):
+                names |= _code_names(member)
+        return names
+    names, codes = set(), [inspect.unwrap(obj).__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if inspect.iscode(const))
+    return names
+
+
+def code_helpers(function) -> list:
+    """
+    Return a function and the functions and classes of its module that it
+    references, directly or through one another, sorted by name. Module-level
+    constants are not followed: the queries are written in the functions.
+    """
+    module = inspect.getmodule(function)
+    namespace = vars(module) if module else {}
+    helpers, pending = {}, [function]
+    while pending:
+        obj = pending.pop()
+        name = f"{obj.__module__}.{obj.__qualname__}"
+        if name in helpers:
+            continue
+        helpers[name] = obj
+        for used in _code_names(obj):
+            value = namespace.get(used)
+            if (inspect.isfunction(value) or inspect.isclass(value)) and (
+                value.__module__ == function.__module__
+            ):
+                pending.append(value)
+    return [helpers[name] for name in sorted(helpers)]
+
+
+def code_digest(function) -> str:
+    """
+    Return the SHA-256 of the source code of a function and of the helpers of
+    its module it calls (see code_helpers), so that a change of one of them
+    changes the digest while a change elsewhere in the module does not. The
+    name is used for the helpers whose source is not available.
+    """
+    if function not in _code_digests:
+        digest = hashlib.sha256()
+        for helper in code_helpers(function):
+            definitions = _source_definitions(inspect.getmodule(helper))
+            name = f"{helper.__module__}.{helper.__qualname__}"
+            digest.update(definitions.get(helper.__qualname__, name).encode())
+        _code_digests[function] = digest.hexdigest()
+    return _code_digests[function]
+
+
+def _source_definitions(module) -> dict:
+    # SHA-256 of the source of each top-level function and class of a module
+    # (decorators included), from one parse of the module
+    if module not in _source_digests:
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = ""
+        lines = source.splitlines(keepends=True)
+        definitions = {}
+        for node in ast.parse(source).body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                first = min(d.lineno for d in [node, *node.decorator_list])
+                text = "".join(lines[first - 1 : node.end_lineno])
+                definitions[node.name] = hashlib.sha256(text.encode()).hexdigest()
+        _source_digests[module] = definitions
+    return _source_digests[module]
+
+
+class _StoredTable:
+    """
+    Table held in its file instead of memory (the result of a stage skipped by
+    run_stages_incremental, or of sparql_sharded_dataframe): it is only read
+    from the file if a stage that is rebuilt needs it.
+    """
 
-        toolsA1 = topic2tools[a1]
-        pa1 = len(toolsA1) / nbToolsWithTopic
+    def __init__(self, path: str):
+        self.path = path
 
-        for a2 in annotT2:
+    def load(self) -> pd.DataFrame:
+        return read_table(self.path)
 
-            # Check cached value
-            if dictAnnotationPairsMutualInformation is not None:
-                if (a1, a2) in dictAnnotationPairsMutualInformation:
-                    mi += dictAnnotationPairsMutualInformation[(a1, a2)]
-                    continue
 
-            toolsA2 = topic2tools[a2]
-            pa2 = len(toolsA2) / nbToolsWithTopic
-            pa1a2 = len(toolsA1.intersection(toolsA2)) / nbToolsWithTopic
+def run_stages_incremental(
+    stages: dict,
+    outputs: dict,
+    force: bool = False,
+    max_workers: int = None,
+    on_finish=None,
+    files: dict = None,
+) -> tuple:
+    """
+    Run the stages like run_stages, skipping the ones whose output file is up
+    to date: built from the current knowledge graph version (see get_kg_version),
+    by the same code (see code_digest), from inputs with the same content, and
+    not modified since.
+    A stage whose dependency is rebuilt with an unchanged content is not rebuilt.
 
-            if pa1 * pa2 * pa1a2 != 0:
-                result = pa1a2 * np.log2(pa1a2 / (pa1 * pa2))
-            else:
-                result = 0.0
+    Tables are passed in memory from stage to stage, and written once all the
+    stages are finished (see deferred_writes).
 
-            mi += result
+    Parameters
+    ----------
+    stages : dict
+        {name: (function, dependencies)}, see run_stages.
+    outputs : dict
+        {name: path of the file written by the stage, or None}. A stage returning
+        a dict of tables writes {key: path}, and is up to date when all its files
+        are. Stages without output file always run.
+    force : bool
+        Rebuild all the stages (default: False).
+    max_workers : int, optional
+        Number of stages running at the same time, at least 1 (default:
+        sparql_max_concurrency).
+    on_finish : callable, optional
+        Called as on_finish(name, (start, end), wasRebuilt) when a stage is finished.
+    files : dict, optional
+        {name: paths of the files read by the stage besides the tables of its
+        dependencies}, e.g. the EDAM OWL file: their content is an input of the
+        stage as well.
 
-            # Save cached values (symmetric)
-            if dictAnnotationPairsMutualInformation is not None:
-                dictAnnotationPairsMutualInformation[(a1, a2)] = result
-                dictAnnotationPairsMutualInformation[(a2, a1)] = result
+    Returns
+    -------
+    tuple
+        (results, timings, rebuilt): see run_stages; rebuilt lists the stages
+        that ran. Skipped stages have a placeholder result.
+    """
+    manifest = load_manifest()
+    version = get_kg_version()
+    files = files or {}
+    fileDigests = {
+        path: file_digest(path) for paths in files.values() for path in paths
+    }
+    digests, written = {}, {}
+    rebuilt = []
+
+    def output_files(name):
+        # {dependency: path} of the files written by a stage
+        output = outputs.get(name)
+        if isinstance(output, dict):
+            return {f"{name}.{key}": path for key, path in output.items()}
+        return {name: output} if output else {}
+
+    def is_fresh(path, code, inputs):
+        record = manifest.get(path)
+        return (
+            record is not None
+            and record["kg_version"] == version
+            and record["code"] == code
+            and record["inputs"] == inputs
+            and os.path.exists(path)
+            and record.get("file") == file_digest(path)
+        )
 
-    return mi
+    def load(value):
+        if isinstance(value, dict):
+            return {key: load(table) for key, table in value.items()}
+        return value.load() if isinstance(value, _StoredTable) else value
+
+    def incremental(name, function, deps):
+        paths = output_files(name)
+        code = code_digest(function)
+        deps = _stage_arguments(deps).values()
+
+        def stage(**results):
+            inputs = {
+                path: digests[ref]
+                for dep in deps
+                for ref, path in output_files(_dependency_stage(dep)).items()
+                if dep in (ref, _dependency_stage(ref))
+            }
+            inputs.update({path: fileDigests[path] for path in files.get(name, [])})
+            if (
+                paths
+                and not force
+                and all(is_fresh(path, code, inputs) for path in paths.values())
+            ):
+                for ref, path in paths.items():
+                    digests[ref] = manifest[path]["hash"]
+                if name in paths:
+                    return _StoredTable(paths[name])
+                return {
+                    ref.partition(".")[2]: _StoredTable(path)
+                    for ref, path in paths.items()
+                }
+
+            kwargs = {
+                argument: load(value)
+                for argument, value in results.items()
+                if _accepts_argument(function, argument)
+            }
+            result = function(**kwargs)
+            for ref, path in paths.items():
+                table = _dependency_result({name: result}, ref)
+                if isinstance(table, _StoredTable):
+                    digests[ref] = file_digest(table.path)
+                else:
+                    digests[ref] = frame_digest(table)
+                written[path] = {
+                    "stage": name,
+                    "producer": f"{function.__module__}.{function.__qualname__}",
+                    "inputs": inputs,
+                    "hash": digests[ref],
+                    "kg_version": version,
+                    "code": code,
+                }
+            rebuilt.append(name)
+            return result
+
+        return stage
+
+    try:
+        with deferred_writes():
+            results, timings = run_stages(
+                {
+                    name: (incremental(name, function, deps), deps)
+                    for name, (function, deps) in stages.items()
+                },
+                max_workers=max_workers,
+                on_finish=on_finish
+                and (lambda name, timing: on_finish(name, timing, name in rebuilt)),
+            )
+    finally:
+        for path, record in written.items():
+            if os.path.exists(path):
+                manifest[path] = dict(record, file=file_digest(path))
+        os.makedirs(dataframe_dir, exist_ok=True)
+        with open(manifest_path(), "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+    return results, timings, rebuilt
 
 
 def get_nb_tools() -> int:
@@ -1632,10 +4715,7 @@ def get_nb_tools() -> int:
     }
     """
 
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
+    results = sparql_query(prefixes + query)
 
     nb_tools = int(results["results"]["bindings"][0]["nbTools"]["value"])
     return nb_tools
@@ -1659,8 +4739,8 @@ def get_tools_dataframe() -> pd.DataFrame:
     }
     """
 
-    dfTool = sparqldataframe.query(endpointURL, prefixes + query)
-    dfTool.to_csv("Dataframe/dfTool.tsv.bz2", sep="\t", index=False)
+    dfTool = sparql_dataframe(prefixes + query)
+    write_table(dfTool, "Dataframe/dfTool.tsv.bz2")
     return dfTool
 
 
@@ -1686,23 +4766,42 @@ def get_tools_topics_dataframe() -> pd.DataFrame:
     }
     """
 
-    dfToolTopic = sparqldataframe.query(endpointURL, prefixes + query)
-    dfToolTopic.to_csv("Dataframe/dfToolTopic.tsv.bz2", sep="\t", index=False)
+    dfToolTopic = sparql_dataframe(prefixes + query)
+    write_table(dfToolTopic, "Dataframe/dfToolTopic.tsv.bz2")
     return dfToolTopic
 
 
-def get_tools_topics_transitive_dataframe() -> pd.DataFrame:
+def get_tools_topics_transitive_dataframe(
+    dfToolTopic: pd.DataFrame | None = None,
+    dfTool: pd.DataFrame | None = None,
+) -> pd.DataFrame:
     """
-    Execute SPARQL query to get SoftwareApplication tools and their topics (including ancestors).
+    Get SoftwareApplication tools and their topics (including ancestors).
+
+    When the direct annotations dfToolTopic are given and the EDAM OWL file is
+    the version of the knowledge graph (see edam_hierarchy_available), the
+    ancestors are derived locally from the EDAM closure (see expand_to_ancestors)
+    instead of evaluating the property path on the SPARQL endpoint.
+    Otherwise, when the tools dfTool are given, the query is run by batches of
+    tools (see sparql_sharded_dataframe), and the table is returned as stored in
+    its file rather than in memory.
+
+    Parameters
+    ----------
+    dfToolTopic : pd.DataFrame, optional
+        Direct annotations, as returned by get_tools_topics_dataframe.
+    dfTool : pd.DataFrame, optional
+        Tools, as returned by get_tools_dataframe.
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame or _StoredTable
         DataFrame with tools, topics, and topic labels (transitive closure).
     """
     query = """
     SELECT DISTINCT ?tool ?topic ?topicLabel
     WHERE {
+      # VALUES ?tool
       ?tool rdf:type sc:SoftwareApplication .
       ?tool sc:applicationSubCategory/(rdfs:subClassOf*) ?topic .
       ?topic rdf:type owl:Class .
@@ -1713,10 +4812,15 @@ def get_tools_topics_transitive_dataframe() -> pd.DataFrame:
     }
     """
 
-    dfToolTopicTransitive = sparqldataframe.query(endpointURL, prefixes + query)
-    dfToolTopicTransitive.to_csv(
-        "Dataframe/dfToolTopicTransitive.tsv.bz2", sep="\t", index=False
-    )
+    if dfToolTopic is not None and edam_hierarchy_available():
+        dfToolTopicTransitive = expand_to_ancestors(dfToolTopic, "topic")
+    elif dfTool is not None:
+        return sparql_sharded_dataframe(
+            prefixes + query, dfTool["tool"], "Dataframe/dfToolTopicTransitive.tsv.bz2"
+        )
+    else:
+        dfToolTopicTransitive = sparql_dataframe(prefixes + query)
+    write_table(dfToolTopicTransitive, "Dataframe/dfToolTopicTransitive.tsv.bz2")
     return dfToolTopicTransitive
 
 
@@ -1742,23 +4846,42 @@ def get_tools_operations_label_dataframe() -> pd.DataFrame:
     }
     """
 
-    dfToolOperation = sparqldataframe.query(endpointURL, prefixes + query)
-    dfToolOperation.to_csv("Dataframe/dfToolOperation.tsv.bz2", sep="\t", index=False)
+    dfToolOperation = sparql_dataframe(prefixes + query)
+    write_table(dfToolOperation, "Dataframe/dfToolOperation.tsv.bz2")
     return dfToolOperation
 
 
-def get_tools_operations_transitive_dataframe() -> pd.DataFrame:
+def get_tools_operations_transitive_dataframe(
+    dfToolOperation: pd.DataFrame | None = None,
+    dfTool: pd.DataFrame | None = None,
+) -> pd.DataFrame:
     """
-    Execute SPARQL query to get SoftwareApplication tools and their operations (including ancestors).
+    Get SoftwareApplication tools and their operations (including ancestors).
+
+    When the direct annotations dfToolOperation are given and the EDAM OWL file is
+    the version of the knowledge graph (see edam_hierarchy_available), the
+    ancestors are derived locally from the EDAM closure (see expand_to_ancestors)
+    instead of evaluating the property path on the SPARQL endpoint.
+    Otherwise, when the tools dfTool are given, the query is run by batches of
+    tools (see sparql_sharded_dataframe), and the table is returned as stored in
+    its file rather than in memory.
+
+    Parameters
+    ----------
+    dfToolOperation : pd.DataFrame, optional
+        Direct annotations, as returned by get_tools_operations_label_dataframe.
+    dfTool : pd.DataFrame, optional
+        Tools, as returned by get_tools_dataframe.
 
     Returns
     -------
-    pd.DataFrame
+    pd.DataFrame or _StoredTable
         DataFrame with tools, operations, and operation labels (transitive closure).
     """
     query = """
     SELECT DISTINCT ?tool ?operation ?operationLabel
     WHERE {
+      # VALUES ?tool
       ?tool rdf:type sc:SoftwareApplication .
       ?tool sc:featureList/(rdfs:subClassOf*) ?operation .
       ?operation rdf:type owl:Class .
@@ -1769,9 +4892,18 @@ def get_tools_operations_transitive_dataframe() -> pd.DataFrame:
     }
     """
 
-    dfToolOperationTransitive = sparqldataframe.query(endpointURL, prefixes + query)
-    dfToolOperationTransitive.to_csv(
-        "Dataframe/dfToolOperationTransitive.tsv.bz2", sep="\t", index=False
+    if dfToolOperation is not None and edam_hierarchy_available():
+        dfToolOperationTransitive = expand_to_ancestors(dfToolOperation, "operation")
+    elif dfTool is not None:
+        return sparql_sharded_dataframe(
+            prefixes + query,
+            dfTool["tool"],
+            "Dataframe/dfToolOperationTransitive.tsv.bz2",
+        )
+    else:
+        dfToolOperationTransitive = sparql_dataframe(prefixes + query)
+    write_table(
+        dfToolOperationTransitive, "Dataframe/dfToolOperationTransitive.tsv.bz2"
     )
     return dfToolOperationTransitive
 
@@ -1828,29 +4960,83 @@ def get_dftools_with_nbTopics_nbOperations(
     dfTool["nbOperations"] = dfTool["nbOperations"].fillna(0).astype(int)
 
     # Save to compressed TSV
-    dfTool.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(dfTool, output_path)
 
     return dfTool
 
 
+def _redundancy_dataframe(dfDirect: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Format the redundancies found by find_redundant_annotations with the columns
+    of the redundancy tables ("Tool", "Direct Topic ID", "Direct Topic Label", ...).
+    """
+    name = column.capitalize()
+    labels = get_edam_hierarchy()["labels"]
+    dfRedundancy = find_redundant_annotations(dfDirect, column)
+    return pd.DataFrame(
+        {
+            "Tool": dfRedundancy["tool"],
+            f"Direct {name} ID": dfRedundancy["directConcept"],
+            f"Direct {name} Label": dfRedundancy["directConcept"].map(
+                lambda uri: labels.get(uri, "")
+            ),
+            f"Redundant {name} ID": dfRedundancy["redundantConcept"],
+            f"Redundant {name} Label": dfRedundancy["redundantConcept"].map(
+                lambda uri: labels.get(uri, "")
+            ),
+        }
+    )
+
+
+def _sparql_redundancy_dataframe(chunk: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Format a chunk of the results of the redundancy queries with the columns of
+    the redundancy tables (see _redundancy_dataframe).
+    """
+    name = column.capitalize()
+    direct, redundant = "direct" + name, "redundantDirect" + name
+    return pd.DataFrame(
+        {
+            "Tool": chunk["tool"].str.replace(edamURI, "", regex=False),
+            f"Direct {name} ID": edamURI
+            + chunk[direct].fillna("").str.replace(edamURI, "", regex=False),
+            f"Direct {name} Label": chunk[direct + "Label"].fillna(""),
+            f"Redundant {name} ID": edamURI
+            + chunk[redundant].fillna("").str.replace(edamURI, "", regex=False),
+            f"Redundant {name} Label": chunk[redundant + "Label"].fillna(""),
+        }
+    )
+
+
 def generate_df_redundancy_topic(
     output_path: str = "Dataframe/dfToolTopic_redundancy.tsv.bz2",
+    dfToolTopic: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
     """
     Generate the df_redundancy_topic DataFrame by running a SPARQL query using
     pre-defined global variables (endpointURL, prefixes, edamURI), and save it
     as a compressed .tsv.bz2 file.
 
+    When the direct annotations dfToolTopic are given and the EDAM OWL file is
+    the version of the knowledge graph (see edam_hierarchy_available), the
+    redundancies are computed locally (see find_redundant_annotations).
+
     Parameters
     ----------
     output_path : str, optional
         Path to save the resulting DataFrame. Default is 'Dataframe/dfToolTopic_redundancy.tsv.bz2'.
+    dfToolTopic : pd.DataFrame, optional
+        Direct annotations, as returned by get_tools_topics_dataframe.
 
     Returns
     -------
     pd.DataFrame
         The redundancy topic DataFrame.
     """
+    if dfToolTopic is not None and edam_hierarchy_available():
+        df_redundancy_topic = _redundancy_dataframe(dfToolTopic, "topic")
+        write_table(df_redundancy_topic, output_path)
+        return df_redundancy_topic
 
     # Define SPARQL query
     redundancyQuery = """
@@ -1875,45 +5061,33 @@ def generate_df_redundancy_topic(
     """
 
     # Run SPARQL query
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + redundancyQuery)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-
-    # Extract results into a list of dictionaries
-    data = [
-        {
-            "Tool": result["tool"]["value"].replace(edamURI, ""),
-            "Direct Topic ID": edamURI
-            + result.get("directTopic", {}).get("value", "").replace(edamURI, ""),
-            "Direct Topic Label": result.get("directTopicLabel", {}).get("value", ""),
-            "Redundant Topic ID": edamURI
-            + result.get("redundantDirectTopic", {})
-            .get("value", "")
-            .replace(edamURI, ""),
-            "Redundant Topic Label": result.get("redundantDirectTopicLabel", {}).get(
-                "value", ""
-            ),
-        }
-        for result in results["results"]["bindings"]
-    ]
-
-    # Create DataFrame
-    df_redundancy_topic = pd.DataFrame(data)
+    df_redundancy_topic = sparql_dataframe(
+        prefixes + redundancyQuery,
+        transform=lambda chunk: _sparql_redundancy_dataframe(chunk, "topic"),
+    )
 
     # Save to compressed TSV
-    df_redundancy_topic.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(df_redundancy_topic, output_path)
 
     return df_redundancy_topic
 
 
 def generate_df_redundancy_operation(
     output_path: str = "Dataframe/dfToolOperation_redundancy.tsv.bz2",
+    dfToolOperation: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
     """
     Run a SPARQL query using pre-defined variables (endpointURL, prefixes, edamURI)
     and save the redundancy operation results as a compressed .tsv.bz2 file.
+
+    When the direct annotations dfToolOperation are given and the EDAM OWL file is
+    the version of the knowledge graph (see edam_hierarchy_available), the
+    redundancies are computed locally (see find_redundant_annotations).
     """
+    if dfToolOperation is not None and edam_hierarchy_available():
+        df_redundancy_operation = _redundancy_dataframe(dfToolOperation, "operation")
+        write_table(df_redundancy_operation, output_path)
+        return df_redundancy_operation
 
     operationRedundancyQuery = """
     SELECT DISTINCT ?tool ?redundantDirectOperation ?redundantDirectOperationLabel ?directOperation ?directOperationLabel
@@ -1937,38 +5111,13 @@ def generate_df_redundancy_operation(
     """
 
     # Run SPARQL query
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + operationRedundancyQuery)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-
-    # Parse results
-    data = [
-        {
-            "Tool": result["tool"]["value"].replace(edamURI, ""),
-            "Direct Operation ID": edamURI
-            + result.get("directOperation", {}).get("value", "").replace(edamURI, ""),
-            "Direct Operation Label": result.get("directOperationLabel", {}).get(
-                "value", ""
-            ),
-            "Redundant Operation ID": edamURI
-            + result.get("redundantDirectOperation", {})
-            .get("value", "")
-            .replace(edamURI, ""),
-            "Redundant Operation Label": result.get(
-                "redundantDirectOperationLabel", {}
-            ).get("value", ""),
-        }
-        for result in results["results"]["bindings"]
-    ]
-
-    # Create DataFrame
-    df_redundancy_operation = pd.DataFrame(data)
+    df_redundancy_operation = sparql_dataframe(
+        prefixes + operationRedundancyQuery,
+        transform=lambda chunk: _sparql_redundancy_dataframe(chunk, "operation"),
+    )
 
     # Save to compressed TSV
-    df_redundancy_operation.to_csv(
-        output_path, sep="\t", index=False, compression="bz2"
-    )
+    write_table(df_redundancy_operation, output_path)
 
     return df_redundancy_operation
 
@@ -1979,26 +5128,25 @@ def generate_df_topic_no_redundancy(
     output_path="Dataframe/df_topic_no_redundancy.tsv.bz2",
 ) -> pd.DataFrame:
     """
-    Compute df_topic_no_redundancy using already-generated files.
+    Compute df_topic_no_redundancy from already-generated tables (DataFrames or
+    paths of .tsv.bz2 files).
     """
 
     # Load both dataframes instead of using globals
-    dfToolTopic = pd.read_csv(dfToolTopic_path, sep="\t", compression="bz2")
-    df_redundancy_topic = pd.read_csv(
-        df_redundancy_topic_path, sep="\t", compression="bz2"
-    )
+    dfToolTopic = _input_table(dfToolTopic_path)
+    df_redundancy_topic = _input_table(df_redundancy_topic_path)
 
-    # Build a set of redundant (Tool, Redundant Topic ID)
-    redundant_pairs = set(
-        zip(df_redundancy_topic["Tool"], df_redundancy_topic["Redundant Topic ID"])
+    # Redundant (Tool, Redundant Topic ID) pairs
+    redundant_pairs = pd.MultiIndex.from_arrays(
+        [df_redundancy_topic["Tool"], df_redundancy_topic["Redundant Topic ID"]]
     )
 
     # Apply filtering
     df_topic_no_redundancy = dfToolTopic[
-        ~dfToolTopic[["tool", "topic"]].apply(tuple, axis=1).isin(redundant_pairs)
+        ~pd.MultiIndex.from_frame(dfToolTopic[["tool", "topic"]]).isin(redundant_pairs)
     ]
 
-    df_topic_no_redundancy.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(df_topic_no_redundancy, output_path)
 
     return df_topic_no_redundancy
 
@@ -2009,30 +5157,27 @@ def generate_df_operation_no_redundancy(
     output_path="Dataframe/df_operation_no_redundancy.tsv.bz2",
 ) -> pd.DataFrame:
     """
-    Compute df_operation_no_redundancy using already-generated files.
+    Compute df_operation_no_redundancy from already-generated tables (DataFrames
+    or paths of .tsv.bz2 files).
     """
 
-    dfToolOperation = pd.read_csv(dfToolOperation_path, sep="\t", compression="bz2")
-    df_redundancy_operation = pd.read_csv(
-        df_redundancy_operation_path, sep="\t", compression="bz2"
-    )
+    dfToolOperation = _input_table(dfToolOperation_path)
+    df_redundancy_operation = _input_table(df_redundancy_operation_path)
 
-    redundant_pairs = set(
-        zip(
+    redundant_pairs = pd.MultiIndex.from_arrays(
+        [
             df_redundancy_operation["Tool"],
             df_redundancy_operation["Redundant Operation ID"],
-        )
+        ]
     )
 
     df_operation_no_redundancy = dfToolOperation[
-        ~dfToolOperation[["tool", "operation"]]
-        .apply(tuple, axis=1)
-        .isin(redundant_pairs)
+        ~pd.MultiIndex.from_frame(dfToolOperation[["tool", "operation"]]).isin(
+            redundant_pairs
+        )
     ]
 
-    df_operation_no_redundancy.to_csv(
-        output_path, sep="\t", index=False, compression="bz2"
-    )
+    write_table(df_operation_no_redundancy, output_path)
 
     return df_operation_no_redundancy
 
@@ -2049,13 +5194,9 @@ def generate_dfTool_transitive(
     """
 
     # Load required dataframes
-    dfTool = pd.read_csv(dfTool_path, sep="\t", compression="bz2")
-    dfToolTopicTransitive = pd.read_csv(
-        dfToolTopicTransitive_path, sep="\t", compression="bz2"
-    )
-    dfToolOperationTransitive = pd.read_csv(
-        dfToolOperationTransitive_path, sep="\t", compression="bz2"
-    )
+    dfTool = _input_table(dfTool_path)
+    dfToolTopicTransitive = _input_table(dfToolTopicTransitive_path)
+    dfToolOperationTransitive = _input_table(dfToolOperationTransitive_path)
 
     # Number of topic matches (transitive)
     dfToolNbTopics = (
@@ -2078,7 +5219,7 @@ def generate_dfTool_transitive(
     dfTool_T["nbTopics"] = dfTool_T["nbTopics"].fillna(0).astype(int)
     dfTool_T["nbOperations"] = dfTool_T["nbOperations"].fillna(0).astype(int)
 
-    dfTool_T.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(dfTool_T, output_path)
     return dfTool_T
 
 
@@ -2090,13 +5231,14 @@ def generate_dfTool_no_transitive(
 ) -> pd.DataFrame:
     """
     Generate dfTool with nbTopics and nbOperations without transitive closure,
-    using already-generated TSV files instead of global variables.
+    using already-generated tables (DataFrames or paths of .tsv.bz2 files)
+    instead of global variables.
     """
 
     # Load required dataframes
-    dfTool = pd.read_csv(dfTool_path, sep="\t", compression="bz2")
-    dfToolTopic = pd.read_csv(dfToolTopic_path, sep="\t", compression="bz2")
-    dfToolOperation = pd.read_csv(dfToolOperation_path, sep="\t", compression="bz2")
+    dfTool = _input_table(dfTool_path)
+    dfToolTopic = _input_table(dfToolTopic_path)
+    dfToolOperation = _input_table(dfToolOperation_path)
 
     # Number of topic matches (non-transitive)
     dfToolNbTopics = dfToolTopic.groupby("tool").size().reset_index(name="nbTopics")
@@ -2115,7 +5257,7 @@ def generate_dfTool_no_transitive(
     dfTool_NT["nbTopics"] = dfTool_NT["nbTopics"].fillna(0).astype(int)
     dfTool_NT["nbOperations"] = dfTool_NT["nbOperations"].fillna(0).astype(int)
 
-    dfTool_NT.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(dfTool_NT, output_path)
     return dfTool_NT
 
 
@@ -2126,13 +5268,9 @@ def generate_dfTool_no_transitive_no_redundancy(
     output_path="Dataframe/dfTool_NoTransitive_NoRedundancy.tsv.bz2",
 ) -> pd.DataFrame:
 
-    dfTool = pd.read_csv(dfTool_path, sep="\t", compression="bz2")
-    df_topic_no_redundancy = pd.read_csv(
-        df_topic_no_redundancy_path, sep="\t", compression="bz2"
-    )
-    df_operation_no_redundancy = pd.read_csv(
-        df_operation_no_redundancy_path, sep="\t", compression="bz2"
-    )
+    dfTool = _input_table(dfTool_path)
+    df_topic_no_redundancy = _input_table(df_topic_no_redundancy_path)
+    df_operation_no_redundancy = _input_table(df_operation_no_redundancy_path)
 
     # nbTopics
     dfToolNbTopics = (
@@ -2153,7 +5291,7 @@ def generate_dfTool_no_transitive_no_redundancy(
     dfTool_NR["nbTopics"] = dfTool_NR["nbTopics"].fillna(0).astype(int)
     dfTool_NR["nbOperations"] = dfTool_NR["nbOperations"].fillna(0).astype(int)
 
-    dfTool_NR.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(dfTool_NR, output_path)
 
     return dfTool_NR
 
@@ -2172,18 +5310,14 @@ def get_dfDeprecatedItems(
     ORDER BY ?deprecatedItem
     """
 
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-
-    data = [
-        {"Deprecated Item": r["deprecatedItem"]["value"]}
-        for r in results["results"]["bindings"]
-    ]
-    dfDeprecatedItems = pd.DataFrame(data)
+    dfDeprecatedItems = sparql_dataframe(
+        prefixes + query,
+        transform=lambda chunk: chunk.rename(
+            columns={"deprecatedItem": "Deprecated Item"}
+        ),
+    )
 
-    dfDeprecatedItems.to_csv(output_path, sep="\t", index=False, compression="bz2")
+    write_table(dfDeprecatedItems, output_path)
     return dfDeprecatedItems
 
 
@@ -2210,23 +5344,17 @@ def get_dfDeprecatedSuggestedItems(
     ORDER BY ?deprecatedItem
     """
 
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
-
-    data = [
-        {
-            "Deprecated Item": r["deprecatedItem"]["value"],
-            "Suggested Item": r["suggestedItem"]["value"],
-        }
-        for r in results["results"]["bindings"]
-    ]
-    dfDeprecatedSuggestedItems = pd.DataFrame(data)
-
-    dfDeprecatedSuggestedItems.to_csv(
-        output_path, sep="\t", index=False, compression="bz2"
+    dfDeprecatedSuggestedItems = sparql_dataframe(
+        prefixes + query,
+        transform=lambda chunk: chunk.rename(
+            columns={
+                "deprecatedItem": "Deprecated Item",
+                "suggestedItem": "Suggested Item",
+            }
+        ),
     )
+
+    write_table(dfDeprecatedSuggestedItems, output_path)
     return dfDeprecatedSuggestedItems
 
 
@@ -2246,48 +5374,166 @@ def get_dfToolsWithSomeDeprecatedTopic(
     ORDER BY ?tool
     """
 
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
+    dfToolsWithSomeDeprecatedTopic = sparql_dataframe(
+        prefixes + query,
+        transform=lambda chunk: chunk.rename(columns={"tool": "Tool"}),
+    )
+
+    write_table(dfToolsWithSomeDeprecatedTopic, output_path)
+    return dfToolsWithSomeDeprecatedTopic
+
+
+def get_dfToolsWithSomeDeprecatedOperation(
+    output_path: str = "Dataframe/dfToolsWithSomeDeprecatedOperation.tsv.bz2",
+) -> pd.DataFrame:
+    """
+    Retrieve the list of tools annotated with at least one deprecated operation.
+    """
+    query = """
+    SELECT DISTINCT ?tool
+    WHERE {
+      ?tool rdf:type sc:SoftwareApplication .
+      ?tool sc:featureList/(rdfs:subClassOf*) ?deprecatedItem .
+      ?deprecatedItem owl:deprecated True .
+    }
+    ORDER BY ?tool
+    """
+
+    dfToolsWithSomeDeprecatedOperation = sparql_dataframe(
+        prefixes + query,
+        transform=lambda chunk: chunk.rename(columns={"tool": "Tool"}),
+    )
+
+    write_table(dfToolsWithSomeDeprecatedOperation, output_path)
+    return dfToolsWithSomeDeprecatedOperation
+
+
+# Metric table -> (annotation table, concept column) of compute_concept_metrics.
+# The transitive closure of the non-redundant annotations is the transitive table
+# itself (a redundant annotation is an ancestor of another annotation of the tool),
+# so the no-redundancy variants only exist for the directly assigned concepts.
+METRIC_TABLES = {
+    "dfTopicmetrics": ("dfToolTopicTransitive", "topic"),
+    "dfTopicmetrics_NT": ("dfToolTopic", "topic"),
+    "dfTopicmetrics_NT_NR": ("df_topic_no_redundancy", "topic"),
+    "dfOperationmetrics": ("dfToolOperationTransitive", "operation"),
+    "dfOperationmetrics_NT": ("dfToolOperation", "operation"),
+    "dfOperationmetrics_NT_NR": ("df_operation_no_redundancy", "operation"),
+}
+
+
+def _concept_metrics(annotations: list) -> list:
+    """
+    Compute the concept metrics of several tool-concept tables at once.
+
+    The tools, concepts and labels of all the tables are coded as integers in a
+    single factorization, and the number of tools of each (table, concept) and
+    of each table are counted with one np.bincount each.
+
+    Parameters
+    ----------
+    annotations : list
+        (DataFrame, column) pairs: a tool-concept table with the tool, column and
+        <column>Label columns.
+
+    Returns
+    -------
+    list[pd.DataFrame]
+        For each table, the columns column, <column>Label, nbTools, frequence, IC
+        and entropy, one row per (concept, label) in order of first appearance.
+    """
+    sizes = np.array([len(df) for df, _ in annotations])
+    variants = np.repeat(np.arange(len(annotations)), sizes)
+    nbVariants = len(annotations)
+
+    def factorize(columns):
+        return pd.factorize(
+            pd.concat(
+                [df[column] for (df, _), column in zip(annotations, columns)],
+                ignore_index=True,
+            ),
+            use_na_sentinel=False,
+        )
+
+    kinds = [column for _, column in annotations]
+    toolCodes, tools = factorize(["tool"] * nbVariants)
+    conceptCodes, concepts = factorize(kinds)
+    labelCodes, labels = factorize([f"{kind}Label" for kind in kinds])
+
+    # nbTools of each (table, concept), and number of annotated tools of each table
+    nbTools = np.bincount(
+        variants * len(concepts) + conceptCodes, minlength=nbVariants * len(concepts)
+    ).reshape(nbVariants, len(concepts))
+    nbToolsWithConcept = (
+        np.bincount(
+            variants * len(tools) + toolCodes, minlength=nbVariants * len(tools)
+        )
+        .reshape(nbVariants, len(tools))
+        .astype(bool)
+        .sum(axis=1)
+    )
 
-    data = [{"Tool": r["tool"]["value"]} for r in results["results"]["bindings"]]
-    dfToolsWithSomeDeprecatedTopic = pd.DataFrame(data)
+    # Distinct (concept, label) pairs of each table, in order of first appearance
+    pairs = conceptCodes.astype(np.int64) * len(labels) + labelCodes
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    results = []
+    for variant, (_, column) in enumerate(annotations):
+        concept, label = np.divmod(
+            pd.unique(pairs[bounds[variant] : bounds[variant + 1]]), len(labels)
+        )
 
-    dfToolsWithSomeDeprecatedTopic.to_csv(
-        output_path, sep="\t", index=False, compression="bz2"
-    )
-    return dfToolsWithSomeDeprecatedTopic
+        frequence = nbTools[variant, concept] / nbToolsWithConcept[variant]
+        IC = -np.log2(frequence)
+        results.append(
+            pd.DataFrame(
+                {
+                    column: concepts[concept],
+                    f"{column}Label": labels[label],
+                    "nbTools": nbTools[variant, concept],
+                    "frequence": frequence,
+                    "IC": IC,
+                    "entropy": frequence * IC,
+                }
+            )
+        )
+    return results
 
 
-def get_dfToolsWithSomeDeprecatedOperation(
-    output_path: str = "Dataframe/dfToolsWithSomeDeprecatedOperation.tsv.bz2",
-) -> pd.DataFrame:
-    """
-    Retrieve the list of tools annotated with at least one deprecated operation.
-    """
-    query = """
-    SELECT DISTINCT ?tool
-    WHERE {
-      ?tool rdf:type sc:SoftwareApplication .
-      ?tool sc:featureList/(rdfs:subClassOf*) ?deprecatedItem .
-      ?deprecatedItem owl:deprecated True .
-    }
-    ORDER BY ?tool
+def compute_concept_metrics(output_dir: str = None, **tables) -> dict:
     """
+    Compute the frequence, Information Content (IC) and entropy of the topics and
+    operations of every table of METRIC_TABLES (transitive, directly assigned and
+    directly assigned without redundancy) in one pass, and save them.
 
-    sparql = SPARQLWrapper(endpointURL)
-    sparql.setQuery(prefixes + query)
-    sparql.setReturnFormat(JSON)
-    results = sparql.query().convert()
+    Parameters
+    ----------
+    output_dir : str, optional
+        Folder of the annotation tables and of the metric tables (default:
+        dataframe_dir).
+    **tables : str or pd.DataFrame
+        Annotation tables by name (e.g. dfToolTopicTransitive=...), as paths or
+        DataFrames. Missing ones are read from output_dir.
 
-    data = [{"Tool": r["tool"]["value"]} for r in results["results"]["bindings"]]
-    dfToolsWithSomeDeprecatedOperation = pd.DataFrame(data)
+    Returns
+    -------
+    dict
+        {metric table name: DataFrame}, with the columns of compute_topic_metrics.
+    """
+    output_dir = output_dir or dataframe_dir
+    annotations = [
+        (
+            _input_table(
+                tables.get(source, os.path.join(output_dir, TABLE_FILES[source]))
+            ),
+            column,
+        )
+        for source, column in METRIC_TABLES.values()
+    ]
 
-    dfToolsWithSomeDeprecatedOperation.to_csv(
-        output_path, sep="\t", index=False, compression="bz2"
-    )
-    return dfToolsWithSomeDeprecatedOperation
+    metrics = dict(zip(METRIC_TABLES, _concept_metrics(annotations)))
+    for name, df in metrics.items():
+        write_table(df, os.path.join(output_dir, TABLE_FILES[name]))
+    return metrics
 
 
 def compute_topic_metrics(
@@ -2298,8 +5544,8 @@ def compute_topic_metrics(
     Compute topic metrics including Information Content (IC) and entropy
     Parameters:
     -----------
-    dfToolTopicTransitive_path : str
-        Path to the transitive tool-topic dataframe
+    dfToolTopicTransitive_path : str or pd.DataFrame
+        Path to the transitive tool-topic dataframe, or the dataframe itself
     output_path : str
         Path to save the topic metrics dataframe
 
@@ -2308,43 +5554,10 @@ def compute_topic_metrics(
     pd.DataFrame
         Dataframe containing topic metrics
     """
-
-    # Read input dataframes
-    dfToolTopicTransitive = pd.read_csv(
-        dfToolTopicTransitive_path, sep="\t", compression="bz2"
-    )
-
-    # Calculate number of tools per topic
-    dfTopicNbTools = (
-        dfToolTopicTransitive[["tool", "topic"]]
-        .groupby(by="topic")
-        .size()
-        .reset_index(name="nbTools")
-        .sort_values(by="nbTools", ascending=False)
-    )
-
-    # Create topic dataframe with unique topics and their labels
-    dfTopic = (
-        dfToolTopicTransitive[["topic", "topicLabel"]]
-        .drop_duplicates(subset=["topic", "topicLabel"], keep="first")
-        .reset_index(drop=True)
+    (dfTopicmetrics,) = _concept_metrics(
+        [(_input_table(dfToolTopicTransitive_path), "topic")]
     )
-
-    # Join with tool counts
-    dfTopic = dfTopic.join(dfTopicNbTools.set_index("topic"), on="topic")
-
-    # Calculate total number of tools with topics
-    nbToolsWithTopic = dfToolTopicTransitive["tool"].nunique()
-
-    # Calculate metrics
-    dfTopic["frequence"] = dfTopic["nbTools"] / nbToolsWithTopic
-    dfTopic["IC"] = -np.log2(dfTopic["frequence"])
-    dfTopic["entropy"] = dfTopic["frequence"] * dfTopic["IC"]
-
-    # Save results
-    dfTopic.to_csv(output_path, sep="\t", index=False, compression="bz2")
-    dfTopicmetrics = dfTopic
-
+    write_table(dfTopicmetrics, output_path)
     return dfTopicmetrics
 
 
@@ -2353,13 +5566,12 @@ def compute_topic_metrics_NT(
     output_path="Dataframe/dfTopicmetrics_NT.tsv.bz2",
 ) -> pd.DataFrame:
     """
-    Compute topic metrics without transitive closure including Information Content (IC) and entropy,
-    and save the results to global variables.
+    Compute topic metrics without transitive closure including Information Content (IC) and entropy.
 
     Parameters:
     -----------
-    dfToolTopic_path : str
-        Path to the tool-topic dataframe (without transitive closure)
+    dfToolTopic_path : str or pd.DataFrame
+        Path to the tool-topic dataframe (without transitive closure), or the dataframe itself
     output_path : str
         Path to save the topic metrics dataframe
 
@@ -2368,41 +5580,8 @@ def compute_topic_metrics_NT(
     pd.DataFrame
         Dataframe containing topic metrics without transitive closure
     """
-
-    # Read input dataframes
-    dfToolTopic = pd.read_csv(dfToolTopic_path, sep="\t", compression="bz2")
-
-    # Calculate total number of tools with topics
-    nbToolsWithTopic = dfToolTopic["tool"].nunique()
-
-    # Calculate number of tools per topic
-    dfTopicNbTools = (
-        dfToolTopic[["tool", "topic"]]
-        .groupby(by="topic")
-        .size()
-        .reset_index(name="nbTools")
-        .sort_values(by="nbTools", ascending=False)
-    )
-
-    # Create topic dataframe with unique topics and their labels
-    dfTopic = (
-        dfToolTopic[["topic", "topicLabel"]]
-        .drop_duplicates(subset=["topic", "topicLabel"], keep="first")
-        .reset_index(drop=True)
-    )
-
-    # Join with tool counts
-    dfTopic = dfTopic.join(dfTopicNbTools.set_index("topic"), on="topic")
-
-    # Calculate metrics
-    dfTopic["frequence"] = dfTopic["nbTools"] / nbToolsWithTopic
-    dfTopic["IC"] = -np.log2(dfTopic["frequence"])
-    dfTopic["entropy"] = dfTopic["frequence"] * dfTopic["IC"]
-
-    # Save results
-    dfTopic.to_csv(output_path, sep="\t", index=False, compression="bz2")
-    dfTopicmetrics_NT = dfTopic
-
+    (dfTopicmetrics_NT,) = _concept_metrics([(_input_table(dfToolTopic_path), "topic")])
+    write_table(dfTopicmetrics_NT, output_path)
     return dfTopicmetrics_NT
 
 
@@ -2415,10 +5594,8 @@ def compute_operation_metrics(
 
     Parameters:
     -----------
-    dfToolOperationTransitive_path : str
-        Path to the transitive tool-operation dataframe
-    dfTool_path : str
-        Path to the tool dataframe (to get total number of tools with operations)
+    dfToolOperationTransitive_path : str or pd.DataFrame
+        Path to the transitive tool-operation dataframe, or the dataframe itself
     output_path : str
         Path to save the operation metrics dataframe
 
@@ -2427,45 +5604,10 @@ def compute_operation_metrics(
     pd.DataFrame
         Dataframe containing operation metrics
     """
-
-    # Read input dataframes
-    dfToolOperationTransitive = pd.read_csv(
-        dfToolOperationTransitive_path, sep="\t", compression="bz2"
-    )
-
-    # Calculate total number of tools with operations
-    nbToolsWithOperation = dfToolOperationTransitive["tool"].nunique()
-
-    # Calculate number of tools per operation
-    dfOperationNbTools = (
-        dfToolOperationTransitive[["tool", "operation"]]
-        .groupby(by="operation")
-        .size()
-        .reset_index(name="nbTools")
-        .sort_values(by="nbTools", ascending=False)
-    )
-
-    # Create operation dataframe with unique operations and their labels
-    dfOperation = (
-        dfToolOperationTransitive[["operation", "operationLabel"]]
-        .drop_duplicates(subset=["operation", "operationLabel"], keep="first")
-        .reset_index(drop=True)
-    )
-
-    # Join with tool counts
-    dfOperation = dfOperation.join(
-        dfOperationNbTools.set_index("operation"), on="operation"
+    (dfOperationmetrics,) = _concept_metrics(
+        [(_input_table(dfToolOperationTransitive_path), "operation")]
     )
-
-    # Calculate metrics
-    dfOperation["frequence"] = dfOperation["nbTools"] / nbToolsWithOperation
-    dfOperation["IC"] = -np.log2(dfOperation["frequence"])
-    dfOperation["entropy"] = dfOperation["frequence"] * dfOperation["IC"]
-
-    # Save results
-    dfOperation.to_csv(output_path, sep="\t", index=False, compression="bz2")
-    dfOperationmetrics = dfOperation
-
+    write_table(dfOperationmetrics, output_path)
     return dfOperationmetrics
 
 
@@ -2478,8 +5620,8 @@ def compute_operation_metrics_NT(
 
     Parameters:
     -----------
-    dfToolOperation_path : str
-        Path to the tool-operation dataframe (without transitive closure)
+    dfToolOperation_path : str or pd.DataFrame
+        Path to the tool-operation dataframe (without transitive closure), or the dataframe itself
     output_path : str
         Path to save the operation metrics dataframe
 
@@ -2488,44 +5630,73 @@ def compute_operation_metrics_NT(
     pd.DataFrame
         Dataframe containing operation metrics without transitive closure
     """
+    (dfOperationmetrics_NT,) = _concept_metrics(
+        [(_input_table(dfToolOperation_path), "operation")]
+    )
+    write_table(dfOperationmetrics_NT, output_path)
+    return dfOperationmetrics_NT
 
-    # Read input dataframes
-    dfToolOperation = pd.read_csv(dfToolOperation_path, sep="\t", compression="bz2")
-
-    # Calculate total number of tools with operations
-    nbToolsWithOperation = dfToolOperation["tool"].nunique()
 
-    # Calculate number of tools per operation
-    dfOperationNbTools = (
-        dfToolOperation[["tool", "operation"]]
-        .groupby(by="operation")
-        .size()
-        .reset_index(name="nbTools")
-        .sort_values(by="nbTools", ascending=False)
-    )
+def _tool_scores(dfTool: pd.DataFrame, annotations: list) -> pd.DataFrame:
+    """
+    Add the topic and operation scores (sum of the IC of the annotations of a
+    tool) and entropies (sum of their entropy) to a tool table.
 
-    # Create operation dataframe with unique operations and their labels
-    dfOperation = (
-        dfToolOperation[["operation", "operationLabel"]]
-        .drop_duplicates(subset=["operation", "operationLabel"], keep="first")
-        .reset_index(drop=True)
-    )
+    The annotations are coded as (tool id, concept id) arrays and the IC and
+    entropy of the concepts as arrays indexed by concept id; the sums of all the
+    tools are then a scatter-add (np.bincount with weights) over the annotations.
+    Annotations whose concept has no metrics count for 0.
 
-    # Join with tool counts
-    dfOperation = dfOperation.join(
-        dfOperationNbTools.set_index("operation"), on="operation"
-    )
+    Parameters
+    ----------
+    dfTool : pd.DataFrame
+        Tools, with a tool column.
+    annotations : list
+        (tool-concept table, concept metrics table, column) of the topics, then
+        of the operations.
 
-    # Calculate metrics
-    dfOperation["frequence"] = dfOperation["nbTools"] / nbToolsWithOperation
-    dfOperation["IC"] = -np.log2(dfOperation["frequence"])
-    dfOperation["entropy"] = dfOperation["frequence"] * dfOperation["IC"]
+    Returns
+    -------
+    pd.DataFrame
+        dfTool with the topicScore, operationScore, score, topicEntropy,
+        operationEntropy and entropy columns.
+    """
+    rows, tools = pd.factorize(dfTool["tool"])
+    scores = np.zeros((len(tools), len(annotations)))
+    entropies = np.zeros((len(tools), len(annotations)))
+
+    for kind, (dfAnnotations, dfMetrics, column) in enumerate(annotations):
+        # Each column is factorized on its own, and its (few) distinct values
+        # mapped to the tool ids of dfTool and to the metrics of the concepts
+        codes, uniques = pd.factorize(dfAnnotations["tool"])
+        toolIds = tools.get_indexer(uniques)[codes]
+        codes, uniques = pd.factorize(dfAnnotations[column], use_na_sentinel=False)
+        metrics = (
+            dfMetrics.drop_duplicates(subset=column)
+            .set_index(column)[["IC", "entropy"]]
+            .reindex(uniques)
+            .fillna(0)
+        )
 
-    # Save results
-    dfOperation.to_csv(output_path, sep="\t", index=False, compression="bz2")
-    dfOperationmetrics_NT = dfOperation
+        known = toolIds >= 0
+        if not known.all():
+            toolIds, codes = toolIds[known], codes[known]
+        scores[:, kind] = np.bincount(
+            toolIds, weights=metrics["IC"].to_numpy()[codes], minlength=len(tools)
+        )
+        entropies[:, kind] = np.bincount(
+            toolIds, weights=metrics["entropy"].to_numpy()[codes], minlength=len(tools)
+        )
+    scores, entropies = scores[rows], entropies[rows]
 
-    return dfOperationmetrics_NT
+    dfTool = dfTool.copy()
+    dfTool["topicScore"] = scores[:, 0]
+    dfTool["operationScore"] = scores[:, 1]
+    dfTool["score"] = dfTool["topicScore"] + dfTool["operationScore"]
+    dfTool["topicEntropy"] = entropies[:, 0]
+    dfTool["operationEntropy"] = entropies[:, 1]
+    dfTool["entropy"] = dfTool["topicEntropy"] + dfTool["operationEntropy"]
+    return dfTool
 
 
 def compute_tool_metrics_with_transitive(
@@ -2541,16 +5712,16 @@ def compute_tool_metrics_with_transitive(
 
     Parameters:
     -----------
-    dfToolTopicTransitive_path : str
-        Path to the transitive tool-topic dataframe
-    dfToolOperationTransitive_path : str
-        Path to the transitive tool-operation dataframe
-    dfTopic_metrics_path : str
-        Path to the topic metrics dataframe
-    dfOperation_metrics_path : str
-        Path to the operation metrics dataframe
-    dfTool_path : str
-        Path to the tool dataframe
+    dfToolTopicTransitive_path : str or pd.DataFrame
+        Path to the transitive tool-topic dataframe, or the dataframe itself
+    dfToolOperationTransitive_path : str or pd.DataFrame
+        Path to the transitive tool-operation dataframe, or the dataframe itself
+    dfTopic_metrics_path : str or pd.DataFrame
+        Path to the topic metrics dataframe, or the dataframe itself
+    dfOperation_metrics_path : str or pd.DataFrame
+        Path to the operation metrics dataframe, or the dataframe itself
+    dfTool_path : str or pd.DataFrame
+        Path to the tool dataframe, or the dataframe itself
     output_path : str
         Path to save the combined tool metrics dataframe
 
@@ -2560,85 +5731,22 @@ def compute_tool_metrics_with_transitive(
         Dataframe containing tools with combined topic and operation metrics
     """
 
-    # Read input dataframes
-    dfToolTopicTransitive = pd.read_csv(
-        dfToolTopicTransitive_path, sep="\t", compression="bz2"
-    )
-    dfToolOperationTransitive = pd.read_csv(
-        dfToolOperationTransitive_path, sep="\t", compression="bz2"
-    )
-    dfTopic = pd.read_csv(dfTopic_metrics_path, sep="\t", compression="bz2")
-    dfOperation = pd.read_csv(dfOperation_metrics_path, sep="\t", compression="bz2")
-    dfTool = pd.read_csv(dfTool_path, sep="\t", compression="bz2")
-
-    # Calculate topic scores
-    df_topic_scores = (
-        dfToolTopicTransitive.join(
-            dfTopic[["topic", "IC", "entropy"]].set_index("topic"), on="topic"
-        )[["tool", "IC"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"IC": "topicScore"})
-        .reset_index()
-    )
-
-    dfTool = dfTool.join(df_topic_scores.set_index("tool"), on="tool")
-    dfTool["topicScore"] = dfTool["topicScore"].fillna(0)
-
-    # Calculate operation scores
-    df_operation_scores = (
-        dfToolOperationTransitive.join(
-            dfOperation[["operation", "IC", "entropy"]].set_index("operation"),
-            on="operation",
-        )[["tool", "IC"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"IC": "operationScore"})
-        .reset_index()
-    )
-
-    dfTool = dfTool.join(df_operation_scores.set_index("tool"), on="tool")
-    dfTool["operationScore"] = dfTool["operationScore"].fillna(0)
-
-    # Calculate total score
-    dfTool["score"] = dfTool["topicScore"] + dfTool["operationScore"]
-
-    # Calculate topic entropy
-    df_topic_entropy = (
-        dfToolTopicTransitive.join(
-            dfTopic[["topic", "IC", "entropy"]].set_index("topic"), on="topic"
-        )[["tool", "entropy"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"entropy": "topicEntropy"})
-        .reset_index()
-    )
-
-    dfTool = dfTool.join(df_topic_entropy.set_index("tool"), on="tool")
-    dfTool["topicEntropy"] = dfTool["topicEntropy"].fillna(0)
-
-    # Calculate operation entropy
-    df_operation_entropy = (
-        dfToolOperationTransitive.join(
-            dfOperation[["operation", "IC", "entropy"]].set_index("operation"),
-            on="operation",
-        )[["tool", "entropy"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"entropy": "operationEntropy"})
-        .reset_index()
+    dfToolallmetrics = _tool_scores(
+        _input_table(dfTool_path),
+        [
+            (
+                _input_table(dfToolTopicTransitive_path),
+                _input_table(dfTopic_metrics_path),
+                "topic",
+            ),
+            (
+                _input_table(dfToolOperationTransitive_path),
+                _input_table(dfOperation_metrics_path),
+                "operation",
+            ),
+        ],
     )
-
-    dfTool = dfTool.join(df_operation_entropy.set_index("tool"), on="tool")
-    dfTool["operationEntropy"] = dfTool["operationEntropy"].fillna(0)
-
-    # Calculate total entropy
-    dfTool["entropy"] = dfTool["topicEntropy"] + dfTool["operationEntropy"]
-
-    # Save results
-    dfTool.to_csv(output_path, sep="\t", index=False, compression="bz2")
-    dfToolallmetrics = dfTool
-
+    write_table(dfToolallmetrics, output_path)
     return dfToolallmetrics
 
 
@@ -2655,16 +5763,16 @@ def compute_tool_metrics_non_transitive(
 
     Parameters:
     -----------
-    dfToolTopic_path : str
-        Path to the non-transitive tool-topic dataframe
-    dfToolOperation_path : str
-        Path to the non-transitive tool-operation dataframe
-    dfTopic_metrics_NT_path : str
-        Path to the non-transitive topic metrics dataframe
-    dfOperation_metrics_NT_path : str
-        Path to the non-transitive operation metrics dataframe
-    dfTool_path : str
-        Path to the tool dataframe
+    dfToolTopic_path : str or pd.DataFrame
+        Path to the non-transitive tool-topic dataframe, or the dataframe itself
+    dfToolOperation_path : str or pd.DataFrame
+        Path to the non-transitive tool-operation dataframe, or the dataframe itself
+    dfTopic_metrics_NT_path : str or pd.DataFrame
+        Path to the non-transitive topic metrics dataframe, or the dataframe itself
+    dfOperation_metrics_NT_path : str or pd.DataFrame
+        Path to the non-transitive operation metrics dataframe, or the dataframe itself
+    dfTool_path : str or pd.DataFrame
+        Path to the tool dataframe, or the dataframe itself
     output_path : str
         Path to save the combined tool metrics dataframe (non-transitive)
 
@@ -2674,90 +5782,302 @@ def compute_tool_metrics_non_transitive(
         Dataframe containing tools with combined topic and operation metrics (non-transitive)
     """
 
-    # Read input dataframes
-    dfToolTopic = pd.read_csv(dfToolTopic_path, sep="\t", compression="bz2")
-    dfToolOperation = pd.read_csv(dfToolOperation_path, sep="\t", compression="bz2")
-    dfTopicmetrics_NT = pd.read_csv(
-        dfTopic_metrics_NT_path, sep="\t", compression="bz2"
-    )
-    dfOperationmetrics_NT = pd.read_csv(
-        dfOperation_metrics_NT_path, sep="\t", compression="bz2"
+    dfToolallmetrics_NT = _tool_scores(
+        _input_table(dfTool_path),
+        [
+            (
+                _input_table(dfToolTopic_path),
+                _input_table(dfTopic_metrics_NT_path),
+                "topic",
+            ),
+            (
+                _input_table(dfToolOperation_path),
+                _input_table(dfOperation_metrics_NT_path),
+                "operation",
+            ),
+        ],
     )
-    dfTool = pd.read_csv(dfTool_path, sep="\t", compression="bz2")
+    write_table(dfToolallmetrics_NT, output_path)
+    return dfToolallmetrics_NT
 
-    # Calculate topic scores (non-transitive)
-    df_topic_scores = (
-        dfToolTopic.join(
-            dfTopicmetrics_NT[["topic", "IC", "entropy"]].set_index("topic"), on="topic"
-        )[["tool", "IC"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"IC": "topicScore"})
-        .reset_index()
-    )
 
-    dfTool = dfTool.join(df_topic_scores.set_index("tool"), on="tool")
-    dfTool["topicScore"] = dfTool["topicScore"].fillna(0)
+def compute_tool_metrics_no_redundancy(
+    df_topic_no_redundancy_path="Dataframe/df_topic_no_redundancy.tsv.bz2",
+    df_operation_no_redundancy_path="Dataframe/df_operation_no_redundancy.tsv.bz2",
+    dfTopic_metrics_NT_NR_path="Dataframe/dfTopicmetrics_NT_NR.tsv.bz2",
+    dfOperation_metrics_NT_NR_path="Dataframe/dfOperationmetrics_NT_NR.tsv.bz2",
+    dfTool_path="Dataframe/dfTool.tsv.bz2",
+    output_path="Dataframe/dfToolallmetrics_NT_NR.tsv.bz2",
+) -> pd.DataFrame:
+    """
+    Compute combined topic and operation metrics for tools using non-transitive relationships
+    without redundancy.
+
+    Parameters:
+    -----------
+    df_topic_no_redundancy_path : str or pd.DataFrame
+        Path to the non-transitive tool-topic dataframe without redundancy, or the dataframe itself
+    df_operation_no_redundancy_path : str or pd.DataFrame
+        Path to the non-transitive tool-operation dataframe without redundancy, or the dataframe itself
+    dfTopic_metrics_NT_NR_path : str or pd.DataFrame
+        Path to the topic metrics dataframe (non-transitive, no redundancy), or the dataframe itself
+    dfOperation_metrics_NT_NR_path : str or pd.DataFrame
+        Path to the operation metrics dataframe (non-transitive, no redundancy), or the dataframe itself
+    dfTool_path : str or pd.DataFrame
+        Path to the tool dataframe, or the dataframe itself
+    output_path : str
+        Path to save the combined tool metrics dataframe (non-transitive, no redundancy)
 
-    # Calculate operation scores (non-transitive)
-    df_operation_scores = (
-        dfToolOperation.join(
-            dfOperationmetrics_NT[["operation", "IC", "entropy"]].set_index(
-                "operation"
+    Returns:
+    --------
+    pd.DataFrame
+        Dataframe containing tools with combined topic and operation metrics (non-transitive,
+        no redundancy)
+    """
+    dfToolallmetrics_NT_NR = _tool_scores(
+        _input_table(dfTool_path),
+        [
+            (
+                _input_table(df_topic_no_redundancy_path),
+                _input_table(dfTopic_metrics_NT_NR_path),
+                "topic",
             ),
-            on="operation",
-        )[["tool", "IC"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"IC": "operationScore"})
-        .reset_index()
+            (
+                _input_table(df_operation_no_redundancy_path),
+                _input_table(dfOperation_metrics_NT_NR_path),
+                "operation",
+            ),
+        ],
     )
+    write_table(dfToolallmetrics_NT_NR, output_path)
+    return dfToolallmetrics_NT_NR
 
-    dfTool = dfTool.join(df_operation_scores.set_index("tool"), on="tool")
-    dfTool["operationScore"] = dfTool["operationScore"].fillna(0)
 
-    # Calculate total score
-    dfTool["score"] = dfTool["topicScore"] + dfTool["operationScore"]
+# === Near-duplicate annotation sets ===
 
-    # Calculate topic entropy (non-transitive)
-    df_topic_entropy = (
-        dfToolTopic.join(
-            dfTopicmetrics_NT[["topic", "IC", "entropy"]].set_index("topic"), on="topic"
-        )[["tool", "entropy"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"entropy": "topicEntropy"})
-        .reset_index()
-    )
-
-    dfTool = dfTool.join(df_topic_entropy.set_index("tool"), on="tool")
-    dfTool["topicEntropy"] = dfTool["topicEntropy"].fillna(0)
-
-    # Calculate operation entropy (non-transitive)
-    df_operation_entropy = (
-        dfToolOperation.join(
-            dfOperationmetrics_NT[["operation", "IC", "entropy"]].set_index(
-                "operation"
-            ),
-            on="operation",
-        )[["tool", "entropy"]]
-        .groupby(by="tool")
-        .sum()
-        .rename(columns={"entropy": "operationEntropy"})
-        .reset_index()
+
+def minhash_signatures(incidence, nbHashes: int = 128, seed: int = 0) -> np.ndarray:
+    """
+    Compute the MinHash signatures of the concept sets of the rows of a binary
+    tool x concept matrix.
+
+    Each hash function is a random permutation of the concept ids, and the value
+    of a set is the smallest rank of its concepts: two sets get the same value
+    with a probability equal to their Jaccard index.
+
+    Parameters
+    ----------
+    incidence : scipy.sparse matrix
+        Tool x concept matrix, non-zero where the tool is annotated with the concept.
+    nbHashes : int
+        Number of hash functions (length of the signatures).
+    seed : int
+        Seed of the permutations.
+
+    Returns
+    -------
+    np.ndarray
+        (number of rows) x nbHashes array of int32; the rows without concept get
+        the number of concepts everywhere.
+    """
+    incidence = sparse.csr_matrix(incidence)
+    nbConcepts = incidence.shape[1]
+    rng = np.random.default_rng(seed)
+    signatures = np.full((incidence.shape[0], nbHashes), nbConcepts, dtype=np.int32)
+    rows = np.diff(incidence.indptr) > 0
+    starts = incidence.indptr[:-1][rows]
+    for h in range(nbHashes):
+        ranks = rng.permutation(nbConcepts).astype(np.int32)
+        signatures[rows, h] = np.minimum.reduceat(ranks[incidence.indices], starts)
+    return signatures
+
+
+def lsh_bands(threshold: float, nbHashes: int, recall: float = 0.99) -> tuple:
+    """
+    Choose how to cut the MinHash signatures into LSH bands for a Jaccard
+    threshold.
+
+    Two sets of Jaccard index j are candidates when all the values of one band
+    of their signatures are equal, which happens with probability
+    1 - (1 - j**rows) ** bands. The number of rows per band is the largest one
+    for which the pairs at the threshold are candidates with probability
+    `recall`: longer bands give fewer false candidates to verify.
+
+    Returns
+    -------
+    tuple[int, int]
+        (bands, rows), with bands * rows <= nbHashes.
+    """
+    for rows in range(nbHashes, 0, -1):
+        bands = nbHashes // rows
+        if 1 - (1 - threshold**rows) ** bands >= recall:
+            return bands, rows
+    return nbHashes, 1
+
+
+def _bucket_pairs(buckets: np.ndarray) -> tuple:
+    # All the pairs (i, j), i < j, of the rows in the same bucket
+    order = np.argsort(buckets, kind="stable")
+    _, starts, sizes = np.unique(buckets[order], return_index=True, return_counts=True)
+    counts = np.repeat(starts + sizes, sizes) - np.arange(len(order)) - 1
+    left = np.repeat(np.arange(len(order)), counts)
+    right = (
+        left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(counts) - counts, counts)
     )
+    first, second = order[left], order[right]
+    return np.minimum(first, second), np.maximum(first, second)
 
-    dfTool = dfTool.join(df_operation_entropy.set_index("tool"), on="tool")
-    dfTool["operationEntropy"] = dfTool["operationEntropy"].fillna(0)
 
-    # Calculate total entropy
-    dfTool["entropy"] = dfTool["topicEntropy"] + dfTool["operationEntropy"]
+def lsh_candidate_pairs(signatures: np.ndarray, bands: int, rows: int) -> tuple:
+    """
+    Return the candidate pairs of the LSH banding of MinHash signatures: the
+    pairs (i, j), i < j, of rows with equal values over a whole band.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Rows i and j of the pairs, each pair once.
+    """
+    nbRows = len(signatures)
+    # Each band is hashed to an integer by a random linear combination modulo 2**64:
+    # the collisions of different bands only add candidates, which are verified
+    multipliers = np.random.default_rng(0).integers(
+        1, 2**63, size=rows, dtype=np.uint64
+    ) | np.uint64(1)
+    pairs = []
+    for band in range(bands):
+        values = signatures[:, band * rows : (band + 1) * rows].astype(np.uint64)
+        with np.errstate(over="ignore"):
+            buckets, _ = pd.factorize(values @ multipliers)
+        left, right = _bucket_pairs(buckets)
+        pairs.append(left.astype(np.int64) * nbRows + right)
+    pairs = np.unique(np.concatenate(pairs)) if pairs else np.empty(0, np.int64)
+    return np.divmod(pairs, nbRows)
+
+
+def _pair_jaccard(incidence, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    # Exact Jaccard index of the concept sets of rows left and right, by chunks
+    # of pairs to bound the intermediate matrices
+    sizes = np.diff(incidence.indptr)
+    common = np.empty(len(left))
+    for start in range(0, len(left), 1_000_000):
+        end = start + 1_000_000
+        common[start:end] = np.asarray(
+            incidence[left[start:end]].multiply(incidence[right[start:end]]).sum(axis=1)
+        ).ravel()
+    return common / (sizes[left] + sizes[right] - common)
+
+
+def find_near_duplicate_tools(
+    dfToolTopicTransitive_path="Dataframe/dfToolTopicTransitive.tsv.bz2",
+    dfToolOperationTransitive_path="Dataframe/dfToolOperationTransitive.tsv.bz2",
+    dfTool_path="Dataframe/dfTool.tsv.bz2",
+    output_path="Dataframe/dfToolDuplicates.tsv.bz2",
+    threshold: float = 0.9,
+    min_annotations: int = 10,
+    nbHashes: int = 128,
+) -> pd.DataFrame:
+    """
+    Find the clusters of tools with (nearly) identical annotations, typically
+    bio.tools entries copied from one another.
 
-    # Save results
-    dfTool.to_csv(output_path, sep="\t", index=False, compression="bz2")
-    dfToolallmetrics_NT = dfTool
+    The tools sharing exactly the same transitive topics and operations are
+    grouped first. The distinct sets are then compared through MinHash
+    signatures (minhash_signatures) cut into LSH bands (lsh_bands), and the
+    candidate pairs are kept when their exact Jaccard index is at least
+    `threshold`. The clusters are the connected components of the kept pairs.
 
-    return dfToolallmetrics_NT
+    Parameters
+    ----------
+    dfToolTopicTransitive_path : str or pd.DataFrame
+        Path to the transitive tool-topic dataframe, or the dataframe itself
+    dfToolOperationTransitive_path : str or pd.DataFrame
+        Path to the transitive tool-operation dataframe, or the dataframe itself
+    dfTool_path : str or pd.DataFrame
+        Path to the tool dataframe, or the dataframe itself
+    output_path : str
+        Path to save the clusters
+    threshold : float
+        Smallest Jaccard index of two tools of a cluster (single linkage).
+    min_annotations : int
+        Smallest number of transitive annotations of the tools compared: the
+        small sets (a single topic and operation and their ancestors) are shared
+        by many independent tools.
+    nbHashes : int
+        Length of the MinHash signatures.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per tool of a cluster of at least 2 tools: cluster, clusterSize,
+        tool, toolLabel, nbAnnotations, and jaccard, the largest Jaccard index
+        with another tool of the cluster. The clusters are numbered by
+        decreasing size.
+    """
+    if sparse is None:
+        raise ImportError("scipy is required to find the near-duplicate tools")
+    incidence, tools, _ = _incidence_matrix(
+        [
+            (_input_table(dfToolTopicTransitive_path), "topic"),
+            (_input_table(dfToolOperationTransitive_path), "operation"),
+        ]
+    )
+    kept = np.flatnonzero(np.diff(incidence.indptr) >= min_annotations)
+    incidence, tools = incidence[kept], tools[kept]
+    sizes = np.diff(incidence.indptr)
+
+    # Identical sets: same sorted concept ids
+    setCodes, _ = pd.factorize(
+        pd.Series(
+            [
+                incidence.indices[start:end].tobytes()
+                for start, end in zip(incidence.indptr[:-1], incidence.indptr[1:])
+            ],
+            dtype=object,
+        )
+    )
+    _, representatives, nbToolsPerSet = np.unique(
+        setCodes, return_index=True, return_counts=True
+    )
+    sets = incidence[representatives]
+
+    # Near-identical sets: LSH candidates verified exactly
+    bands, rows = lsh_bands(threshold, nbHashes)
+    left, right = lsh_candidate_pairs(minhash_signatures(sets, nbHashes), bands, rows)
+    jaccard = _pair_jaccard(sets, left, right)
+    similar = jaccard >= threshold
+    left, right, jaccard = left[similar], right[similar], jaccard[similar]
+
+    _, components = sparse.csgraph.connected_components(
+        sparse.coo_matrix(
+            (np.ones(len(left)), (left, right)), shape=(len(representatives),) * 2
+        ),
+        directed=False,
+    )
+    best = np.where(nbToolsPerSet > 1, 1.0, 0.0)
+    np.maximum.at(best, left, jaccard)
+    np.maximum.at(best, right, jaccard)
+
+    toolComponents = components[setCodes]
+    clusterSizes = np.bincount(toolComponents)
+    df = pd.DataFrame(
+        {
+            "component": toolComponents,
+            "clusterSize": clusterSizes[toolComponents],
+            "tool": tools,
+            "nbAnnotations": sizes,
+            "jaccard": best[setCodes],
+        }
+    )
+    df = df[df["clusterSize"] > 1].sort_values(
+        ["clusterSize", "component", "tool"], ascending=[False, True, True]
+    )
+    df.insert(0, "cluster", pd.factorize(df["component"])[0])
+    labels = _input_table(dfTool_path).drop_duplicates("tool").set_index("tool")
+    df.insert(4, "toolLabel", labels["toolLabel"].reindex(df["tool"]).to_numpy())
+    dfToolDuplicates = df.drop(columns="component").reset_index(drop=True)
+    write_table(dfToolDuplicates, output_path)
+    return dfToolDuplicates
 
 
 def get_tool_url(tool_name: str) -> str:
@@ -2772,6 +6092,15 @@ def normalize_tool_input(tools):
     return [get_tool_url(t) for t in tools]
 
 
+def read_tool_list(lines) -> list:
+    """
+    Read tool names or bio.tools URIs, one per line (e.g. from a file or stdin).
+    Blank lines and lines starting with '#' are ignored.
+    """
+    tools = [line.strip() for line in lines]
+    return [t for t in tools if t and not t.startswith("#")]
+
+
 def _resolve_annotation_type(value: str) -> str:
     """Resolve shorthand to full annotation type."""
     mapping = {
@@ -2802,34 +6131,63 @@ def fetch_annotations(
 
     result = {tool: {} for tool in tools}
 
+    dfConceptIds = get_uri_dictionary()[1]
+    conceptURIs = dfConceptIds["concept"].to_numpy()
+    conceptLabels = dfConceptIds["conceptLabel"].to_numpy()
+    toolIds = tool_index().get_indexer(tools)
+
     # Determine which dataframe to use
     for ann_type in resolved_types:
 
         if ann_type == "Topic":
-            df = dfToolTopicTransitive if heritage else dfToolTopic
-            col_uri, col_label = "topic", "topicLabel"
+            name = "dfToolTopicTransitive" if heritage else "dfToolTopic"
 
         elif ann_type == "Operation":
-            df = dfToolOperationTransitive if heritage else dfToolOperation
-            col_uri, col_label = "operation", "operationLabel"
-
-        # Collect annotations per tool
-        for tool in tools:
-            filtered = df[df["tool"] == tool]
-
-            if with_label:
-                annotations = [
-                    {"URI": row[col_uri], "label": row[col_label]}
-                    for _, row in filtered.iterrows()
-                ]
-            else:
-                annotations = [{"URI": row[col_uri]} for _, row in filtered.iterrows()]
+            name = "dfToolOperationTransitive" if heritage else "dfToolOperation"
+
+        # Gather the annotations of all the tools at once from the CSR index
+        conceptIds, bounds = get_tools_concept_ids(name, toolIds)
+        if with_label:
+            annotations = [
+                {"URI": uri, "label": label}
+                for uri, label in zip(
+                    conceptURIs[conceptIds].tolist(), conceptLabels[conceptIds].tolist()
+                )
+            ]
+        else:
+            annotations = [{"URI": uri} for uri in conceptURIs[conceptIds].tolist()]
 
-            result[tool][ann_type] = annotations
+        for i, tool in enumerate(tools):
+            result[tool][ann_type] = annotations[bounds[i] : bounds[i + 1]]
 
     return result
 
 
+# Number of tools processed together when streaming results
+STREAM_CHUNK_SIZE = 1000
+
+
+def iter_annotations(
+    tools,
+    annotation_types=("Topic",),
+    heritage=True,
+    with_label=True,
+    chunk_size=STREAM_CHUNK_SIZE,
+):
+    """
+    Yield (tool URI, annotations) pairs as fetch_annotations() would return them,
+    computing them chunk by chunk so that memory does not grow with the number of tools.
+    """
+    tools = normalize_tool_input(tools)
+    for start in range(0, len(tools), chunk_size):
+        yield from fetch_annotations(
+            tools[start : start + chunk_size],
+            annotation_types=annotation_types,
+            heritage=heritage,
+            with_label=with_label,
+        ).items()
+
+
 # -----------------------------------------
 # OUTPUT: JSON
 # -----------------------------------------
@@ -2839,12 +6197,17 @@ def to_json(annotations: Dict) -> str:
     return json.dumps({"annotation": annotations}, indent=2)
 
 
-DF_TOOL_NO_TRANS = pd.read_csv(
-    "Dataframe/dfTool_NoTransitive.tsv.bz2", sep="\t", compression="bz2"
-)
-DF_TOOL_TOPICS_OPS = pd.read_csv(
-    "Dataframe/dftools_nbTopics_nbOperations.tsv.bz2", sep="\t", compression="bz2"
-)
+def to_ndjson(records):
+    """
+    Yield one compact JSON line per tool (newline-delimited JSON).
+
+    Parameters
+    ----------
+    records : iterable of (str, dict)
+        (tool URI, tool record) pairs, e.g. from iter_annotations_with_metrics().
+    """
+    for tool, record in records:
+        yield json.dumps({"tool": tool, **record}, separators=(",", ":"))
 
 
 def get_tool_metrics(tool: str, heritage: bool = True, metric: str = "all") -> dict:
@@ -2869,39 +6232,78 @@ def get_tool_metrics(tool: str, heritage: bool = True, metric: str = "all") -> d
         tool if tool.startswith("https://bio.tools/") else f"https://bio.tools/{tool}"
     )
 
-    # Choose the appropriate dataframes based on heritage mode
-    df_metrics = dfToolallmetrics if heritage else dfToolallmetrics_NT
-    df_counts = DF_TOOL_TOPICS_OPS if heritage else DF_TOOL_NO_TRANS
+    result = get_tools_metrics([tool_url], heritage=heritage, metric=metric)[tool_url]
+    if not result:
+        raise ValueError(f"Tool not found: {tool_url}")
 
-    row_metrics = df_metrics[df_metrics["tool"] == tool_url]
-    row_counts = df_counts[df_counts["tool"] == tool_url]
+    return result
 
-    if row_metrics.empty and row_counts.empty:
-        raise ValueError(f"Tool not found: {tool_url}")
 
-    metrics = row_metrics.iloc[0] if not row_metrics.empty else {}
-    counts = row_counts.iloc[0] if not row_counts.empty else {}
+def get_tools_metrics(tools, heritage: bool = True, metric: str = "all") -> dict:
+    """
+    Fetch the metrics of many tools at once (see get_tool_metrics).
+
+    The tools are resolved in one vectorized lookup against the metrics and count
+    tables, so the whole bio.tools registry (~30k tools) is processed in about a second.
+
+    Parameters
+    ----------
+    tools : list[str] or str
+        Tool name(s) or bio.tools URI(s).
+    heritage : bool
+        Whether to use inherited (heritage) metrics (default: True).
+    metric : str
+        Metric type to return ('ic', 'entropy', 'count', or 'all').
+
+    Returns
+    -------
+    dict
+        { "https://bio.tools/<tool>" : {metrics} }, with an empty dict for tools
+        that are not found.
+    """
+    tools = normalize_tool_input(tools)
 
-    result = {"Tool": tool_url}
+    # Choose the appropriate dataframes based on heritage mode
+    metrics_name = "dfToolallmetrics" if heritage else "dfToolallmetrics_NT"
+    counts_name = "DF_TOOL_TOPICS_OPS" if heritage else "DF_TOOL_NO_TRANS"
 
+    fields = []
     # IC (Information Content)
     if metric in ("ic", "all"):
-        result["topicScore"] = float(metrics.get("topicScore", 0))
-        result["operationScore"] = float(metrics.get("operationScore", 0))
-        result["score"] = float(metrics.get("score", 0))
-
+        fields += [(metrics_name, c, float) for c in ("topicScore", "operationScore")]
+        fields += [(metrics_name, "score", float)]
     # Entropy
     if metric in ("entropy", "all"):
-        result["topicEntropy"] = float(metrics.get("topicEntropy", 0))
-        result["operationEntropy"] = float(metrics.get("operationEntropy", 0))
-        result["entropy"] = float(metrics.get("entropy", 0))
-
+        fields += [
+            (metrics_name, c, float)
+            for c in ("topicEntropy", "operationEntropy", "entropy")
+        ]
     # Count of annotations
     if metric in ("count", "all"):
-        result["nbTopics"] = int(counts.get("nbTopics", 0))
-        result["nbOperations"] = int(counts.get("nbOperations", 0))
+        fields += [(counts_name, c, int) for c in ("nbTopics", "nbOperations")]
 
-    return result
+    toolIds = tool_index().get_indexer(tools)
+    known = toolIds >= 0
+    rows = {
+        name: np.where(known, _tool_rows(name)[toolIds], -1)
+        for name in (metrics_name, counts_name)
+    }
+
+    columns = {}
+    for name, col, cast in fields:
+        values = get_table(name)[col].to_numpy()[np.maximum(rows[name], 0)]
+        columns[col] = np.where(rows[name] >= 0, values, 0).astype(cast).tolist()
+
+    results = {}
+    for i, tool in enumerate(tools):
+        if rows[metrics_name][i] < 0 and rows[counts_name][i] < 0:
+            results[tool] = {}
+            continue
+        results[tool] = {"Tool": tool}
+        for col in columns:
+            results[tool][col] = columns[col][i]
+
+    return results
 
 
 def format_tool_annotations(metrics: dict) -> dict:
@@ -2963,12 +6365,11 @@ def fetch_annotations_with_metrics(
             with_label=with_label,
         )
 
+    tools_metrics = get_tools_metrics(tools, heritage=heritage, metric=metric)
+
     # Merge metrics and annotations per tool
     for tool in tools:
-        try:
-            metrics = get_tool_metrics(tool, heritage=heritage, metric=metric)
-        except ValueError:
-            metrics = {}
+        metrics = tools_metrics[tool]
 
         # Safely populate annotation categories
         topic_anns = (
@@ -3001,3 +6402,29 @@ def fetch_annotations_with_metrics(
         }
 
     return combined
+
+
+def iter_annotations_with_metrics(
+    tools,
+    annotation_types=("Topic", "Operation"),
+    heritage=True,
+    with_label=True,
+    metric="all",
+    include_annotations=True,
+    chunk_size=STREAM_CHUNK_SIZE,
+):
+    """
+    Yield (tool URI, record) pairs as fetch_annotations_with_metrics() would return
+    them, computing them chunk by chunk so that memory does not grow with the number
+    of tools.
+    """
+    tools = normalize_tool_input(tools)
+    for start in range(0, len(tools), chunk_size):
+        yield from fetch_annotations_with_metrics(
+            tools[start : start + chunk_size],
+            annotation_types=annotation_types,
+            heritage=heritage,
+            with_label=with_label,
+            metric=metric,
+            include_annotations=include_annotations,
+        ).items()
@@ -0,0 +1,46 @@
+"""
+Import-time benchmark for the lazy Dataframe/ table registry.
+
+Each scenario runs in a fresh Python process so that nothing is cached between
+measurements. "eager" loads every table of the registry, which is what importing
+EDAMannot used to do.
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/bench_import.py
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "import": "import EDAMannot",
+    "describe star": (
+        "import EDAMannot as edam\n" "edam.fetch_annotations(['star'], heritage=False)"
+    ),
+    "QC star": (
+        "import EDAMannot as edam\n"
+        "edam.fetch_annotations_with_metrics(['star'], heritage=False)"
+    ),
+    "eager (all tables)": (
+        "import EDAMannot as edam\n"
+        "for name in edam.TABLE_FILES:\n"
+        "    edam.get_table(name)"
+    ),
+}
+
+
+def run(code, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for name, code in SCENARIOS.items():
+        print(f"{name:<20} {run(code):6.2f} s")
@@ -0,0 +1,40 @@
+"""
+Wall-clock and CPU time of a full `init --force` run.
+
+Run it from a folder holding CLI.py, EDAMannot.py and a Dataframe/ folder whose
+SPARQL result cache is warm (after one `init`), so that the timings reflect the
+pandas stages and the writes rather than the endpoint.
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/bench_init.py [repeat]
+"""
+
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+
+def run():
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "CLI.py", "init", "--force"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return wall, cpu
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    walls, cpus = zip(*(run() for _ in range(repeat)))
+    print(f"init --force: wall {statistics.median(walls):.2f}s")
+    print(f"              CPU  {statistics.median(cpus):.2f}s (user + system)")
+
+
+if __name__ == "__main__":
+    main()
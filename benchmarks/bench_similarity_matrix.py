@@ -0,0 +1,34 @@
+"""
+Wall-clock time of the tool x tool similarity matrix (compute_similarity_matrix,
+top 20 per tool) by number of worker processes and block size, on the
+similarity index of the Dataframe/ snapshot.
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/bench_similarity_matrix.py [metric]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import EDAMannot as edam  # noqa: E402
+
+
+def main():
+    metric = sys.argv[1] if len(sys.argv) > 1 else "mi"
+    index = edam.get_similarity_index()
+    print(f"{len(index.engine.tools)} tools, metric {metric}")
+    print(f"{'workers':<9}{'block':>6}{'time (s)':>10}")
+    workers = sorted({1, 2, os.cpu_count() or 1})
+    for nbWorkers in workers:
+        for blockSize in (16, 32, 128):
+            start = time.perf_counter()
+            edam.compute_similarity_matrix(
+                metric, k=20, block_size=blockSize, max_workers=nbWorkers
+            )
+            print(f"{nbWorkers:<9}{blockSize:>6}{time.perf_counter() - start:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
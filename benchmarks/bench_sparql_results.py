@@ -0,0 +1,92 @@
+"""
+Time and peak memory of the conversion of a large SPARQL result into a DataFrame:
+"json" is the former path (whole JSON response, then one dict per row), "csv" the
+chunked CSV parsing of sparql_dataframe.
+
+The results are served by a local HTTP server, with the rows of the transitive
+topic table (Dataframe/dfToolTopicTransitive.tsv.bz2, about 320k rows). Each
+scenario runs in a fresh Python process and reports its peak resident size
+(VmHWM, Linux only).
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/bench_sparql_results.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+SCENARIO = """
+import time
+import EDAMannot as edam
+edam.sparql_cache_enabled = False
+start = time.perf_counter()
+if {mode!r} == "json":
+    df = edam.sparql_results_to_dataframe(edam.sparql_query("SELECT", {url!r}))
+else:
+    df = edam.sparql_dataframe("SELECT", {url!r})
+elapsed = time.perf_counter() - start
+with open("/proc/self/status") as f:
+    rss = next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+print(f"{{len(df)}} {{elapsed:.2f}} {{rss:.0f}}")
+"""
+
+
+def serve(df):
+    variables = list(df.columns)
+    bodies = {
+        "csv": df.to_csv(index=False).encode(),
+        "json": json.dumps(
+            {
+                "head": {"vars": variables},
+                "results": {
+                    "bindings": [
+                        {v: {"type": "uri", "value": row[v]} for v in variables}
+                        for row in df.to_dict("records")
+                    ]
+                },
+            }
+        ).encode(),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = bodies["csv" if "text/csv" in self.headers["Accept"] else "json"]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/query"
+
+
+def main():
+    df = pd.read_csv(
+        "Dataframe/dfToolTopicTransitive.tsv.bz2", sep="\t", usecols=["tool", "topic"]
+    )
+    url = serve(df)
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    print(f"{'mode':<6}{'rows':>10}{'time (s)':>10}{'peak RSS (MB)':>14}")
+    for mode in ("json", "csv"):
+        output = subprocess.run(
+            [sys.executable, "-c", SCENARIO.format(mode=mode, url=url)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout.split()
+        print(f"{mode:<6}{output[0]:>10}{output[1]:>10}{output[2]:>14}")
+
+
+if __name__ == "__main__":
+    main()
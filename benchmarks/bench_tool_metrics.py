@@ -0,0 +1,123 @@
+"""
+Time and peak memory of the tool metrics (dfToolallmetrics, dfToolallmetrics_NT):
+"former" is the previous implementation (one join, groupby and sum per score, each
+joined back to dfTool), "bincount" the scatter-add of compute_tool_metrics_*.
+
+Each scenario runs in a fresh Python process. The tables are read from Dataframe/
+beforehand, so only the computation is measured: median time of the runs, and
+peak resident size during the runs above the resident size before them (VmHWM
+reset through /proc/self/clear_refs, Linux only).
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/bench_tool_metrics.py [repeat]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+import EDAMannot as edam  # noqa: E402
+
+
+def former(dfToolConcepts, dfMetrics, dfTool):
+    for metric, suffix in (("IC", "Score"), ("entropy", "Entropy")):
+        for column in ("topic", "operation"):
+            name = f"{column}{suffix}"
+            scores = (
+                dfToolConcepts[column]
+                .join(
+                    dfMetrics[column][[column, "IC", "entropy"]].set_index(column),
+                    on=column,
+                )[["tool", metric]]
+                .groupby(by="tool")
+                .sum()
+                .rename(columns={metric: name})
+                .reset_index()
+            )
+            dfTool = dfTool.join(scores.set_index("tool"), on="tool")
+            dfTool[name] = dfTool[name].fillna(0)
+        total = "score" if suffix == "Score" else "entropy"
+        dfTool[total] = dfTool[f"topic{suffix}"] + dfTool[f"operation{suffix}"]
+    return dfTool
+
+
+def bincount(dfToolConcepts, dfMetrics, dfTool):
+    return edam._tool_scores(
+        dfTool,
+        [(dfToolConcepts[column], dfMetrics[column], column) for column in dfMetrics],
+    )
+
+
+def memory(field):
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field)) / 1024
+
+
+def tables(variant):
+    names = {
+        "transitive": (
+            "dfToolTopicTransitive",
+            "dfToolOperationTransitive",
+            "dfTopicmetrics",
+            "dfOperationmetrics",
+        ),
+        "direct": (
+            "dfToolTopic",
+            "dfToolOperation",
+            "dfTopicmetrics_NT",
+            "dfOperationmetrics_NT",
+        ),
+    }[variant]
+    dfToolConcepts = {
+        "topic": edam.get_table(names[0]),
+        "operation": edam.get_table(names[1]),
+    }
+    dfMetrics = {
+        "topic": edam.get_table(names[2]),
+        "operation": edam.get_table(names[3]),
+    }
+    return dfToolConcepts, dfMetrics, edam.get_table("dfTool")
+
+
+def run(variant, mode, repeat):
+    function = {"former": former, "bincount": bincount}[mode]
+    args = tables(variant)
+    function(*args)
+    before = memory("VmRSS")
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    print(statistics.median(times), memory("VmHWM") - before)
+
+
+def main():
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    repeat = sys.argv[1] if len(sys.argv) > 1 else "5"
+    print(f"{len(edam.get_table('dfTool'))} tools")
+    print(f"{'variant':<12}{'mode':<10}{'time (ms)':>10}{'peak (MB)':>11}")
+    for variant in ("transitive", "direct"):
+        for mode in ("former", "bincount"):
+            elapsed, peak = map(
+                float,
+                subprocess.run(
+                    [sys.executable, __file__, "--run", variant, mode, repeat],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.split(),
+            )
+            print(f"{variant:<12}{mode:<10}{elapsed * 1000:>10.1f}{peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
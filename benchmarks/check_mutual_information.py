@@ -0,0 +1,102 @@
+"""
+Parity check of MutualInformationEngine against getMutualInformation.
+
+Random pairs of tools of the Dataframe/ snapshot (plus each tool with itself and
+with an unknown tool) are scored by getMutualInformation and by the engine:
+
+- "topics": topic annotations only (an empty operation table), so that the former
+  lookup of the operations in the topic table does not matter;
+- "topics+operations": both transitive tables.
+
+The one-vs-many and block modes are compared with the pair mode, and the engine
+built from the CSR index (get_mutual_information_engine) with the one built from
+the tables. The exit status is 1 if some value differs by more than 1e-9
+(relative).
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/check_mutual_information.py [nbPairs]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+
+def check(label, expected, computed):
+    expected, computed = np.asarray(expected), np.asarray(computed)
+    ok = np.allclose(computed, expected, rtol=1e-9, atol=1e-12)
+    error = np.max(np.abs(computed - expected), initial=0.0)
+    print(f"  {label:<34} {'ok' if ok else 'DIFFERENT'} (max error {error:.1e})")
+    return ok
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.getcwd())
+    import EDAMannot as edam
+
+    nbPairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    dfTopics = edam.get_table("dfToolTopicTransitive")
+    dfOperations = edam.get_table("dfToolOperationTransitive")
+    noOperation = dfOperations.iloc[:0]
+    nbTools = dfTopics["tool"].nunique()
+
+    rng = np.random.default_rng(0)
+    tools = dfTopics["tool"].unique()
+    pairs = [tuple(rng.choice(tools, 2)) for _ in range(nbPairs)]
+    pairs += [(tools[0], tools[0]), (tools[0], "https://bio.tools/not-a-tool")]
+
+    ok = True
+    for label, operations, annotations in (
+        ("topics", noOperation, [(dfTopics, "topic")]),
+        (
+            "topics+operations",
+            dfOperations,
+            [(dfTopics, "topic"), (dfOperations, "operation")],
+        ),
+    ):
+        print(f"{label}: {len(pairs)} pairs")
+        start = time.perf_counter()
+        expected = [
+            edam.getMutualInformation(t1, t2, dfTopics, operations, nbTools)
+            for t1, t2 in pairs
+        ]
+        former = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = edam.MutualInformationEngine.from_tables(*annotations, nbTools=nbTools)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        computed = [engine.pair(t1, t2) for t1, t2 in pairs]
+        elapsed = time.perf_counter() - start
+        print(
+            f"  getMutualInformation {former:.2f} s, engine {built:.2f} s to build "
+            f"+ {elapsed:.3f} s"
+        )
+        ok &= check("pair", expected, computed)
+
+        first = [t1 for t1, _ in pairs[:10]]
+        second = [t2 for _, t2 in pairs[:10]]
+        ok &= check(
+            "one_vs_many",
+            [engine.pair(first[0], t2) for t2 in second],
+            engine.one_vs_many(first[0], second).to_numpy(),
+        )
+        ok &= check(
+            "block",
+            [[engine.pair(t1, t2) for t2 in second] for t1 in first],
+            engine.block(first, second),
+        )
+
+    indexed = edam.get_mutual_information_engine()
+    tableEngine = edam.MutualInformationEngine.from_tables(
+        (dfTopics, "topic"), (dfOperations, "operation")
+    )
+    print("CSR index engine")
+    ok &= check(
+        "one_vs_many (all tools)",
+        tableEngine.one_vs_many(tools[0]).sort_index(),
+        indexed.one_vs_many(tools[0]).reindex(tableEngine.tools).sort_index(),
+    )
+    sys.exit(0 if ok else 1)
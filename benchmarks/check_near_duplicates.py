@@ -0,0 +1,103 @@
+"""
+Recall of the near-duplicate search (find_near_duplicate_tools) against an exact
+comparison of all the pairs of annotation sets of the Dataframe/ snapshot.
+
+The distinct transitive annotation sets (of at least 10 concepts) are compared
+two by two, by blocks of rows of the sparse product sets @ sets.T, and the pairs
+with a Jaccard index at or above the threshold are matched with the ones found by
+the MinHash/LSH candidates, as well as the clusters of tools (connected
+components) they lead to.
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/check_near_duplicates.py [threshold]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def exact_pairs(sets, threshold):
+    sizes = np.diff(sets.indptr)
+    left, right = [], []
+    for start in range(0, sets.shape[0], 2000):
+        common = (sets[start : start + 2000] @ sets.T).tocoo()
+        rows = common.row + start
+        upper = rows < common.col
+        rows, cols, data = rows[upper], common.col[upper], common.data[upper]
+        similar = data / (sizes[rows] + sizes[cols] - data) >= threshold
+        left.append(rows[similar])
+        right.append(cols[similar])
+    return np.concatenate(left), np.concatenate(right)
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.getcwd())
+    import EDAMannot as edam
+
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else 0.9
+    dfTopics = edam.get_table("dfToolTopicTransitive")
+    dfOperations = edam.get_table("dfToolOperationTransitive")
+    dfTool = edam.get_table("dfTool")
+
+    start = time.perf_counter()
+    dfDuplicates = edam.find_near_duplicate_tools(
+        dfTopics, dfOperations, dfTool, output_path=os.devnull, threshold=threshold
+    )
+    print(f"find_near_duplicate_tools: {time.perf_counter() - start:.2f} s")
+
+    incidence, tools, _ = edam._incidence_matrix(
+        [(dfTopics, "topic"), (dfOperations, "operation")]
+    )
+    kept = np.diff(incidence.indptr) >= 10
+    incidence, tools = incidence[kept], tools[kept]
+    setCodes, _ = pd.factorize(
+        pd.Series(
+            [
+                incidence.indices[a:b].tobytes()
+                for a, b in zip(incidence.indptr[:-1], incidence.indptr[1:])
+            ],
+            dtype=object,
+        )
+    )
+    _, representatives = np.unique(setCodes, return_index=True)
+    sets = incidence[representatives]
+
+    start = time.perf_counter()
+    expected = exact_pairs(sets, threshold)
+    print(
+        f"exact comparison of {sets.shape[0]} sets: {time.perf_counter() - start:.2f} s"
+    )
+    bands, rows = edam.lsh_bands(threshold, 128)
+    left, right = edam.lsh_candidate_pairs(edam.minhash_signatures(sets), bands, rows)
+    similar = edam._pair_jaccard(sets, left, right) >= threshold
+    expectedPairs = set(zip(*(side.tolist() for side in expected)))
+    foundPairs = set(zip(left[similar].tolist(), right[similar].tolist()))
+    print(
+        f"pairs: {len(foundPairs & expectedPairs)} of {len(expectedPairs)} found "
+        f"({bands} bands of {rows} rows, {len(left)} candidates), "
+        f"{len(foundPairs - expectedPairs)} wrong"
+    )
+
+    _, components = edam.sparse.csgraph.connected_components(
+        edam.sparse.coo_matrix(
+            (np.ones(len(expected[0])), expected), shape=(sets.shape[0],) * 2
+        ),
+        directed=False,
+    )
+    dfExpected = pd.DataFrame({"tool": tools, "cluster": components[setCodes]})
+    dfExpected = dfExpected[dfExpected.groupby("cluster")["tool"].transform("size") > 1]
+    clusters = {
+        frozenset(group) for group in dfExpected.groupby("cluster")["tool"].agg(list)
+    }
+    foundClusters = {
+        frozenset(group) for group in dfDuplicates.groupby("cluster")["tool"].agg(list)
+    }
+    print(
+        f"clusters: {len(foundClusters & clusters)} of {len(clusters)} identical, "
+        f"{len(dfDuplicates)} of {len(dfExpected)} tools"
+    )
+    sys.exit(0 if foundPairs <= expectedPairs else 1)
@@ -0,0 +1,72 @@
+"""
+Parity check of the redundancy tables computed locally from the EDAM closure.
+
+dfToolTopic_redundancy and dfToolOperation_redundancy are recomputed from the
+direct tables (dfToolTopic, dfToolOperation) and the EDAM OWL file with
+find_redundant_annotations, and compared row for row to the tables of the
+Dataframe/ snapshot (as selected by the SPARQL queries of
+generate_df_redundancy_topic / generate_df_redundancy_operation). Rows are
+compared as multisets, since the row order of the SPARQL results is not
+defined. The exit status is 1 if some table differs.
+
+As for check_transitive_parity.py, the tables of the snapshot can only be
+compared when they were extracted from a knowledge graph with the EDAM version
+of the OWL file (see get_snapshot_edam_version).
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/check_redundancy_parity.py
+"""
+
+import collections
+import os
+import sys
+import time
+
+TABLES = {
+    "topic": ("dfToolTopic", "dfToolTopic_redundancy"),
+    "operation": ("dfToolOperation", "dfToolOperation_redundancy"),
+}
+
+
+def rows(df):
+    return collections.Counter(df.fillna("").itertuples(index=False, name=None))
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.getcwd())
+    import EDAMannot as edam
+
+    if not os.path.exists(edam.edam_file):
+        sys.exit(f"EDAM OWL file not found: {edam.edam_file}")
+    owlVersion, snapshotVersion = (
+        edam.edam_owl_version(),
+        edam.get_snapshot_edam_version(),
+    )
+    print(f"EDAM OWL file {owlVersion}, snapshot {snapshotVersion or 'not recorded'}")
+    if owlVersion != snapshotVersion:
+        print("The snapshot was not extracted with this EDAM version: not compared")
+        sys.exit(0)
+    edam.get_edam_ancestor_index()
+
+    status = 0
+    for column, (direct, redundancy) in TABLES.items():
+        dfDirect = edam.get_table(direct)
+        start = time.perf_counter()
+        local = edam._redundancy_dataframe(dfDirect, column)
+        elapsed = time.perf_counter() - start
+
+        expected = rows(edam.read_table(f"Dataframe/{redundancy}.tsv.bz2"))
+        computed = rows(local)
+        missing = expected - computed
+        extra = computed - expected
+        print(
+            f"{redundancy:<27} {len(local):>7} rows in {elapsed:5.2f} s, "
+            f"{sum(missing.values())} missing, {sum(extra.values())} extra"
+        )
+        for row in sorted(missing)[:5]:
+            print(f"  - {row}")
+        for row in sorted(extra)[:5]:
+            print(f"  + {row}")
+        if missing or extra:
+            status = 1
+    sys.exit(status)
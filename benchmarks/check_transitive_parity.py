@@ -0,0 +1,92 @@
+"""
+Parity check of the transitive annotation tables derived locally from the EDAM closure.
+
+dfToolTopicTransitive and dfToolOperationTransitive are recomputed from the direct
+tables (dfToolTopic, dfToolOperation) and the EDAM OWL file with
+expand_to_ancestors, and compared to the tables of the Dataframe/ snapshot
+(as extracted from the SPARQL endpoint). Rows are compared as sets of
+(tool, concept, label) triples, since the row order of the SPARQL results is
+not defined. The (tool, concept) pairs of the heritage annotations of the
+virtual transitive tables (`init --virtual-transitive`, see
+_expand_tools_concept_ids) are compared to the snapshot as well. The exit
+status is 1 if some table differs.
+
+The tables of the snapshot can only be compared when they were extracted from
+a knowledge graph with the EDAM version of the OWL file, as recorded by `init`
+(see get_snapshot_edam_version). Otherwise `init` does not use the local
+derivation (see edam_hierarchy_available) and there is nothing to compare.
+
+Command usage (from the EDAMannot folder) : python3 benchmarks/check_transitive_parity.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+TABLES = {
+    "topic": ("dfToolTopic", "dfToolTopicTransitive"),
+    "operation": ("dfToolOperation", "dfToolOperationTransitive"),
+}
+
+
+def rows(df, column):
+    columns = ["tool", column, column + "Label"]
+    return set(df[columns].fillna("").itertuples(index=False, name=None))
+
+
+def virtual_pairs(edam, transitive):
+    conceptIds, bounds = edam._expand_tools_concept_ids(
+        transitive, np.arange(len(edam.tool_index()))
+    )
+    tools = np.repeat(edam.tool_index().to_numpy(), np.diff(bounds))
+    return set(zip(tools, edam.concept_index().to_numpy()[conceptIds]))
+
+
+def report(name, computed, expected, elapsed):
+    missing = expected - computed
+    extra = computed - expected
+    print(
+        f"{name:<26} {len(computed):>8} rows in {elapsed:5.2f} s, "
+        f"{len(missing)} missing, {len(extra)} extra"
+    )
+    for row in sorted(missing)[:5]:
+        print(f"  - {row}")
+    for row in sorted(extra)[:5]:
+        print(f"  + {row}")
+    return bool(missing or extra)
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, os.getcwd())
+    import EDAMannot as edam
+
+    if not os.path.exists(edam.edam_file):
+        sys.exit(f"EDAM OWL file not found: {edam.edam_file}")
+    owlVersion, snapshotVersion = (
+        edam.edam_owl_version(),
+        edam.get_snapshot_edam_version(),
+    )
+    print(f"EDAM OWL file {owlVersion}, snapshot {snapshotVersion or 'not recorded'}")
+    if owlVersion != snapshotVersion:
+        print("The snapshot was not extracted with this EDAM version: not compared")
+        sys.exit(0)
+
+    status = 0
+    for column, (direct, transitive) in TABLES.items():
+        start = time.perf_counter()
+        local = edam.expand_to_ancestors(edam.get_table(direct), column)
+        elapsed = time.perf_counter() - start
+        expected = edam.get_table(transitive)
+        if report(transitive, rows(local, column), rows(expected, column), elapsed):
+            status = 1
+
+        start = time.perf_counter()
+        computed = virtual_pairs(edam, transitive)
+        elapsed = time.perf_counter() - start
+        expectedPairs = set(zip(expected["tool"], expected[column]))
+        if report("  virtual", computed, expectedPairs, elapsed):
+            status = 1
+    sys.exit(status)